@@ -4,15 +4,28 @@
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 import json
 import os
+import time
+import logging
+import functools
+import io
+import zipfile
+from contextlib import nullcontext
 from datetime import datetime
-from modules.file_loader import SmartFileLoader
-from modules.column_mapper import AutoColumnMapper
-from modules.data_analyzer import FlexibleDataAnalyzer
-from modules.smart_visualizer import SmartVisualizer
+from modules import telemetry
+from modules.translations import TRANSLATIONS
+from modules.styles import page_css
+from modules.figure_cache import FigureCache
+from modules.category_normalizer import load_aliases, aliases_key
+from modules.dataset_registry import DatasetRegistry
+from modules.profiler import PipelineProfiler
+from modules.worker_pool import (
+    WorkerPool, load_file_task, analyze_task, charts_task, frame_from_shared, apply_modified_columns
+)
+# pandas و numpy ووحدات المعالجة والرسوم تُستورد داخل الدوال عند الحاجة
+# حتى تظهر الصفحة الأولى (رفع الملف) دون انتظار تحميلها
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # إعدادات الصفحة
 st.set_page_config(
@@ -26,192 +39,7 @@ st.set_page_config(
 class TranslationSystem:
     """نظام الترجمة ثنائي اللغة"""
     
-    translations = {
-        'ar': {
-            # العنوان الرئيسي
-            'main_title': '📊 لوحة تحكم الموارد البشرية الذكية',
-            'main_subtitle': 'تعمل مع <strong>أي ملف Excel</strong> - قم برفع ملفك وسنكتشف البيانات تلقائياً',
-            
-            # الشريط الجانبي
-            'sidebar_settings': '⚙️ إعدادات',
-            'sidebar_language': 'اللغة:',
-            'sidebar_theme': 'المظهر:',
-            'sidebar_load_settings': '📥 تحميل إعدادات سابقة',
-            'sidebar_save_settings': '💾 حفظ الإعدادات',
-            'sidebar_load_success': 'تم تحميل الإعدادات السابقة',
-            'sidebar_save_success': 'تم حفظ الإعدادات',
-            'sidebar_no_settings': 'لا توجد إعدادات سابقة',
-            
-            # رفع الملف
-            'upload_title': '📤 الخطوة 1: رفع ملف Excel',
-            'upload_placeholder': 'اسحب وأفلت ملف Excel هنا أو انقر للاختيار',
-            'upload_help': 'يدعم الملفات: Excel (.xlsx, .xls), CSV',
-            'upload_success': '✅ تم تحميل الملف بنجاح!',
-            'upload_error': '❌ خطأ في تحميل الملف:',
-            'preview_data': '👀 معاينة البيانات (أول 5 صفوف)',
-            
-            # إحصائيات
-            'stats_records': 'عدد السجل',
-            'stats_columns': 'عدد الأعمدة',
-            'stats_numeric': 'أعمدة رقمية',
-            
-            # تعيين الأعمدة
-            'mapping_title': '🎯 الخطوة 2: تعيين الأعمدة',
-            'mapping_auto': '💡 <strong>التعرف التلقائي</strong>: النظام حاول تخمين أنواع الأعمدة. يمكنك تعديلها يدوياً إذا كانت غير صحيحة.',
-            
-            # فئات الأعمدة
-            'cat_employee_info': 'معلومات الموظف',
-            'cat_financial': 'المالية',
-            'cat_performance': 'الأداء',
-            'cat_attendance': 'الحضور',
-            'cat_training': 'التدريب',
-            'cat_management': 'المتابعة',
-            
-            # أسماء الحقول
-            'field_employee_name': 'اسم الموظف',
-            'field_employee_id': 'رقم الموظف',
-            'field_department': 'القسم',
-            'field_position': 'المنصب',
-            'field_hire_date': 'تاريخ التعيين',
-            'field_salary': 'الراتب',
-            'field_allowances': 'البدلات',
-            'field_bonus': 'المكافأة',
-            'field_tax': 'الضريبة',
-            'field_performance_score': 'درجة الأداء',
-            'field_kpi': 'KPI',
-            'field_rating': 'التقييم',
-            'field_review_date': 'تاريخ المراجعة',
-            'field_attendance_days': 'أيام الحضور',
-            'field_absent_days': 'أيام الغياب',
-            'field_late_days': 'أيام التأخير',
-            'field_overtime_hours': 'ساعات إضافية',
-            'field_trainings_completed': 'التدريبات المكتملة',
-            'field_training_hours': 'ساعات التدريب',
-            'field_certifications': 'الشهادات',
-            'field_manager': 'المدير',
-            'field_location': 'الموقع',
-            'field_employment_type': 'نوع التوظيف',
-            'field_status': 'الحالة',
-            
-            # زر التحليل
-            'analyze_button': '🚀 انتقل إلى التحليل',
-            
-            # نتائج التحليل
-            'analysis_title': '📊 الخطوة 3: تحليل البيانات الذكي',
-            'kpis_title': '📈 النتائج الرئيسية',
-            'charts_title': '📊 الرسوم البيانية التلقائية',
-            'advanced_title': '🔍 تحليل متقدم',
-            'correlations_title': 'العلاقات بين المتغيرات',
-            'outliers_title': 'اكتشاف القيم الشاذة',
-            'outliers_found': 'تم اكتشاف {} قيمة شاذة في الرواتب',
-            'no_outliers': '✅ لم يتم اكتشاف قيم شاذة في الرواتب',
-            'zero_std': 'الانحراف المعياري للرواتب صفر، لا يمكن اكتشاف قيم شاذة',
-            
-            # التقرير
-            'report_title': '📄 التقرير النصي الكامل',
-            'generate_report': '📋 إنشاء التقرير',
-            
-            # تصدير
-            'export_data': '📥 تحميل البيانات المعدلة (CSV)',
-            'download_csv': '⬇️ انقر للتحميل',
-            
-            # رسائل أخرى
-            'loading': 'جاري التحميل...',
-            'not_available': 'غير متوفر',
-        },
-        'en': {
-            # Main Title
-            'main_title': '📊 Smart HR Analytics Dashboard',
-            'main_subtitle': 'Works with <strong>any Excel file</strong> - Upload your file and we will automatically detect data',
-            
-            # Sidebar
-            'sidebar_settings': '⚙️ Settings',
-            'sidebar_language': 'Language:',
-            'sidebar_theme': 'Theme:',
-            'sidebar_load_settings': '📥 Load Previous Settings',
-            'sidebar_save_settings': '💾 Save Settings',
-            'sidebar_load_success': 'Previous settings loaded',
-            'sidebar_save_success': 'Settings saved',
-            'sidebar_no_settings': 'No previous settings',
-            
-            # File Upload
-            'upload_title': '📤 Step 1: Upload Excel File',
-            'upload_placeholder': 'Drag and drop Excel file here or click to browse',
-            'upload_help': 'Supports: Excel (.xlsx, .xls), CSV',
-            'upload_success': '✅ File uploaded successfully!',
-            'upload_error': '❌ Error loading file:',
-            'preview_data': '👀 Data Preview (First 5 rows)',
-            
-            # Statistics
-            'stats_records': 'Records Count',
-            'stats_columns': 'Columns Count',
-            'stats_numeric': 'Numeric Columns',
-            
-            # Column Mapping
-            'mapping_title': '🎯 Step 2: Map Columns',
-            'mapping_auto': '💡 <strong>Auto-detection</strong>: System tried to guess column types. You can adjust manually if incorrect.',
-            
-            # Column Categories
-            'cat_employee_info': 'Employee Information',
-            'cat_financial': 'Financial',
-            'cat_performance': 'Performance',
-            'cat_attendance': 'Attendance',
-            'cat_training': 'Training',
-            'cat_management': 'Management',
-            
-            # Field Names
-            'field_employee_name': 'Employee Name',
-            'field_employee_id': 'Employee ID',
-            'field_department': 'Department',
-            'field_position': 'Position',
-            'field_hire_date': 'Hire Date',
-            'field_salary': 'Salary',
-            'field_allowances': 'Allowances',
-            'field_bonus': 'Bonus',
-            'field_tax': 'Tax',
-            'field_performance_score': 'Performance Score',
-            'field_kpi': 'KPI',
-            'field_rating': 'Rating',
-            'field_review_date': 'Review Date',
-            'field_attendance_days': 'Attendance Days',
-            'field_absent_days': 'Absent Days',
-            'field_late_days': 'Late Days',
-            'field_overtime_hours': 'Overtime Hours',
-            'field_trainings_completed': 'Trainings Completed',
-            'field_training_hours': 'Training Hours',
-            'field_certifications': 'Certifications',
-            'field_manager': 'Manager',
-            'field_location': 'Location',
-            'field_employment_type': 'Employment Type',
-            'field_status': 'Status',
-            
-            # Analysis Button
-            'analyze_button': '🚀 Proceed to Analysis',
-            
-            # Analysis Results
-            'analysis_title': '📊 Step 3: Smart Data Analysis',
-            'kpis_title': '📈 Key Results',
-            'charts_title': '📊 Automatic Charts',
-            'advanced_title': '🔍 Advanced Analysis',
-            'correlations_title': 'Variable Correlations',
-            'outliers_title': 'Outlier Detection',
-            'outliers_found': 'Found {} outliers in salaries',
-            'no_outliers': '✅ No outliers detected in salaries',
-            'zero_std': 'Salary standard deviation is zero, cannot detect outliers',
-            
-            # Report
-            'report_title': '📄 Full Text Report',
-            'generate_report': '📋 Generate Report',
-            
-            # Export
-            'export_data': '📥 Download Modified Data (CSV)',
-            'download_csv': '⬇️ Click to Download',
-            
-            # Other Messages
-            'loading': 'Loading...',
-            'not_available': 'Not Available',
-        }
-    }
+    translations = TRANSLATIONS
     
     @staticmethod
     def get_translation(key, language='ar'):
@@ -230,101 +58,55 @@ translator = TranslationSystem()
 
 # تحميل CSS مع دعم متعدد اللغات
 def load_css(language='ar'):
-    """تحميل CSS مع دعم اتجاه النص"""
-    text_align = 'right' if language == 'ar' else 'left'
-    font_family = "'Cairo', 'Segoe UI', Tahoma, sans-serif" if language == 'ar' else "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
-    
-    css = f"""
-    <style>
-    .main-header {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 30px;
-        border-radius: 15px;
-        margin-bottom: 30px;
-        text-align: center;
-        font-family: {font_family};
-    }}
-    
-    .kpi-card {{
-        background: white;
-        border-radius: 12px;
-        padding: 20px;
-        margin: 10px;
-        border: 1px solid #e2e8f0;
-        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-        text-align: center;
-        transition: all 0.3s ease;
-        font-family: {font_family};
-        direction: {'rtl' if language == 'ar' else 'ltr'};
-    }}
-    
-    .kpi-card:hover {{
-        transform: translateY(-5px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-    }}
-    
-    .upload-box {{
-        border: 2px dashed #4c51bf;
-        border-radius: 12px;
-        padding: 40px;
-        text-align: center;
-        background: #f7fafc;
-        margin: 20px 0;
-        font-family: {font_family};
-        direction: {'rtl' if language == 'ar' else 'ltr'};
-    }}
-    
-    .column-map-item {{
-        background: #edf2f7;
-        padding: 15px;
-        border-radius: 10px;
-        margin: 10px 0;
-        font-family: {font_family};
-        direction: {'rtl' if language == 'ar' else 'ltr'};
-    }}
-    
-    .warning-box {{
-        background: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 8px;
-        padding: 15px;
-        margin: 10px 0;
-        font-family: {font_family};
-        direction: {'rtl' if language == 'ar' else 'ltr'};
-    }}
-    
-    .report-box {{
-        background: #f8f9fa;
-        border: 2px solid #dee2e6;
-        border-radius: 10px;
-        padding: 25px;
-        margin: 20px 0;
-        font-family: 'Courier New', monospace;
-        font-size: 14px;
-        line-height: 1.6;
-        white-space: pre-wrap;
-        direction: {'rtl' if language == 'ar' else 'ltr'};
-        max-height: 600px;
-        overflow-y: auto;
-    }}
-    
-    /* تنسيق عام للصفحة */
-    .stApp {{
-        font-family: {font_family};
-        text-align: {text_align};
-    }}
-    
-    /* تخصيص markdown */
-    .stMarkdown {{
-        font-family: {font_family};
-    }}
-    </style>
-    
-    <!-- تحميل خط Cairo للعربية -->
-    <link href="https://fonts.googleapis.com/css2?family=Cairo:wght@400;600;700&display=swap" rel="stylesheet">
-    """
-    st.markdown(css, unsafe_allow_html=True)
+    """تحميل CSS مع دعم اتجاه النص (النص يُبنى مرة واحدة لكل لغة)"""
+    st.markdown(page_css(language), unsafe_allow_html=True)
+
+# ذاكرة مؤقتة للرسوم مشتركة بين جميع الجلسات في نفس العملية
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# مخزن اللقطات التاريخية (SQLite محلي، المسار من HR_SNAPSHOT_DB) مشترك بين الجلسات
+@st.cache_resource
+def get_snapshot_store():
+    from modules.snapshot_store import SnapshotStore
+    return SnapshotStore.from_env()
+
+# حدود حجم الرسوم (قابلة للتخصيص عبر HR_CHART_BUDGETS) وسجل تقارير القياس
+@st.cache_resource
+def get_chart_budget():
+    hr_logger = logging.getLogger('hr_dashboard')
+    if not hr_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(levelname)s %(message)s'))
+        hr_logger.addHandler(handler)
+        hr_logger.setLevel(logging.INFO)
+    from modules.chart_budget import ChartBudget
+    return ChartBudget.from_env()
+
+@st.cache_resource
+def get_dataset_registry():
+    # نسخة واحدة من كل ملف في ذاكرة الخادم تتشاركها جميع الجلسات
+    return DatasetRegistry.from_env()
+
+@st.cache_resource
+def get_worker_pool():
+    # عمليات مشتركة بين كل الجلسات للتحميل والتحليل والرسوم
+    return WorkerPool.from_env()
+
+def get_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+def share_dataset(slot, fingerprint, df):
+    """تسجيل البيانات في السجل المشترك وإرجاع النسخة المشتركة بدلاً من نسخة الجلسة"""
+    return get_dataset_registry().register(get_session_id(), slot, fingerprint, df)
+
+@st.cache_resource
+def get_export_cache():
+    # ملفات التصدير مشتركة بين الجلسات حسب بصمة البيانات
+    from modules.data_exporter import ExportCache
+    return ExportCache()
 
 # تهيئة حالة الجلسة
 if 'language' not in st.session_state:
@@ -337,6 +119,8 @@ if 'df' not in st.session_state:
     st.session_state.df = None
 if 'column_mapping' not in st.session_state:
     st.session_state.column_mapping = {}
+if 'category_aliases' not in st.session_state:
+    st.session_state.category_aliases = {}
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = {}
 if 'report_generated' not in st.session_state:
@@ -374,12 +158,38 @@ with st.sidebar:
     
     st.divider()
     
+    # لوحة تشخيص حجم الرسوم
+    st.toggle(translator.translate('sidebar_debug'), key='debug_charts')
+    
+    # لوحة قياس أداء المراحل
+    st.toggle(translator.translate('sidebar_perf'), key='perf_panel')
+    
+    # وضع التحليل العميق (عينات المعالج + تتبع الذاكرة) - مفعل افتراضياً مع HR_PROFILE=1
+    st.toggle(translator.translate('sidebar_profile'), key='profile_mode', value=PipelineProfiler.enabled_from_env())
+    
+    # لوحة الإدارة: استخدام ذاكرة البيانات المشتركة بين الجلسات
+    if st.session_state.get('debug_charts'):
+        import pandas as pd
+        with st.expander(translator.translate('registry_title')):
+            registry_stats = get_dataset_registry().get_stats()
+            st.metric(translator.translate('registry_memory'), f"{registry_stats['total_mb']} / {registry_stats['max_mb']} MB")
+            st.caption(translator.translate('registry_limits').format(
+                registry_stats['session_max_mb'], registry_stats['hits'], registry_stats['evictions']
+            ))
+            if registry_stats['datasets']:
+                st.dataframe(pd.DataFrame(registry_stats['datasets']), use_container_width=True)
+            if registry_stats['sessions']:
+                st.dataframe(pd.DataFrame(registry_stats['sessions']), use_container_width=True)
+            st.markdown(f"**{translator.translate('workers_title')}**")
+            st.json(get_worker_pool().get_stats())
+    
     # تحميل الإعدادات السابقة
     if st.button(translator.translate('sidebar_load_settings'), use_container_width=True):
         if os.path.exists('config.json'):
             with open('config.json', 'r', encoding='utf-8') as f:
                 config = json.load(f)
                 st.session_state.column_mapping = config.get('column_mapping', {})
+                st.session_state.category_aliases = config.get('category_aliases', {})
                 st.success(translator.translate('sidebar_load_success'))
         else:
             st.warning(translator.translate('sidebar_no_settings'))
@@ -389,6 +199,7 @@ with st.sidebar:
         if st.button(translator.translate('sidebar_save_settings'), use_container_width=True):
             config = {
                 'column_mapping': st.session_state.column_mapping,
+                'category_aliases': st.session_state.category_aliases,
                 'saved_at': datetime.now().isoformat(),
                 'language': st.session_state.language,
                 'theme': st.session_state.theme
@@ -405,28 +216,282 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
-# ==================== الصفحة الرئيسية - تحميل الملف ====================
-st.markdown(f"## {translator.translate('upload_title')}")
+# ==================== قياس أداء المراحل ====================
+PERF_LOG = telemetry.log_path_from_env()
+PERF_HISTORY = 500
 
-uploaded_file = st.file_uploader(
-    translator.translate('upload_placeholder'),
-    type=['xlsx', 'xls', 'csv'],
-    help=translator.translate('upload_help')
-)
+def store_perf_records(records):
+    history = st.session_state.setdefault('perf_records', [])
+    history.extend(records)
+    del history[:-PERF_HISTORY]
 
-if uploaded_file is not None:
-    try:
-        # تحميل الملف باستخدام المنظم الذكي
-        loader = SmartFileLoader(uploaded_file)
-        df = loader.load_file()
-        st.session_state.df = df
-        st.session_state.file_uploaded = True
+def instrumented(stage):
+    """قياس قسم من الصفحة - يعمل فقط عند تفعيل لوحة الأداء أو HR_PERF_LOG"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            enabled = PERF_LOG or st.session_state.get('perf_panel')
+            context = nullcontext()
+            if enabled and telemetry.current() is None:
+                context = telemetry.run(get_session_id(), PERF_LOG, on_finish=store_perf_records)
+            with context, telemetry.stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def render_perf_panel():
+    """لوحة الأداء: زمن التنفيذ وزمن المعالج وذروة الذاكرة لكل مرحلة"""
+    if not st.session_state.get('perf_panel'):
+        return
+    with st.sidebar:
+        with st.expander(translator.translate('perf_title'), expanded=True):
+            records = st.session_state.get('perf_records', [])
+            if not records:
+                st.caption(translator.translate('perf_empty'))
+                return
+            import pandas as pd
+            st.dataframe(pd.DataFrame(telemetry.summarize(records)), use_container_width=True, hide_index=True)
+            with st.expander(translator.translate('perf_recent')):
+                st.dataframe(pd.DataFrame(records[-50:]), use_container_width=True, hide_index=True)
+            if st.button(translator.translate('perf_clear'), use_container_width=True):
+                st.session_state.perf_records = []
+                st.rerun()
+
+def render_profile_panel():
+    """تشغيل خط المعالجة على الملف الحالي تحت المحلل وعرض مجلد النتائج مع تحميلها"""
+    if not st.session_state.get('profile_mode'):
+        return
+    with st.sidebar:
+        with st.expander(translator.translate('profile_title'), expanded=True):
+            st.caption(translator.translate('profile_hint'))
+            source = st.session_state.get('profile_source')
+            if source is None:
+                st.caption(translator.translate('profile_no_file'))
+                return
+            if st.button(translator.translate('profile_run'), use_container_width=True):
+                from modules.file_loader import BytesUpload
+                mapping = st.session_state.get('analysis_mapping') or st.session_state.column_mapping or None
+                with st.spinner(translator.translate('profile_title')):
+                    _, run_dir = PipelineProfiler.from_env().profile(BytesUpload(source.getvalue(), source.name), mapping)
+                st.session_state.profile_dir = run_dir
+            run_dir = st.session_state.get('profile_dir')
+            if run_dir and os.path.isdir(run_dir):
+                st.caption(translator.translate('profile_done').format(run_dir))
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for filename in sorted(os.listdir(run_dir)):
+                        archive.write(os.path.join(run_dir, filename), filename)
+                st.download_button(
+                    translator.translate('profile_download'),
+                    data=buffer.getvalue(),
+                    file_name=f"{os.path.basename(run_dir)}.zip",
+                    mime='application/zip',
+                    on_click='ignore',
+                    use_container_width=True
+                )
+
+# ==================== مراحل المعالجة المحفوظة في الجلسة ====================
+def count_stage(stage):
+    """عداد لعدد مرات تنفيذ كل مرحلة فعلياً (يظهر في لوحة التشخيص)"""
+    counts = st.session_state.setdefault('stage_counts', {})
+    counts[stage] = counts.get(stage, 0) + 1
+
+def load_single_file(uploaded_file):
+    """تحميل ملف واحد (مع اختيار وربط الأوراق) دون إعادة القراءة عند كل تفاعل"""
+    from modules.file_loader import SmartFileLoader
+    from modules.sheet_joiner import SheetJoiner
+    from modules.fingerprint import content_fingerprint
+    
+    upload_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+    if st.session_state.get('upload_key') != upload_key:
+        # ملف جديد: إلغاء مهام الجلسة السابقة ثم التحميل في عملية منفصلة
+        pool = get_worker_pool()
+        pool.cancel_user(get_session_id())
+        loaded = pool.run(get_session_id(), load_file_task, uploaded_file.getvalue(), uploaded_file.name)
+        df = frame_from_shared(loaded['frame'], unlink=True)
+        first_sheet = tuple(loaded['sheet_names'][:1])
+        st.session_state.upload_df = share_dataset(
+            'upload', content_fingerprint(uploaded_file.getvalue(), first_sheet), df
+        )
+        st.session_state.upload_sheet_names = loaded['sheet_names']
+        # الملف الأصلي لوضع التحليل العميق (يعيد تشغيل خط المعالجة من البداية)
+        st.session_state.profile_source = uploaded_file
+        st.session_state.upload_key = upload_key
+        count_stage('load')
+    
+    df = st.session_state.upload_df
+    sheet_names = st.session_state.upload_sheet_names
+    
+    # ملفات Excel متعددة الأوراق: إمكانية اختيار أوراق إضافية وربطها
+    selected_sheets = [sheet_names[0]] if sheet_names else []
+    if len(sheet_names) > 1:
+        selected_sheets = st.multiselect(
+            translator.translate('sheets_select'),
+            options=sheet_names,
+            default=selected_sheets
+        )
+    
+    if len(selected_sheets) > 1 or (selected_sheets and selected_sheets[0] != sheet_names[0]):
+        join_key = (upload_key, tuple(selected_sheets))
+        if st.session_state.get('sheet_join_key') != join_key:
+            sheets = SmartFileLoader(uploaded_file).load_sheets(selected_sheets)
+            if len(selected_sheets) > 1:
+                joiner = SheetJoiner(sheets)
+                st.session_state.joined_df = share_dataset(
+                    'joined', content_fingerprint(uploaded_file.getvalue(), tuple(selected_sheets)), joiner.join()
+                )
+                st.session_state.sheet_join_report = joiner.get_join_report()
+                count_stage('sheet_join')
+            else:
+                st.session_state.joined_df = share_dataset(
+                    'joined', content_fingerprint(uploaded_file.getvalue(), tuple(selected_sheets)), sheets[selected_sheets[0]]
+                )
+                st.session_state.sheet_join_report = None
+            st.session_state.sheet_join_key = join_key
+        df = st.session_state.joined_df
         
-        st.success(f"{translator.translate('upload_success')} ({len(df)} {translator.translate('stats_records')}، {len(df.columns)} {translator.translate('stats_columns')})")
+        if st.session_state.sheet_join_report:
+            st.success(translator.translate('sheets_joined').format(len(selected_sheets)))
+            with st.expander(translator.translate('sheets_join_report')):
+                st.json(st.session_state.sheet_join_report)
+    
+    st.success(f"{translator.translate('upload_success')} ({len(df)} {translator.translate('stats_records')}، {len(df.columns)} {translator.translate('stats_columns')})")
+    return df, content_fingerprint(uploaded_file.getvalue(), tuple(selected_sheets))
+
+def load_multiple_files(uploaded_files):
+    """دمج عدة ملفات: لا يعاد الدمج إلا إذا تغيرت الملفات المرفوعة"""
+    from modules.file_consolidator import FileConsolidator
+    from modules.fingerprint import content_fingerprint
+    
+    upload_key = tuple((f.name, f.size) for f in uploaded_files)
+    if st.session_state.get('consolidation_key') != upload_key:
+        get_worker_pool().cancel_user(get_session_id())
+        st.session_state.profile_source = None
+        consolidator = FileConsolidator(uploaded_files)
+        st.session_state.consolidation_fingerprint = content_fingerprint(
+            *(f.getvalue() for f in uploaded_files)
+        )
+        st.session_state.consolidated_df = share_dataset(
+            'consolidated', st.session_state.consolidation_fingerprint, consolidator.consolidate()
+        )
+        st.session_state.consolidation_info = consolidator.get_consolidation_info()
+        st.session_state.consolidation_key = upload_key
+        count_stage('load')
+    df = st.session_state.consolidated_df
+    info = st.session_state.consolidation_info
+    
+    st.success(f"{translator.translate('upload_consolidated').format(info['loaded'])} ({len(df)} {translator.translate('stats_records')}، {len(df.columns)} {translator.translate('stats_columns')})")
+    if info['errors']:
+        st.warning(translator.translate('upload_skipped_files') + "\n\n" + "\n".join(
+            f"- {name}: {error}" for name, error in info['errors'].items()
+        ))
+    with st.expander(translator.translate('consolidation_mappings')):
+        st.json(info['file_mappings'])
+    return df, st.session_state.consolidation_fingerprint
+
+def get_auto_suggestions():
+    """التعرف التلقائي على الأعمدة مرة واحدة لكل مجموعة بيانات"""
+    if st.session_state.get('suggestions_fingerprint') != st.session_state.df_fingerprint:
+        from modules.column_mapper import AutoColumnMapper
+        st.session_state.auto_suggestions = AutoColumnMapper(st.session_state.df).auto_detect_columns()
+        st.session_state.suggestions_fingerprint = st.session_state.df_fingerprint
+        count_stage('mapping_detection')
+    return st.session_state.auto_suggestions
+
+def get_category_aliases():
+    """الأسماء البديلة للفئات من الإعدادات المحفوظة والمتغير HR_CATEGORY_ALIASES"""
+    return load_aliases({'category_aliases': st.session_state.category_aliases})
+
+def get_analysis():
+    """تشغيل التحليل فقط عند تغير البيانات أو التعيين المعتمد أو الأسماء البديلة"""
+    mapping = st.session_state.get('analysis_mapping', st.session_state.column_mapping)
+    category_aliases = get_category_aliases()
+    analysis_key = (
+        st.session_state.df_fingerprint, json.dumps(mapping, sort_keys=True, ensure_ascii=False),
+        aliases_key(category_aliases)
+    )
+    if st.session_state.get('analysis_key') != analysis_key:
+        # التحليل في عملية منفصلة - تعود النتائج والأعمدة المحولة فقط
+        from modules.data_analyzer import FlexibleDataAnalyzer
+        pool = get_worker_pool()
+        fingerprint = st.session_state.df_fingerprint
+        result = pool.run(
+            get_session_id(), analyze_task, fingerprint,
+            pool.share_frame(fingerprint, st.session_state.df), mapping, category_aliases
+        )
+        modified = frame_from_shared(result['modified'], unlink=True) if result['modified'] is not None else None
+        analyzer = FlexibleDataAnalyzer(
+            apply_modified_columns(st.session_state.df, modified), mapping, category_aliases
+        )
+        st.session_state.analysis_results = result['analysis']
+        st.session_state.analyzer = analyzer
+        st.session_state.analysis_key = analysis_key
+        count_stage('analysis')
+    return st.session_state.analyzer, st.session_state.analysis_results, mapping
+
+def render_data_grid(df, grid_key, fingerprint):
+    """جدول مقسم لصفحات: الفرز والتصفية على الخادم وإرسال صفوف الصفحة الحالية فقط"""
+    grids = st.session_state.setdefault('data_grids', {})
+    if grid_key not in grids or grids[grid_key][0] != fingerprint:
+        from modules.data_grid import DataGrid
+        grids[grid_key] = (fingerprint, DataGrid(df))
+    grid = grids[grid_key][1]
+    
+    no_sort = translator.translate('grid_no_sort')
+    columns = [str(col) for col in df.columns]
+    col1, col2, col3, col4 = st.columns([3, 1, 3, 3])
+    with col1:
+        sort_choice = st.selectbox(translator.translate('grid_sort_by'), [no_sort] + columns, key=f"{grid_key}_sort")
+    with col2:
+        descending = st.checkbox(translator.translate('grid_descending'), key=f"{grid_key}_desc")
+    with col3:
+        filter_choice = st.selectbox(translator.translate('grid_filter_column'), [no_sort] + columns, key=f"{grid_key}_filter_col")
+    with col4:
+        filter_text = st.text_input(translator.translate('grid_filter_text'), key=f"{grid_key}_filter_text")
+    
+    sort_by = df.columns[columns.index(sort_choice)] if sort_choice != no_sort else None
+    filter_column = df.columns[columns.index(filter_choice)] if filter_choice != no_sort else None
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox(translator.translate('grid_page_size'), [25, 50, 100, 500], key=f"{grid_key}_page_size")
+    with col2:
+        page = st.number_input(translator.translate('grid_page'), min_value=1, value=1, step=1, key=f"{grid_key}_page")
+    
+    window, matched, page_count = grid.page(page, page_size, sort_by, not descending, filter_column, filter_text)
+    page = min(page, page_count)
+    first_row = (page - 1) * page_size + 1 if matched else 0
+    st.dataframe(window, use_container_width=True)
+    st.caption(translator.translate('grid_showing').format(
+        first_row, first_row + len(window) - 1 if matched else 0, matched, page, page_count
+    ))
+
+# ==================== الصفحة الرئيسية - تحميل الملف ====================
+@st.fragment
+@instrumented('render.upload')
+def render_upload_section():
+    st.markdown(f"## {translator.translate('upload_title')}")
+    
+    uploaded_files = st.file_uploader(
+        translator.translate('upload_placeholder'),
+        type=['xlsx', 'xls', 'csv'],
+        help=translator.translate('upload_help'),
+        accept_multiple_files=True
+    )
+    
+    if not uploaded_files:
+        return
+    
+    try:
+        if len(uploaded_files) == 1:
+            # تحميل الملف باستخدام المنظم الذكي
+            df, fingerprint = load_single_file(uploaded_files[0])
+        else:
+            df, fingerprint = load_multiple_files(uploaded_files)
         
         # عرض عينة من البيانات
         with st.expander(translator.translate('preview_data')):
-            st.dataframe(df.head(), use_container_width=True)
+            render_data_grid(df, 'preview_grid', fingerprint)
         
         # عرض معلومات الأعمدة
         col1, col2, col3 = st.columns(3)
@@ -435,22 +500,34 @@ if uploaded_file is not None:
         with col2:
             st.metric(translator.translate('stats_columns'), len(df.columns))
         with col3:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            numeric_cols = df.select_dtypes(include='number').columns.tolist()
             st.metric(translator.translate('stats_numeric'), len(numeric_cols))
         
     except Exception as e:
         st.error(f"{translator.translate('upload_error')} {str(e)}")
+        return
+    
+    # بيانات جديدة: إعادة تشغيل الصفحة كاملة لإظهار تعيين الأعمدة وإلغاء التحليل السابق
+    if st.session_state.get('df_fingerprint') != fingerprint:
+        st.session_state.df = share_dataset('active', fingerprint, df)
+        st.session_state.df_fingerprint = fingerprint
+        st.session_state.source_file_name = uploaded_files[0].name
+        st.session_state.file_uploaded = True
+        st.session_state.analysis_ready = False
+        st.session_state.report_generated = False
+        st.rerun()
 
 # ==================== تعيين الأعمدة ====================
-if st.session_state.file_uploaded and st.session_state.df is not None:
+@st.fragment
+@instrumented('render.mapping')
+def render_mapping_section():
     st.markdown(f"## {translator.translate('mapping_title')}")
     
     df = st.session_state.df
     columns = df.columns.tolist()
     
     # التعرف التلقائي على الأعمدة
-    mapper = AutoColumnMapper(df)
-    auto_suggestions = mapper.auto_detect_columns()
+    auto_suggestions = get_auto_suggestions()
     
     st.markdown(translator.translate('mapping_auto'), unsafe_allow_html=True)
     
@@ -459,12 +536,12 @@ if st.session_state.file_uploaded and st.session_state.df is not None:
     
     # عرض تعيين الأعمدة لكل فئة
     categories = {
-        translator.translate('cat_employee_info'): ["employee_name", "employee_id", "department", "position", "hire_date"],
+        translator.translate('cat_employee_info'): ["employee_name", "employee_id", "department", "position", "hire_date", "gender"],
         translator.translate('cat_financial'): ["salary", "allowances", "bonus", "tax"],
         translator.translate('cat_performance'): ["performance_score", "kpi", "rating", "review_date"],
         translator.translate('cat_attendance'): ["attendance_days", "absent_days", "late_days", "overtime_hours"],
         translator.translate('cat_training'): ["trainings_completed", "training_hours", "certifications"],
-        translator.translate('cat_management'): ["manager", "location", "employment_type", "status"]
+        translator.translate('cat_management'): ["manager", "location", "employment_type", "status", "termination_date"]
     }
     
     for category, fields in categories.items():
@@ -497,23 +574,18 @@ if st.session_state.file_uploaded and st.session_state.df is not None:
     
     st.session_state.column_mapping = column_mapping
     
-    # زر للمتابعة للتحليل
+    # زر للمتابعة للتحليل: يعتمد التعيين الحالي ويعيد تشغيل أقسام التحليل
     if st.button(translator.translate('analyze_button'), type="primary", use_container_width=True):
+        st.session_state.analysis_mapping = dict(column_mapping)
         st.session_state.analysis_ready = True
+        st.session_state.report_generated = False
         st.rerun()
 
 # ==================== التحليل الذكي ====================
-if st.session_state.get('analysis_ready', False):
-    st.markdown(f"## {translator.translate('analysis_title')}")
-    
-    analyzer = FlexibleDataAnalyzer(
-        st.session_state.df, 
-        st.session_state.column_mapping
-    )
-    
-    # التحليل الذكي للبيانات
-    analysis = analyzer.analyze_all()
-    st.session_state.analysis_results = analysis
+@st.fragment
+@instrumented('render.kpis')
+def render_kpis_section():
+    _, analysis, _ = get_analysis()
     
     # عرض النتائج الرئيسية
     st.markdown(f"### {translator.translate('kpis_title')}")
@@ -542,23 +614,80 @@ if st.session_state.get('analysis_ready', False):
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
+
+def record_chart_reports(reports):
+    """حفظ تقارير حجم الرسوم في الجلسة وعد الرسوم التي أنشئت فعلياً"""
+    chart_reports = st.session_state.setdefault('chart_reports', {})
+    for report in reports:
+        chart_reports[report['chart']] = report
+        if not report['cached']:
+            count_stage('chart_build')
+
+@st.fragment
+@instrumented('render.charts')
+def render_charts_section():
+    # plotly.express يُحمّل مع وحدة الرسوم عند أول عرض للرسوم فقط
+    from modules.smart_visualizer import SmartVisualizer
+    
+    _, analysis, mapping = get_analysis()
     
     # الرسوم البيانية الذكية
     st.markdown(f"### {translator.translate('charts_title')}")
     
     visualizer = SmartVisualizer(
         st.session_state.df,
-        st.session_state.column_mapping,
-        analysis
+        mapping,
+        analysis,
+        figure_cache=get_figure_cache(),
+        fingerprint=st.session_state.get('df_fingerprint'),
+        language=st.session_state.language,
+        theme=st.session_state.theme,
+        chart_budget=get_chart_budget(),
+        category_aliases=get_category_aliases()
     )
     
-    # عرض الرسوم حسب توفر البيانات
-    charts = visualizer.generate_all_charts()
+    # الرسوم غير الموجودة في الذاكرة المؤقتة تُنشأ دفعة واحدة في عملية منفصلة
+    if not visualizer.has_cached_charts():
+        pool = get_worker_pool()
+        fingerprint = st.session_state.df_fingerprint
+        entries = pool.run(
+            get_session_id(), charts_task, fingerprint,
+            pool.share_frame(fingerprint, st.session_state.df), mapping, analysis,
+            st.session_state.language, st.session_state.theme, visualizer.histogram_bins,
+            visualizer.category_aliases
+        )
+        visualizer.store_cache_entries(entries)
+        count_stage('chart_worker')
+    
+    # حجز مكان لكل رسم متاح ثم إنشاؤها بالتتابع حتى يظهر الأول قبل اكتمال البقية
+    chart_slots = []
+    for descriptor in visualizer.get_chart_descriptors():
+        slot = st.empty()
+        with slot.container():
+            st.markdown(f"#### {descriptor.title}")
+            st.caption(translator.translate('loading'))
+        chart_slots.append((slot, descriptor))
     
-    for chart_info in charts:
-        if chart_info['available']:
-            st.markdown(f"#### {chart_info['title']}")
-            st.plotly_chart(chart_info['figure'], use_container_width=True)
+    for slot, descriptor in chart_slots:
+        chart_info = descriptor.build()
+        if chart_info and chart_info['available']:
+            with slot.container():
+                st.markdown(f"#### {chart_info['title']}")
+                st.plotly_chart(chart_info['figure'], use_container_width=True)
+        else:
+            slot.empty()
+    
+    record_chart_reports(visualizer.chart_reports)
+
+@st.fragment
+@instrumented('render.advanced')
+def render_advanced_section():
+    import numpy as np
+    import pandas as pd
+    
+    _, analysis, mapping = get_analysis()
+    figure_cache = get_figure_cache()
+    chart_budget = get_chart_budget()
     
     # تحليل إضافي
     with st.expander(translator.translate('advanced_title')):
@@ -573,24 +702,46 @@ if st.session_state.get('analysis_ready', False):
         if len(numeric_cols) >= 2:
             st.markdown(f"#### {translator.translate('correlations_title')}")
             
-            # خريطة حرارية للعلاقات
-            numeric_df = st.session_state.df[numeric_cols]
-            corr_matrix = numeric_df.corr()
-            
-            import plotly.express as px
-            fig = px.imshow(
-                corr_matrix,
-                text_auto='.2f',
-                color_continuous_scale='RdBu',
-                aspect="auto",
-                title=translator.translate('correlations_title')
+            # خريطة حرارية للعلاقات (من الذاكرة المؤقتة إن وجدت)
+            heatmap_key = FigureCache.make_key(
+                st.session_state.get('df_fingerprint'), 'correlation_heatmap',
+                {col: col for col in numeric_cols}, numeric_cols,
+                st.session_state.language, st.session_state.theme
             )
+            heatmap_json = figure_cache.get(heatmap_key) if st.session_state.get('df_fingerprint') else None
+            
+            if heatmap_json is None:
+                build_start = time.perf_counter()
+                numeric_df = st.session_state.df[numeric_cols]
+                corr_matrix = numeric_df.corr()
+                
+                import plotly.express as px
+                fig = px.imshow(
+                    corr_matrix,
+                    text_auto='.2f',
+                    color_continuous_scale='RdBu',
+                    aspect="auto",
+                    title=translator.translate('correlations_title'),
+                    template='plotly_dark' if st.session_state.theme == 'dark' else 'plotly_white'
+                )
+                fig, heatmap_report = chart_budget.enforce(
+                    'correlation_heatmap', fig, time.perf_counter() - build_start
+                )
+                if st.session_state.get('df_fingerprint'):
+                    figure_cache.put(heatmap_key, json.dumps({'figure': fig.to_json(), 'report': heatmap_report}))
+            else:
+                import plotly.io as pio
+                heatmap_entry = json.loads(heatmap_json)
+                fig = pio.from_json(heatmap_entry['figure'], skip_invalid=True)
+                heatmap_report = dict(heatmap_entry['report'], cached=True, build_ms=0.0)
+            record_chart_reports([heatmap_report])
+            
             st.plotly_chart(fig, use_container_width=True)
         
         # اكتشاف القيم الشاذة
         st.markdown(f"#### {translator.translate('outliers_title')}")
-        if 'salary' in st.session_state.column_mapping:
-            salary_col = st.session_state.column_mapping['salary']
+        if 'salary' in mapping:
+            salary_col = mapping['salary']
             if salary_col in st.session_state.df.columns:
                 try:
                     salary_data = st.session_state.df[salary_col].dropna()
@@ -607,24 +758,277 @@ if st.session_state.get('analysis_ready', False):
                             
                             if len(outliers) > 0:
                                 st.warning(translator.translate('outliers_found').format(len(outliers)))
-                                st.dataframe(outliers[[salary_col]], use_container_width=True)
+                                render_data_grid(
+                                    outliers[[salary_col]], 'outliers_grid',
+                                    (st.session_state.get('df_fingerprint'), salary_col)
+                                )
                             else:
                                 st.success(translator.translate('no_outliers'))
                         else:
                             st.info(translator.translate('zero_std'))
                 except Exception as e:
                     st.error(f"خطأ في اكتشاف القيم الشاذة: {str(e)}")
+        
+        render_pay_equity(analysis.get('pay_equity', {}))
+        render_attrition(analysis.get('attrition', {}))
+        render_attendance(analysis.get('attendance', {}))
+        render_snapshots(analysis)
+
+def render_pay_equity(pay_equity):
+    """الفجوة المعدلة في الرواتب حسب الجنس: الإجمالي ثم لكل قسم ثم تفكيك Oaxaca لكل جنس"""
+    import pandas as pd
+    
+    st.markdown(f"#### {translator.translate('pay_equity_title')}")
+    if not pay_equity.get('available'):
+        st.info(translator.translate('pay_equity_unavailable').format(pay_equity.get('reason', '')))
+        return
+    
+    confidence = int(pay_equity['confidence'] * 100)
+    st.caption(translator.translate('pay_equity_hint').format(pay_equity['reference_gender'], confidence))
+    
+    overall = pay_equity.get('overall')
+    if overall:
+        cols = st.columns(max(1, len(overall['gaps'])))
+        for col, gap in zip(cols, overall['gaps']):
+            with col:
+                st.metric(
+                    gap['gender'], f"{gap['adjusted_gap']:,.0f}",
+                    f"{gap['gap_pct']:+.1f}%", delta_color='off'
+                )
+                st.caption(f"{confidence}%: [{gap['ci_low']:,.0f} ، {gap['ci_high']:,.0f}]")
+    
+    rows = [
+        {
+            translator.translate('field_department'): entry['department'],
+            translator.translate('pay_equity_gender'): gap['gender'],
+            translator.translate('pay_equity_count'): entry['n'],
+            translator.translate('pay_equity_gap'): round(gap['adjusted_gap']),
+            translator.translate('pay_equity_ci_low'): round(gap['ci_low']),
+            translator.translate('pay_equity_ci_high'): round(gap['ci_high']),
+            translator.translate('pay_equity_significant'): '✓' if gap['significant'] else ''
+        }
+        for entry in pay_equity['by_department'] for gap in entry['gaps']
+    ]
+    if rows:
+        st.markdown(f"**{translator.translate('pay_equity_by_department')}**")
+        render_data_grid(
+            pd.DataFrame(rows), 'pay_equity_grid',
+            (st.session_state.get('analysis_key'), st.session_state.language)
+        )
+    
+    rows = [
+        {
+            translator.translate('pay_equity_gender'): entry['gender'],
+            translator.translate('pay_equity_raw_gap'): round(entry['decomposition']['raw_gap']),
+            translator.translate('pay_equity_explained'): round(entry['decomposition']['explained']),
+            translator.translate('pay_equity_unexplained'): round(entry['decomposition']['unexplained']),
+            translator.translate('pay_equity_ci_low'): round(entry['decomposition']['ci_low']),
+            translator.translate('pay_equity_ci_high'): round(entry['decomposition']['ci_high']),
+            translator.translate('pay_equity_significant'): '✓' if entry['decomposition']['significant'] else ''
+        }
+        for entry in pay_equity['by_gender'] if entry.get('decomposition')
+    ]
+    if rows:
+        st.markdown(f"**{translator.translate('pay_equity_decomposition')}**")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def render_attrition(attrition):
+    """دوران الموظفين: المؤشرات العامة ثم نسب خطر ترك العمل لكل قسم وموقع"""
+    import pandas as pd
+    
+    st.markdown(f"#### {translator.translate('attrition_title')}")
+    if not attrition.get('available'):
+        st.info(translator.translate('attrition_unavailable').format(attrition.get('reason', '')))
+        return
+    
+    survival = attrition.get('survival')
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(
+            translator.translate('attrition_turnover'), f"{attrition['turnover_rate']:.1f}%",
+            f"{attrition['leavers']:,} / {attrition['headcount']:,}", delta_color='off'
+        )
+    if survival:
+        median_years = survival['overall']['median_years']
+        with col2:
+            st.metric(translator.translate('attrition_retention_1y'), f"{survival['overall']['retention_1y']:.1f}%")
+        with col3:
+            st.metric(
+                translator.translate('attrition_median_tenure'),
+                f"{median_years:.1f}" if median_years is not None else "—"
+            )
+    else:
+        st.caption(translator.translate('attrition_no_survival'))
+    
+    rows = [
+        {
+            translator.translate('attrition_group'): translator.translate(f'field_{field}'),
+            translator.translate('attrition_value'): hazard['group'],
+            translator.translate('pay_equity_count'): hazard['n'],
+            translator.translate('attrition_leavers'): hazard['events'],
+            translator.translate('attrition_hazard_ratio'): round(hazard['hazard_ratio'], 2),
+            translator.translate('pay_equity_ci_low'): round(hazard['ci_low'], 2),
+            translator.translate('pay_equity_ci_high'): round(hazard['ci_high'], 2),
+            translator.translate('pay_equity_significant'): '✓' if hazard['significant'] else ''
+        }
+        for field, hazards in attrition['hazards'].items() for hazard in hazards
+    ]
+    if rows:
+        st.markdown(f"**{translator.translate('attrition_hazards')}**")
+        render_data_grid(
+            pd.DataFrame(rows), 'attrition_grid',
+            (st.session_state.get('analysis_key'), st.session_state.language)
+        )
+
+def render_attendance(attendance):
+    """الحضور والعمل الإضافي والتدريب: مؤشرات عامة ثم جدول واحد لكل قسم"""
+    import pandas as pd
+    
+    if not attendance.get('available'):
+        return
+    st.markdown(f"#### {translator.translate('attendance_title')}")
+    absence, overtime, training = attendance['absence'], attendance['overtime'], attendance['training']
+    
+    metrics = []
+    if absence and absence['overall'].get('absence_rate') is not None:
+        metrics.append((translator.translate('attendance_absence_rate'), f"{absence['overall']['absence_rate']:.1f}%"))
+    elif absence and absence['overall'].get('avg_absent_days') is not None:
+        metrics.append((translator.translate('attendance_avg_absent'), f"{absence['overall']['avg_absent_days']:.1f}"))
+    if overtime and overtime['gini'] is not None:
+        metrics.append((translator.translate('attendance_overtime_gini'), f"{overtime['gini']:.2f}"))
+        metrics.append((translator.translate('attendance_top_share'), f"{overtime['top_10pct_share']:.1f}%"))
+    if training and training['overall']['coverage_pct'] is not None:
+        metrics.append((translator.translate('attendance_training_coverage'), f"{training['overall']['coverage_pct']:.1f}%"))
+    if metrics:
+        for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+            with col:
+                st.metric(label, value)
+    
+    # جدول واحد لكل قسم يجمع المقاييس الثلاثة
+    rows = {}
+    for row in (absence or {}).get('by_department', []):
+        entry = rows.setdefault(row['department'], {translator.translate('pay_equity_count'): row['employees']})
+        if row.get('absence_rate') is not None:
+            entry[translator.translate('attendance_absence_rate')] = round(row['absence_rate'], 1)
+        if row.get('avg_absent_days') is not None:
+            entry[translator.translate('attendance_avg_absent')] = round(row['avg_absent_days'], 1)
+    for row in (overtime or {}).get('by_department', []):
+        entry = rows.setdefault(row['department'], {translator.translate('pay_equity_count'): row['employees']})
+        entry[translator.translate('attendance_overtime_share')] = round(row['share'], 1)
+    for row in (training or {}).get('by_department', []):
+        entry = rows.setdefault(row['department'], {translator.translate('pay_equity_count'): row['employees']})
+        if row['coverage_pct'] is not None:
+            entry[translator.translate('attendance_training_coverage')] = round(row['coverage_pct'], 1)
+    if rows:
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        table.index.name = translator.translate('field_department')
+        render_data_grid(
+            table.reset_index(), 'attendance_grid',
+            (st.session_state.get('analysis_key'), st.session_state.language)
+        )
+    
+    if overtime and overtime['top_employees']:
+        st.markdown(f"**{translator.translate('attendance_top_overtime')}**")
+        st.dataframe(
+            pd.DataFrame(overtime['top_employees']).rename(columns={
+                'employee': translator.translate('field_employee_name'),
+                'hours': translator.translate('field_overtime_hours'),
+                'share': translator.translate('attendance_overtime_share')
+            }).round(1),
+            use_container_width=True, hide_index=True
+        )
+
+def render_snapshots(analysis):
+    """حفظ التحليل كلقطة لفترة ومقارنة أحدث فترة بالشهر السابق والسنة السابقة من فهرس اللقطات (دون الملفات الخام)"""
+    import sqlite3
+    import pandas as pd
+    from modules.snapshot_store import period_from_name, source_from_name
+    
+    st.markdown(f"#### {translator.translate('snapshots_title')}")
+    file_name = st.session_state.get('source_file_name') or 'dataset'
+    fingerprint = st.session_state.get('df_fingerprint')
+    col1, col2 = st.columns(2)
+    with col1:
+        source = st.text_input(
+            translator.translate('snapshots_source'), value=source_from_name(file_name), key=f"snapshot_source_{fingerprint}"
+        ).strip() or source_from_name(file_name)
+    with col2:
+        period = st.text_input(
+            translator.translate('snapshots_period'),
+            value=period_from_name(file_name, datetime.now().strftime('%Y-%m')), key=f"snapshot_period_{fingerprint}"
+        ).strip()
+    
+    try:
+        store = get_snapshot_store()
+        if st.button(translator.translate('snapshots_save'), key='snapshot_save'):
+            try:
+                saved = store.save(analysis, source, period, fingerprint=fingerprint, rows=len(st.session_state.df))
+                st.success(translator.translate('snapshots_saved').format(source, saved))
+            except ValueError:
+                st.error(translator.translate('snapshots_invalid_period'))
+        history = store.kpi_history(source)
+    except sqlite3.Error as e:
+        st.error(f"{translator.translate('snapshots_error')} {str(e)}")
+        return
+    
+    if history.empty:
+        st.info(translator.translate('snapshots_empty'))
+        return
+    
+    # أسماء المؤشرات كما في بطاقات النتائج الرئيسية
+    kpis = analysis.get('kpis', {})
+    labels = {name: kpis.get(name, {}).get('label', name) for name in history['kpi'].unique()}
+    latest = history['period'].max()
+    current = history[history['period'] == latest]
+    st.markdown(f"**{translator.translate('snapshots_compare').format(latest)}**")
+    st.caption(f"{translator.translate('snapshots_count')}: {history['period'].nunique()}")
+    st.dataframe(
+        pd.DataFrame({
+            translator.translate('snapshots_kpi'): current['kpi'].map(labels),
+            translator.translate('snapshots_value'): current['value'],
+            translator.translate('snapshots_mom'): current['mom_pct'],
+            translator.translate('snapshots_yoy'): current['yoy_pct']
+        }).round(2),
+        use_container_width=True, hide_index=True
+    )
+    
+    kpi = st.selectbox(
+        translator.translate('snapshots_trend'), list(labels), format_func=labels.get, key='snapshot_trend_kpi'
+    )
+    st.line_chart(history[history['kpi'] == kpi].set_index('period')['value'])
+
+def render_debug_panel():
+    """لوحة التشخيص: حجم الرسوم قبل/بعد التقليل وعدد مرات تنفيذ كل مرحلة"""
+    if not st.session_state.get('debug_charts'):
+        return
+    with st.expander(translator.translate('debug_panel_title'), expanded=True):
+        chart_reports = st.session_state.get('chart_reports', {})
+        if chart_reports:
+            import pandas as pd
+            st.dataframe(pd.DataFrame(list(chart_reports.values())), use_container_width=True)
+        st.json(get_figure_cache().get_stats())
+        st.markdown(f"**{translator.translate('debug_stage_counts')}**")
+        st.json(st.session_state.get('stage_counts', {}))
+
+# ==================== التقرير النصي المباشر ====================
+@st.fragment
+@instrumented('render.report')
+def render_report_section():
+    analyzer, _, _ = get_analysis()
     
-    # ==================== التقرير النصي المباشر ====================
     st.markdown(f"## {translator.translate('report_title')}")
     
-    # زر إنشاء التقرير
+    # زر إنشاء التقرير (يعيد تشغيل هذا القسم فقط)
     if st.button(translator.translate('generate_report'), type="secondary", use_container_width=True):
         with st.spinner("جاري إنشاء التقرير..."):
             report_text = analyzer.generate_report()
             st.session_state.report_text = report_text
             st.session_state.report_generated = True
-            st.rerun()
+            count_stage('report')
+    
+    # استعراض البيانات المعدلة كاملة دون إرسالها للمتصفح دفعة واحدة
+    with st.expander(translator.translate('browse_data')):
+        render_data_grid(analyzer.get_modified_dataframe(), 'modified_grid', st.session_state.analysis_key)
     
     # عرض التقرير إذا تم إنشاؤه
     if st.session_state.report_generated and st.session_state.report_text:
@@ -639,18 +1043,61 @@ if st.session_state.get('analysis_ready', False):
         with col1:
             # نسخ التقرير إلى الحافظة
             if st.button("📋 نسخ التقرير إلى الحافظة", use_container_width=True):
-                st.session_state.report_text = analyzer.generate_report()
                 st.code(st.session_state.report_text, language="text")
                 st.success("✓ تم نسخ التقرير إلى الحافظة")
         
         with col2:
-            # تصدير البيانات المعدلة فقط
-            if st.button(translator.translate('export_data'), use_container_width=True):
-                modified_df = analyzer.get_modified_dataframe()
-                csv = modified_df.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label=translator.translate('download_csv'),
-                    data=csv,
-                    file_name="hr_data_modified.csv",
-                    mime="text/csv"
-                )
\ No newline at end of file
+            # تصدير البيانات المعدلة: يُنشأ الملف على دفعات عند الضغط على التحميل فقط
+            from modules.data_exporter import EXPORT_FORMATS, available_formats
+            from modules.fingerprint import content_fingerprint
+            modified_df = analyzer.get_modified_dataframe()
+            export_format = st.selectbox(translator.translate('export_format'), available_formats())
+            export_fingerprint = content_fingerprint(*st.session_state.analysis_key)
+            extension, mime, _ = EXPORT_FORMATS[export_format]
+            # الملف يُنشأ في خيط منفصل عند الضغط (أوامر Streamlit داخله تُهمل): الخطأ يُحفظ ويظهر في التشغيل التالي
+            export_errors = st.session_state.setdefault('export_errors', {})
+            export_error = export_errors.pop((export_fingerprint, export_format), None)
+            if export_error:
+                st.error(f"{translator.translate('export_error')} {export_error}")
+
+            def export_data():
+                try:
+                    return get_export_cache().read(export_fingerprint, export_format, modified_df)
+                except Exception as e:
+                    logging.getLogger('hr_dashboard').exception("export_failed %s", export_format)
+                    export_errors[(export_fingerprint, export_format)] = str(e)
+                    raise
+
+            st.download_button(
+                label=translator.translate('export_data'),
+                data=export_data,
+                file_name=f"hr_data_modified.{extension}",
+                mime=mime,
+                on_click='ignore',
+                use_container_width=True
+            )
+
+# ==================== ترتيب الصفحة ====================
+render_upload_section()
+
+# تجديد حجز البيانات في السجل المشترك (الحجوزات تنتهي بعد خمول الجلسة)
+if st.session_state.df is not None and st.session_state.get('df_fingerprint'):
+    try:
+        st.session_state.df = share_dataset('active', st.session_state.df_fingerprint, st.session_state.df)
+    except MemoryError as e:
+        st.error(str(e))
+        st.stop()
+
+if st.session_state.file_uploaded and st.session_state.df is not None:
+    render_mapping_section()
+
+if st.session_state.get('analysis_ready', False) and st.session_state.df is not None:
+    st.markdown(f"## {translator.translate('analysis_title')}")
+    render_kpis_section()
+    render_charts_section()
+    render_advanced_section()
+    render_debug_panel()
+    render_report_section()
+
+render_perf_panel()
+render_profile_panel()
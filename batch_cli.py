@@ -0,0 +1,87 @@
+"""
+واجهة سطر الأوامر لتحليل عدة ملفات موارد بشرية دفعة واحدة
+
+مثال:
+    python batch_cli.py "branches/*.xlsx" -o reports --workers 8
+    python batch_cli.py branches/ -o reports --mapping config.json
+    python batch_cli.py slow_file.xlsx -o reports --profile
+    python batch_cli.py "monthly/hr_*.xlsx" -o reports --snapshot-db snapshots/hr_snapshots.sqlite
+"""
+
+import argparse
+import json
+import os
+import sys
+from modules.batch_runner import BatchRunner, discover_files
+from modules.profiler import PipelineProfiler
+from modules.category_normalizer import load_aliases
+
+def load_saved_mapping(path):
+    """قراءة تعيين الأعمدة من ملف إعدادات محفوظ من لوحة التحكم"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get('column_mapping', config)
+
+def load_saved_aliases(path):
+    """الأسماء البديلة للفئات من نفس ملف الإعدادات (مع HR_CATEGORY_ALIASES)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return load_aliases(config if 'column_mapping' in config else None)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='تحليل دفعي لملفات الموارد البشرية (Excel / CSV)')
+    parser.add_argument('inputs', nargs='+', help='مجلدات أو أنماط glob أو مسارات ملفات')
+    parser.add_argument('-o', '--output-dir', default='batch_output', help='مجلد كتابة التقارير ونتائج JSON')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='عدد العمليات المتوازية (الافتراضي: عدد المعالجات)')
+    parser.add_argument('-m', '--mapping', default=None, help='ملف config.json يحتوي تعيين أعمدة محفوظ بدلاً من التعرف التلقائي')
+    parser.add_argument('--profile', action='store_true', default=PipelineProfiler.enabled_from_env(),
+                        help='تحليل عميق لكل ملف: عينات المعالج (flamegraph) وحجز الذاكرة لكل مرحلة (أو HR_PROFILE=1)')
+    parser.add_argument('--snapshot-db', default=None,
+                        help='حفظ نتائج كل ملف كلقطة تاريخية في قاعدة SQLite (الفترة من اسم الملف مثل hr_2024-03.xlsx)')
+    parser.add_argument('--source', default=None, help='اسم المصدر للقطات (الافتراضي: اسم الملف بدون الفترة)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    files = discover_files(args.inputs)
+    if not files:
+        print('لم يتم العثور على ملفات مدعومة (.xlsx, .xls, .csv)', file=sys.stderr)
+        return 2
+
+    column_mapping = load_saved_mapping(args.mapping) if args.mapping else None
+    category_aliases = load_saved_aliases(args.mapping) if args.mapping else None
+    runner = BatchRunner(
+        args.output_dir, workers=args.workers, column_mapping=column_mapping, profile=args.profile,
+        snapshot_db=args.snapshot_db, source=args.source, category_aliases=category_aliases
+    )
+
+    print(f"معالجة {len(files)} ملف باستخدام {runner.workers} عملية...")
+
+    def on_result(summary):
+        name = os.path.basename(summary['file'])
+        total = summary['timings'].get('total', 0.0)
+        if summary['status'] == 'ok':
+            print(f"  ✓ {name} ({summary['rows']} سجل، {total:.2f}s)")
+            if summary.get('snapshot'):
+                print(f"    لقطة الفترة: {summary['snapshot']}")
+            if summary.get('profile'):
+                print(f"    التحليل العميق: {summary['profile']}")
+        else:
+            print(f"  ✗ {name}: {summary['error']}", file=sys.stderr)
+
+    batch_summary = runner.run(files, on_result=on_result)
+
+    print()
+    print(f"{'المرحلة':<10} {'المجموع':>10} {'المتوسط':>10} {'الأقصى':>10}")
+    for stage, stats in batch_summary['stage_totals'].items():
+        print(f"{stage:<10} {stats['sum']:>9.2f}s {stats['mean']:>9.3f}s {stats['max']:>9.3f}s")
+    print()
+    print(f"نجح: {batch_summary['succeeded']}  فشل: {batch_summary['failed']}  "
+          f"الزمن الكلي: {batch_summary['wall_time']:.2f}s")
+    print(f"الملخص: {os.path.join(args.output_dir, 'batch_summary.json')}")
+
+    return 1 if batch_summary['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
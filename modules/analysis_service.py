@@ -0,0 +1,223 @@
+"""
+خدمة HTTP محلية (ASGI) للتحليل البرمجي بدون واجهة Streamlit
+
+التشغيل:
+    uvicorn modules.analysis_service:app --host 127.0.0.1 --port 8765
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from modules.file_loader import SmartFileLoader, BytesUpload
+from modules.column_mapper import AutoColumnMapper
+from modules.data_analyzer import FlexibleDataAnalyzer
+from modules.pipeline import make_json_safe
+
+# ==================== دوال العمليات المنفصلة ====================
+# ذاكرة مؤقتة صغيرة داخل كل عملية لتجنب إعادة قراءة نفس الملف
+_WORKER_FRAMES = OrderedDict()
+_WORKER_FRAMES_MAX = 4
+
+def _load_frame(content_hash, content, filename):
+    """تحميل الملف داخل العملية مع إعادة استخدام آخر الملفات المحملة"""
+    if content_hash in _WORKER_FRAMES:
+        _WORKER_FRAMES.move_to_end(content_hash)
+        return _WORKER_FRAMES[content_hash]
+
+    df = SmartFileLoader(BytesUpload(content, filename)).load_file()
+    _WORKER_FRAMES[content_hash] = df
+    while len(_WORKER_FRAMES) > _WORKER_FRAMES_MAX:
+        _WORKER_FRAMES.popitem(last=False)
+    return df
+
+def _resolve_mapping(df, column_mapping):
+    if column_mapping:
+        return {k: v for k, v in column_mapping.items() if isinstance(v, str) and v in df.columns}
+    return AutoColumnMapper(df).auto_detect_columns()
+
+def suggest_mapping_task(content_hash, content, filename):
+    df = _load_frame(content_hash, content, filename)
+    mapper = AutoColumnMapper(df)
+    return make_json_safe({
+        'columns': df.columns.tolist(),
+        'rows': len(df),
+        'column_mapping': mapper.auto_detect_columns(),
+        'column_types': mapper.suggest_column_types()
+    })
+
+def analyze_task(content_hash, content, filename, column_mapping):
+    df = _load_frame(content_hash, content, filename)
+    mapping = _resolve_mapping(df, column_mapping)
+    analysis = FlexibleDataAnalyzer(df, mapping).analyze_all()
+    return make_json_safe({'column_mapping': mapping, 'analysis': analysis})
+
+def charts_task(content_hash, content, filename, column_mapping):
+    from modules.smart_visualizer import SmartVisualizer
+
+    df = _load_frame(content_hash, content, filename)
+    mapping = _resolve_mapping(df, column_mapping)
+    analysis = FlexibleDataAnalyzer(df, mapping).analyze_all()
+    charts = SmartVisualizer(df, mapping, analysis).generate_all_charts()
+    return {
+        'column_mapping': make_json_safe(mapping),
+        'charts': [
+            {'title': chart['title'], 'figure': json.loads(chart['figure'].to_json())}
+            for chart in charts if chart['available']
+        ]
+    }
+
+# ==================== الذاكرة المؤقتة للنتائج ====================
+class ResultCache:
+    """ذاكرة LRU للنتائج مع دمج الطلبات المتزامنة لنفس المفتاح"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_compute(self, key, compute):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        # طلب مماثل قيد التنفيذ: انتظار نفس النتيجة بدلاً من حسابها مرتين
+        if key in self.in_flight:
+            self.hits += 1
+            return await asyncio.shield(self.in_flight[key])
+
+        self.misses += 1
+        future = asyncio.ensure_future(compute())
+        self.in_flight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self.in_flight.pop(key, None)
+
+        self.entries[key] = result
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return result
+
+class UploadStore:
+    """تخزين محتوى الملفات المرفوعة حسب بصمة المحتوى مع حد أقصى للحجم"""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.files = OrderedDict()
+        self.total_bytes = 0
+
+    def add(self, content, filename):
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash in self.files:
+            self.files.move_to_end(content_hash)
+            return content_hash
+
+        self.files[content_hash] = (filename, content)
+        self.total_bytes += len(content)
+        while self.total_bytes > self.max_bytes and len(self.files) > 1:
+            _, (_, old_content) = self.files.popitem(last=False)
+            self.total_bytes -= len(old_content)
+        return content_hash
+
+    def get(self, content_hash):
+        if content_hash not in self.files:
+            raise HTTPException(status_code=404, detail='الملف غير موجود، الرجاء رفعه مرة أخرى')
+        self.files.move_to_end(content_hash)
+        return self.files[content_hash]
+
+# ==================== تطبيق ASGI ====================
+def _mapping_key(column_mapping):
+    return json.dumps(column_mapping or {}, sort_keys=True, ensure_ascii=False)
+
+async def _read_mapping(request):
+    body = await request.body()
+    if not body:
+        return None
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail='جسم الطلب ليس JSON صالحاً')
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail='جسم الطلب يجب أن يكون كائن JSON')
+    column_mapping = payload.get('column_mapping') or None
+    if column_mapping is not None and not (
+        isinstance(column_mapping, dict)
+        and all(isinstance(k, str) and isinstance(v, str) for k, v in column_mapping.items())
+    ):
+        raise HTTPException(status_code=422, detail='column_mapping يجب أن يربط أسماء الحقول بأسماء الأعمدة (نصوص)')
+    return column_mapping
+
+def create_app(workers=None, cache_entries=256, max_upload_bytes=512 * 1024 * 1024):
+    """إنشاء تطبيق الخدمة مع مجموعة عمليات للأعمال الثقيلة"""
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        state['executor'] = ProcessPoolExecutor(max_workers=workers)
+        yield
+        state['executor'].shutdown(cancel_futures=True)
+
+    app = FastAPI(title='HR Analysis Service', lifespan=lifespan)
+    uploads = UploadStore(max_upload_bytes)
+    cache = ResultCache(cache_entries)
+
+    async def run_cached(kind, content_hash, task, *extra_args):
+        filename, content = uploads.get(content_hash)
+        key = (kind, content_hash) + tuple(_mapping_key(arg) for arg in extra_args)
+        args = (content_hash, content, filename) + extra_args
+
+        async def compute():
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(state['executor'], task, *args)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+        return await cache.get_or_compute(key, compute)
+
+    @app.get('/health')
+    async def health():
+        return {
+            'status': 'ok',
+            'datasets': len(uploads.files),
+            'upload_bytes': uploads.total_bytes,
+            'cache_entries': len(cache.entries),
+            'cache_hits': cache.hits,
+            'cache_misses': cache.misses
+        }
+
+    @app.post('/datasets')
+    async def upload(request: Request, filename: str):
+        content = await request.body()
+        if not content:
+            raise HTTPException(status_code=400, detail='الملف فارغ')
+        if not filename.lower().endswith(('.csv', '.xlsx', '.xls')):
+            raise HTTPException(status_code=422, detail='نوع الملف غير مدعوم. الرجاء استخدام Excel (.xlsx, .xls) أو CSV')
+        content_hash = uploads.add(content, filename)
+        return {'dataset_id': content_hash, 'filename': filename, 'size': len(content)}
+
+    @app.get('/datasets/{dataset_id}/mapping')
+    async def mapping(dataset_id: str):
+        return await run_cached('mapping', dataset_id, suggest_mapping_task)
+
+    @app.post('/datasets/{dataset_id}/analysis')
+    async def analysis(dataset_id: str, request: Request):
+        column_mapping = await _read_mapping(request)
+        return await run_cached('analysis', dataset_id, analyze_task, column_mapping)
+
+    @app.post('/datasets/{dataset_id}/charts')
+    async def charts(dataset_id: str, request: Request):
+        column_mapping = await _read_mapping(request)
+        return await run_cached('charts', dataset_id, charts_task, column_mapping)
+
+    return app
+
+app = create_app(workers=int(os.environ.get('HR_SERVICE_WORKERS', 0)) or None)
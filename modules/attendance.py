@@ -0,0 +1,172 @@
+"""
+وحدة تحليل الحضور والعمل الإضافي والتدريب - نسب الغياب وتركز ساعات العمل الإضافي وتغطية التدريب لكل قسم
+
+المجاميع لكل قسم تأتي من GroupedTotals المشترك مع المؤشرات الرئيسية (تمريرة groupby واحدة لكل الحقول)؛
+البيانات على مستوى الموظف تُستخدم فقط لمعامل Gini وأعلى الموظفين في العمل الإضافي.
+"""
+
+import numpy as np
+from modules.grouped_totals import GroupedTotals
+from modules.numeric_parser import to_numeric
+
+ATTENDANCE_FIELDS = ('attendance_days', 'absent_days', 'late_days', 'overtime_hours')
+TRAINING_FIELDS = ('trainings_completed', 'training_hours', 'certifications')
+
+def gini(values):
+    """معامل Gini لقيم غير سالبة (0 = توزيع متساوٍ، 1 = شخص واحد يملك الكل)"""
+    values = np.sort(values)
+    total = values.sum()
+    if len(values) == 0 or total <= 0:
+        return None
+    n = len(values)
+    return float(2 * np.dot(np.arange(1, n + 1), values) / (n * total) - (n + 1) / n)
+
+def _ratio(numerator, denominator, scale=1.0):
+    return float(numerator / denominator * scale) if denominator > 0 else None
+
+class AttendanceAnalyzer:
+    def __init__(self, dataframe, column_mapping, totals=None, top_k=10, min_group_size=5):
+        self.df = dataframe
+        self.mapping = column_mapping
+        self.top_k = top_k
+        self.min_group_size = min_group_size
+        # المجاميع لكل قسم - تُبنى هنا فقط إذا لم يمررها المحلل الرئيسي
+        self.totals = totals if totals is not None else self._build_totals()
+
+    def _column(self, field):
+        column = self.mapping.get(field)
+        return column if column in self.df.columns else None
+
+    def _build_totals(self):
+        columns = {
+            field: self.df[self._column(field)]
+            for field in ATTENDANCE_FIELDS + TRAINING_FIELDS if self._column(field) is not None
+        }
+        department = self._column('department')
+        return GroupedTotals(len(self.df), columns, self.df[department] if department is not None else None)
+
+    def _has(self, field):
+        return self._column(field) is not None and field in self.totals
+
+    def analyze(self):
+        """نسب الغياب والتأخير، تركز العمل الإضافي، وتغطية التدريب - الإجمالي ولكل قسم"""
+        if not any(self._has(field) for field in ATTENDANCE_FIELDS + TRAINING_FIELDS):
+            return {'available': False, 'reason': 'يتطلب تعيين حقل واحد على الأقل من حقول الحضور أو التدريب'}
+        return {
+            'available': True,
+            'absence': self._absence(),
+            'overtime': self._overtime(),
+            'training': self._training()
+        }
+
+    def _department_rows(self, build, sort_key, reverse=True):
+        """صف لكل قسم بحجم كافٍ مرتباً حسب المقياس الأهم (القيم المفقودة في النهاية)"""
+        rows = [
+            dict(build(g), department=label, employees=int(self.totals.group_rows[g]))
+            for g, label in enumerate(self.totals.labels)
+            if self.totals.group_rows[g] >= self.min_group_size
+        ]
+        present = [row for row in rows if row[sort_key] is not None]
+        missing = [row for row in rows if row[sort_key] is None]
+        return sorted(present, key=lambda row: row[sort_key], reverse=reverse) + missing
+
+    def _absence(self):
+        """نسبة الغياب = أيام الغياب ÷ (أيام الحضور + أيام الغياب)، ونسبة التأخير = أيام التأخير ÷ أيام الحضور"""
+        if not (self._has('absent_days') or self._has('late_days')):
+            return None
+        totals = self.totals
+
+        def stats(value):
+            attended = value('sum', 'attendance_days') if self._has('attendance_days') else 0.0
+            result = {}
+            if self._has('absent_days'):
+                absent = value('sum', 'absent_days')
+                result['absence_rate'] = _ratio(absent, attended + absent, 100) if self._has('attendance_days') else None
+                result['avg_absent_days'] = _ratio(absent, value('count', 'absent_days'))
+            if self._has('late_days'):
+                late = value('sum', 'late_days')
+                result['late_rate'] = _ratio(late, attended, 100) if self._has('attendance_days') else None
+                result['avg_late_days'] = _ratio(late, value('count', 'late_days'))
+            return result
+
+        overall = stats(totals.overall)
+        sort_key = 'absence_rate' if overall.get('absence_rate') is not None else (
+            'avg_absent_days' if 'avg_absent_days' in overall else
+            'late_rate' if overall.get('late_rate') is not None else 'avg_late_days'
+        )
+        by_department = self._department_rows(
+            lambda g: stats(lambda stat, field: totals.by_group(stat, field)[g]), sort_key
+        )
+        return {'overall': overall, 'metric': sort_key, 'by_department': by_department}
+
+    def _employee_labels(self, rows):
+        for field in ('employee_name', 'employee_id'):
+            column = self._column(field)
+            if column is not None:
+                return [str(value) for value in self.df[column].to_numpy()[rows]]
+        return [f"#{row + 1}" for row in rows]
+
+    def _overtime(self):
+        """تركز العمل الإضافي: معامل Gini وحصة أعلى الموظفين والأقسام من إجمالي الساعات"""
+        if not self._has('overtime_hours'):
+            return None
+        totals = self.totals
+        hours = to_numeric(self.df[self._column('overtime_hours')]).to_numpy(dtype=np.float64, na_value=np.nan)
+        known = np.flatnonzero(np.isfinite(hours))
+        values = np.maximum(hours[known], 0.0)
+        total = float(values.sum())
+        if len(values) == 0 or total <= 0:
+            return {'total_hours': total, 'employees_with_overtime': 0, 'gini': None,
+                    'top_10pct_share': None, 'top_employees': [], 'by_department': []}
+
+        k = min(self.top_k, len(values))
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind='stable')]
+        tenth = max(1, int(np.ceil(len(values) * 0.1)))
+        top_tenth = np.partition(values, len(values) - tenth)[len(values) - tenth:].sum()
+
+        # مجاميع الأقسام من نفس القيم المقصوصة عند الصفر التي يُحسب منها الإجمالي حتى تتسق الحصص
+        department_hours = np.bincount(totals.codes[known], weights=values, minlength=len(totals.rows))[:-1]
+
+        def stats(g):
+            hours_sum = department_hours[g]
+            return {
+                'total_hours': float(hours_sum),
+                'avg_hours': _ratio(hours_sum, totals.by_group('count', 'overtime_hours')[g]),
+                'share': float(hours_sum / total * 100),
+                'employees_with_overtime': int(totals.by_group('positive', 'overtime_hours')[g])
+            }
+
+        return {
+            'total_hours': total,
+            'avg_hours': float(total / len(values)),
+            'employees_with_overtime': int(totals.overall('positive', 'overtime_hours')),
+            'gini': gini(values),
+            'top_10pct_share': float(top_tenth / total * 100),
+            'top_employees': [
+                {'employee': label, 'hours': float(values[i]), 'share': float(values[i] / total * 100)}
+                for label, i in zip(self._employee_labels(known[top]), top)
+            ],
+            'by_department': self._department_rows(stats, 'total_hours')[:self.top_k]
+        }
+
+    def _training(self):
+        """تغطية التدريب = نسبة الموظفين بتدريب واحد على الأقل (أو ساعات/شهادات عند غياب عدد التدريبات)"""
+        fields = [field for field in TRAINING_FIELDS if self._has(field)]
+        if not fields:
+            return None
+        totals = self.totals
+        coverage_field = fields[0]
+
+        def stats(value, rows):
+            result = {'coverage_pct': _ratio(value('positive', coverage_field), rows, 100)}
+            for field in fields:
+                result[f'avg_{field}'] = _ratio(value('sum', field), value('count', field))
+            return result
+
+        overall = stats(totals.overall, totals.total_rows)
+        by_department = self._department_rows(
+            lambda g: stats(lambda stat, field: totals.by_group(stat, field)[g], totals.group_rows[g]),
+            'coverage_pct', reverse=False
+        )
+        return {'overall': overall, 'coverage_field': coverage_field, 'by_department': by_department}
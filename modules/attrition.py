@@ -0,0 +1,343 @@
+"""
+وحدة تحليل دوران الموظفين والبقاء الوظيفي - معدل الدوران ومنحنيات Kaplan-Meier ومقارنة خطر ترك العمل
+
+جميع الحسابات عدادات تراكمية على مصفوفات مرتبة (np.unique / np.bincount / np.searchsorted)
+دون المرور على الموظفين واحداً واحداً.
+"""
+
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from modules.pay_equity import encode_levels
+from modules.date_parser import to_datetime
+
+# كلمات تدل على أن الموظف ترك العمل (تُفحص على القيم الفريدة لعمود الحالة فقط)
+LEAVER_KEYWORDS = (
+    'terminat', 'resign', 'left', 'leaver', 'inactive', 'exit', 'fired', 'dismiss', 'retire',
+    'separat', 'quit', 'former', 'ex-employee',
+    'مستقيل', 'استقال', 'منتهي', 'انتهاء', 'ترك', 'غير نشط', 'متقاعد', 'تقاعد', 'مفصول', 'فصل', 'سابق'
+)
+DAYS_PER_YEAR = 365.25
+
+def leaver_mask(series):
+    """مصفوفة منطقية: هل حالة الموظف تدل على ترك العمل - التصنيف يتم مرة واحدة لكل قيمة فريدة"""
+    codes, uniques = pd.factorize(series)
+    # العنصر الأخير للقيم المفقودة (الرمز -1)
+    is_leaver = np.array(
+        [any(keyword in str(value).strip().lower() for keyword in LEAVER_KEYWORDS) for value in uniques] + [False],
+        dtype=bool
+    )
+    return is_leaver[codes]
+
+def survival_counts(days, events, groups, n_groups):
+    """عدد المعرضين للخطر وعدد حالات الترك لكل مجموعة عند كل مدة فيها حالة ترك
+
+    المعرضون للخطر عند المدة t = حجم المجموعة - عدد من خرجوا (تركاً أو رقابة) قبل t،
+    ويحسب بمجموع تراكمي على المدد الفريدة المرتبة.
+    """
+    times, time_index = np.unique(days, return_inverse=True)
+    cells = groups * len(times) + time_index
+    removed = np.bincount(cells, minlength=n_groups * len(times)).reshape(n_groups, len(times))
+    deaths = np.bincount(cells, weights=events, minlength=n_groups * len(times)).reshape(n_groups, len(times))
+    at_risk = removed.sum(axis=1, keepdims=True) - np.cumsum(removed, axis=1) + removed
+    # المدد التي ليس فيها أي حالة ترك لا تغير المنحنى
+    keep = deaths.sum(axis=0) > 0
+    return times[keep], at_risk[:, keep].astype(np.float64), deaths[:, keep]
+
+def kaplan_meier(at_risk, deaths, confidence=0.95):
+    """منحنى البقاء لكل صف مع فترة ثقة (Greenwood بتحويل log-log)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.where(at_risk > 0, 1 - deaths / at_risk, 1.0)
+        survival = np.cumprod(factor, axis=1)
+        greenwood = np.cumsum(
+            np.where(at_risk > deaths, deaths / (at_risk * (at_risk - deaths)), 0.0), axis=1
+        )
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        log_survival = np.log(survival)
+        spread = z * np.sqrt(greenwood) / np.abs(log_survival)
+        inside = (survival > 0) & (survival < 1)
+        low = np.where(inside, survival ** np.exp(spread), survival)
+        high = np.where(inside, survival ** np.exp(-spread), survival)
+    return survival, low, high
+
+def group_vs_rest_hazard(at_risk, deaths):
+    """نسبة خطر كل مجموعة مقابل باقي الموظفين من حالات الترك الفعلية والمتوقعة (log-rank)
+
+    المتوقع للمجموعة عند كل مدة = حالات الترك الكلية × حصة المجموعة من المعرضين للخطر؛
+    النسبة = (O/E للمجموعة) ÷ (O/E للباقين) والخطأ المعياري للوغاريتم √(1/E + 1/E الباقين).
+    """
+    total_at_risk = at_risk.sum(axis=0)
+    total_deaths = deaths.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(total_at_risk > 0, at_risk / total_at_risk, 0.0)
+        observed = deaths.sum(axis=1)
+        expected = (share * total_deaths).sum(axis=1)
+        rest_observed = total_deaths.sum() - observed
+        rest_expected = total_deaths.sum() - expected
+        log_ratio = np.log(observed / expected) - np.log(rest_observed / rest_expected)
+        se = np.sqrt(1 / expected + 1 / rest_expected)
+    return observed, expected, log_ratio, se
+
+class AttritionAnalyzer:
+    def __init__(self, dataframe, column_mapping, periods=8, period_freq='Q', max_groups=30,
+                 min_group_size=10, curve_points=60, confidence=0.95, reference_date=None):
+        self.df = dataframe
+        self.mapping = column_mapping
+        # عدد الفترات (أرباع سنة افتراضياً) في اتجاه معدل الدوران
+        self.periods = periods
+        self.period_freq = period_freq
+        # عدد الأقسام/المواقع في المقارنة (الباقي في 'أخرى') وأقل حجم لعرض مجموعة
+        self.max_groups = max_groups
+        self.min_group_size = min_group_size
+        self.curve_points = curve_points
+        self.confidence = confidence
+        self.reference_date = reference_date
+
+    def _column(self, field):
+        column = self.mapping.get(field)
+        return column if column in self.df.columns else None
+
+    def _dates(self, field):
+        column = self._column(field)
+        if column is None:
+            return None
+        dates = self.df[column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = to_datetime(dates)
+        return dates.to_numpy(dtype='datetime64[ns]')
+
+    def _group_fields(self):
+        return [field for field in ('department', 'location', 'employment_type') if self._column(field) is not None]
+
+    def analyze(self):
+        """تحليل الدوران والبقاء - يعيد قاموساً قابلاً للحفظ كـ JSON"""
+        if self._column('status') is None:
+            return {'available': False, 'reason': 'يتطلب تعيين عمود الحالة'}
+
+        leavers = leaver_mask(self.df[self._column('status')])
+        if not leavers.any():
+            return {'available': False, 'reason': 'لم يتم التعرف على أي حالة ترك عمل في عمود الحالة'}
+
+        hires = self._dates('hire_date')
+        exits = self._dates('termination_date')
+        reference = np.datetime64(pd.Timestamp(self.reference_date or pd.Timestamp.now()).normalize(), 'ns')
+        if exits is not None:
+            exits = np.where(leavers, exits, np.datetime64('NaT'))
+            latest_exit = exits[~np.isnat(exits)]
+            if len(latest_exit):
+                reference = max(reference, latest_exit.max())
+
+        groups = {field: encode_levels(self.df[self._column(field)], self.max_groups) for field in self._group_fields()}
+        total = len(leavers)
+        result = {
+            'available': True,
+            'confidence': self.confidence,
+            'reference_date': str(pd.Timestamp(reference).date()),
+            'headcount': int(total),
+            'leavers': int(leavers.sum()),
+            'active': int(total - leavers.sum()),
+            'turnover_rate': float(leavers.mean() * 100),
+            'by_group': {field: self._turnover_by_group(leavers, hires, exits, reference, *encoded)
+                         for field, encoded in groups.items()},
+            'by_period': self._turnover_by_period(hires, exits, reference),
+            'by_cohort': self._turnover_by_cohort(leavers, hires),
+            'survival': None,
+            'survival_reason': None,
+            'hazards': {}
+        }
+
+        if hires is None or exits is None:
+            result['survival_reason'] = 'منحنيات البقاء تتطلب تعيين تاريخ التعيين وتاريخ ترك العمل'
+            return result
+
+        # مدة الخدمة بالأيام: حتى تاريخ الترك للمغادرين وحتى تاريخ المرجع للباقين (مراقبة)
+        end = np.where(leavers, exits, reference)
+        days = (end - hires).astype('timedelta64[D]').astype(np.float64)
+        valid = ~np.isnat(hires) & ~np.isnat(end) & (end >= hires)
+        if valid.sum() < self.min_group_size or not leavers[valid].any():
+            result['survival_reason'] = 'لا توجد مدد خدمة صالحة كافية لحساب منحنيات البقاء'
+            return result
+        days = days[valid].astype(np.int64)
+        events = leavers[valid].astype(np.float64)
+
+        result['survival'] = self._survival(days, events, groups.get('department'), valid)
+        for field, (codes, labels) in groups.items():
+            result['hazards'][field] = self._hazards(days, events, codes[valid], labels)
+        return result
+
+    def _turnover_by_group(self, leavers, hires, exits, reference, codes, labels):
+        """معدل الدوران لكل مجموعة: نسبة المغادرين، ومعدل سنوي لآخر 12 شهراً إن توفر تاريخ الترك"""
+        n_groups = len(labels)
+        headcount = np.bincount(codes, minlength=n_groups)
+        left = np.bincount(codes, weights=leavers, minlength=n_groups)
+
+        annual = None
+        if hires is not None and exits is not None:
+            start = reference - np.timedelta64(365, 'D')
+            present_start = (hires <= start) & ~(exits <= start)
+            present_end = (hires <= reference) & ~(exits <= reference)
+            recent_exits = (exits > start) & (exits <= reference)
+            average = (
+                np.bincount(codes, weights=present_start, minlength=n_groups)
+                + np.bincount(codes, weights=present_end, minlength=n_groups)
+            ) / 2
+            exits_12m = np.bincount(codes, weights=recent_exits, minlength=n_groups)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                annual = np.where(average > 0, exits_12m / average * 100, np.nan)
+
+        rows = []
+        for g in np.argsort(-headcount, kind='stable'):
+            if headcount[g] < self.min_group_size:
+                continue
+            row = {
+                'group': labels[g],
+                'headcount': int(headcount[g]),
+                'leavers': int(left[g]),
+                'turnover_rate': float(left[g] / headcount[g] * 100)
+            }
+            if annual is not None:
+                row['annual_rate'] = float(annual[g])
+            rows.append(row)
+        return rows
+
+    def _turnover_by_period(self, hires, exits, reference):
+        """المغادرون ومتوسط عدد الموظفين لكل فترة - عدد الموظفين في أي لحظة من عدادين تراكميين مرتبين"""
+        if hires is None or exits is None:
+            return []
+        sorted_hires = np.sort(hires[~np.isnat(hires)])
+        sorted_exits = np.sort(exits[~np.isnat(exits)])
+        if len(sorted_exits) == 0:
+            return []
+
+        periods = pd.period_range(end=pd.Timestamp(reference), periods=self.periods, freq=self.period_freq)
+        starts = periods.start_time.to_numpy(dtype='datetime64[ns]')
+        ends = (periods.end_time + pd.Timedelta(1, 'ns')).to_numpy(dtype='datetime64[ns]')
+
+        def headcount(moments):
+            return np.searchsorted(sorted_hires, moments, 'left') - np.searchsorted(sorted_exits, moments, 'left')
+
+        exits_in = np.searchsorted(sorted_exits, ends, 'left') - np.searchsorted(sorted_exits, starts, 'left')
+        hires_in = np.searchsorted(sorted_hires, ends, 'left') - np.searchsorted(sorted_hires, starts, 'left')
+        average = (headcount(starts) + headcount(ends)) / 2
+        return [
+            {
+                'period': str(period),
+                'hires': int(hired),
+                'exits': int(left),
+                'average_headcount': float(avg),
+                'turnover_rate': float(left / avg * 100) if avg > 0 else None
+            }
+            for period, hired, left, avg in zip(periods, hires_in, exits_in, average)
+        ]
+
+    def _turnover_by_cohort(self, leavers, hires):
+        """نسبة من غادر من كل دفعة تعيين (سنة التعيين) - متاح دون تاريخ الترك"""
+        if hires is None:
+            return []
+        known = ~np.isnat(hires)
+        if not known.any():
+            return []
+        years = hires[known].astype('datetime64[Y]').astype(np.int64) + 1970
+        first = years.min()
+        offsets = years - first
+        hired = np.bincount(offsets)
+        left = np.bincount(offsets, weights=leavers[known], minlength=len(hired))
+        return [
+            {
+                'year': int(first + offset),
+                'hired': int(hired[offset]),
+                'left': int(left[offset]),
+                'retained_pct': float((1 - left[offset] / hired[offset]) * 100)
+            }
+            for offset in np.flatnonzero(hired)
+        ]
+
+    def _curves(self, times, survival, low, high, horizon):
+        """تقييم منحنيات البقاء الدرجية على شبكة مدد ثابتة (بالسنوات) لتصغير حجم النتائج والرسوم"""
+        grid = np.linspace(0, horizon, self.curve_points)
+        index = np.searchsorted(times, grid, 'right') - 1
+        take = np.maximum(index, 0)
+        before_first = index < 0
+
+        def sample(values):
+            return np.where(before_first, 1.0, values[:, take])
+
+        return grid / DAYS_PER_YEAR, sample(survival), sample(low), sample(high)
+
+    def _summary(self, times, survival):
+        """البقاء بعد 1 و3 و5 سنوات ووسيط مدة الخدمة حتى الترك (إن وصل المنحنى إلى 50%)"""
+        summary = []
+        for row in survival:
+            at = {}
+            for years in (1, 3, 5):
+                index = np.searchsorted(times, years * DAYS_PER_YEAR, 'right') - 1
+                at[f'retention_{years}y'] = float(row[index] * 100) if index >= 0 else 100.0
+            below = np.flatnonzero(row <= 0.5)
+            at['median_years'] = float(times[below[0]] / DAYS_PER_YEAR) if len(below) else None
+            summary.append(at)
+        return summary
+
+    def _survival(self, days, events, department, valid):
+        """منحنى Kaplan-Meier لجميع الموظفين ولكل قسم - كل المنحنيات من مصفوفة عدادات واحدة"""
+        if department is not None:
+            codes, labels = department
+            codes = codes[valid]
+        else:
+            codes, labels = np.zeros(len(days), dtype=np.int64), []
+        n_groups = max(len(labels), 1)
+
+        times, at_risk, deaths = survival_counts(days, events, codes, n_groups)
+        # الصف الأول: جميع الموظفين
+        at_risk = np.vstack([at_risk.sum(axis=0, keepdims=True), at_risk])
+        deaths = np.vstack([deaths.sum(axis=0, keepdims=True), deaths])
+        survival, low, high = kaplan_meier(at_risk, deaths, self.confidence)
+
+        horizon = float(np.percentile(days, 99)) or float(days.max())
+        years, curve, curve_low, curve_high = self._curves(times, survival, low, high, horizon)
+        summary = self._summary(times, survival)
+        sizes = np.bincount(codes, minlength=n_groups)
+
+        def curve_entry(row, name, size):
+            return dict(
+                summary[row], group=name, n=int(size), events=int(deaths[row].sum()),
+                survival=curve[row].round(4).tolist(),
+                ci_low=curve_low[row].round(4).tolist(),
+                ci_high=curve_high[row].round(4).tolist()
+            )
+
+        return {
+            'years': years.round(3).tolist(),
+            'overall': curve_entry(0, 'all', len(days)),
+            'by_department': [
+                curve_entry(g + 1, labels[g], sizes[g])
+                for g in np.argsort(-sizes, kind='stable')
+                if labels and sizes[g] >= self.min_group_size
+            ]
+        }
+
+    def _hazards(self, days, events, codes, labels):
+        """نسبة خطر ترك العمل لكل مجموعة مقابل الباقين مع فترة ثقة ومعدل الترك لكل 100 سنة خدمة"""
+        n_groups = len(labels)
+        _, at_risk, deaths = survival_counts(days, events, codes, n_groups)
+        observed, expected, log_ratio, se = group_vs_rest_hazard(at_risk, deaths)
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        sizes = np.bincount(codes, minlength=n_groups)
+        exposure_years = np.bincount(codes, weights=days, minlength=n_groups) / DAYS_PER_YEAR
+
+        rows = []
+        for g in np.argsort(-sizes, kind='stable'):
+            if sizes[g] < self.min_group_size or not (np.isfinite(log_ratio[g]) and np.isfinite(se[g])):
+                continue
+            low, high = np.exp(log_ratio[g] - z * se[g]), np.exp(log_ratio[g] + z * se[g])
+            rows.append({
+                'group': labels[g],
+                'n': int(sizes[g]),
+                'events': int(observed[g]),
+                'expected': float(expected[g]),
+                'rate_per_100_years': float(observed[g] / exposure_years[g] * 100) if exposure_years[g] > 0 else None,
+                'hazard_ratio': float(np.exp(log_ratio[g])),
+                'ci_low': float(low),
+                'ci_high': float(high),
+                'significant': bool(low > 1 or high < 1)
+            })
+        return rows
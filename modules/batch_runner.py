@@ -0,0 +1,172 @@
+"""
+وحدة المعالجة الدفعية - تشغيل خط التحليل على عدة ملفات بالتوازي
+"""
+
+import os
+import glob
+import json
+import time
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from modules.file_loader import BytesUpload
+from modules.pipeline import PipelineRunner, make_json_safe, STAGES
+from modules.profiler import PipelineProfiler
+from modules.snapshot_store import SnapshotStore, period_from_name, source_from_name
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+def discover_files(inputs):
+    """تجميع الملفات من مجلدات أو أنماط glob أو مسارات مباشرة"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = sorted(
+                os.path.join(item, name) for name in os.listdir(item)
+            )
+        else:
+            candidates = sorted(glob.glob(item, recursive=True)) or [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS):
+                files.append(os.path.abspath(path))
+
+    # إزالة التكرار مع الحفاظ على الترتيب
+    return list(dict.fromkeys(files))
+
+def _output_stems(files):
+    """أسماء ملفات مخرجات فريدة حتى لو تكررت الأسماء في مجلدات مختلفة"""
+    stems = {}
+    used = set()
+    for path in files:
+        base = os.path.splitext(os.path.basename(path))[0]
+        stem = base
+        counter = 1
+        while stem in used:
+            counter += 1
+            stem = f"{base}_{counter}"
+        used.add(stem)
+        stems[path] = stem
+    return stems
+
+def process_file(path, output_dir, stem, column_mapping=None, profile=False, snapshot_db=None, source=None,
+                 category_aliases=None):
+    """معالجة ملف واحد (تعمل داخل عملية منفصلة) - لا ترفع أخطاء أبداً"""
+    start = time.perf_counter()
+    runner = PipelineRunner(column_mapping, category_aliases=category_aliases)
+    summary = {'file': path, 'status': 'ok', 'timings': {}}
+
+    try:
+        if profile:
+            # عينات المعالج وحجز الذاكرة لكل مرحلة في مجلد <stem>.profile بجانب التقرير
+            profiler = PipelineProfiler.from_env()
+            result, summary['profile'] = profiler.profile(
+                BytesUpload.from_path(path), column_mapping,
+                run_dir=os.path.join(output_dir, f"{stem}.profile"), category_aliases=category_aliases
+            )
+            runner.timings = result['timings']
+        else:
+            result = runner.run(BytesUpload.from_path(path))
+
+        report_path = os.path.join(output_dir, f"{stem}.report.txt")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(result['report'])
+
+        results_path = os.path.join(output_dir, f"{stem}.results.json")
+        with open(results_path, 'w', encoding='utf-8') as f:
+            json.dump(make_json_safe({
+                'file': path,
+                'rows': result['rows'],
+                'columns': result['columns'],
+                'column_mapping': result['column_mapping'],
+                'analysis': result['analysis'],
+                'timings': result['timings']
+            }), f, ensure_ascii=False, indent=2)
+
+        summary.update({
+            'rows': result['rows'],
+            'report': report_path,
+            'results': results_path
+        })
+
+        # لقطة تاريخية: الفترة من اسم الملف (مثل hr_2024-03.xlsx) أو الشهر الحالي
+        if snapshot_db:
+            summary['snapshot'] = SnapshotStore(snapshot_db).save(
+                result['analysis'], source or source_from_name(path),
+                period_from_name(path, datetime.now().strftime('%Y-%m')), rows=result['rows']
+            )
+    except Exception as e:
+        summary.update({
+            'status': 'error',
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+    summary['timings'] = dict(runner.timings)
+    summary['timings']['total'] = time.perf_counter() - start
+    return summary
+
+class BatchRunner:
+    def __init__(self, output_dir, workers=None, column_mapping=None, profile=False, snapshot_db=None, source=None,
+                 category_aliases=None):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.column_mapping = column_mapping
+        self.category_aliases = category_aliases
+        self.profile = profile
+        # مخزن اللقطات التاريخية (اختياري) واسم المصدر (الافتراضي: اسم الملف بدون الفترة)
+        self.snapshot_db = snapshot_db
+        self.source = source
+
+    def run(self, files, on_result=None):
+        """توزيع الملفات على مجموعة عمليات ومتابعة النتائج عند اكتمالها"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stems = _output_stems(files)
+        results = []
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    process_file, path, self.output_dir, stems[path], self.column_mapping, self.profile,
+                    self.snapshot_db, self.source, self.category_aliases
+                ): path
+                for path in files
+            }
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # فشل العملية نفسها (مثلاً نفاد الذاكرة) لا يوقف بقية الملفات
+                    summary = {'file': futures[future], 'status': 'error', 'error': str(e), 'timings': {}}
+                results.append(summary)
+                if on_result:
+                    on_result(summary)
+
+        batch_summary = {
+            'files': sorted(results, key=lambda r: r['file']),
+            'succeeded': sum(1 for r in results if r['status'] == 'ok'),
+            'failed': sum(1 for r in results if r['status'] != 'ok'),
+            'workers': self.workers,
+            'wall_time': time.perf_counter() - start,
+            'stage_totals': self.stage_totals(results)
+        }
+
+        with open(os.path.join(self.output_dir, 'batch_summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(make_json_safe(batch_summary), f, ensure_ascii=False, indent=2)
+
+        return batch_summary
+
+    @staticmethod
+    def stage_totals(results):
+        """مجموع ومتوسط وأقصى زمن لكل مرحلة عبر جميع الملفات"""
+        totals = {}
+        for stage in STAGES + ['total']:
+            values = [r['timings'][stage] for r in results if stage in r.get('timings', {})]
+            if values:
+                totals[stage] = {
+                    'sum': sum(values),
+                    'mean': sum(values) / len(values),
+                    'max': max(values)
+                }
+        return totals
@@ -0,0 +1,93 @@
+"""
+وحدة توحيد القيم الفئوية - "Sales" و " sales " و "SALES" قسم واحد، و "المبيعــات" و "المبيعات" كذلك
+
+التوحيد (حالة الأحرف والمسافات والحروف العربية والأسماء البديلة) يتم على القيم الفريدة فقط ثم يُعاد
+ترميز العمود كـ Categorical مضغوط برموز pd.factorize، لذلك زمنه يتبع عدد القيم المختلفة وليس عدد الصفوف.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('hr_dashboard.categories')
+
+# الحقول الفئوية التي تُوحد قيمها قبل التحليل والرسوم
+CATEGORY_FIELDS = ('department', 'position', 'location', 'employment_type', 'status', 'gender', 'manager')
+# أسماء بديلة افتراضية {صيغة: الاسم الموحد} تُطبق في التحليل والرسوم معاً، مثل {'المبيعات': 'Sales'}
+# (تُضاف إليها الأسماء المحفوظة في config.json والمتغير HR_CATEGORY_ALIASES - انظر load_aliases)
+CATEGORY_ALIASES = {}
+
+# الحروف العربية المتغيرة: أشكال الألف والهمزة والياء والتاء المربوطة
+_ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه'
+})
+# التطويل والتشكيل (الفتحة إلى السكون والألف الخنجرية)
+_ARABIC_MARKS = r'[ـً-ْٰ]'
+
+def load_aliases(settings=None):
+    """الأسماء البديلة المفعلة: CATEGORY_ALIASES ثم category_aliases من الإعدادات المحفوظة ثم HR_CATEGORY_ALIASES (JSON)"""
+    aliases = dict(CATEGORY_ALIASES)
+    aliases.update((settings or {}).get('category_aliases') or {})
+    raw = os.environ.get('HR_CATEGORY_ALIASES')
+    if raw:
+        try:
+            env_aliases = json.loads(raw)
+        except ValueError:
+            env_aliases = None
+        if isinstance(env_aliases, dict):
+            aliases.update(env_aliases)
+        else:
+            logger.warning("HR_CATEGORY_ALIASES ليس كائن JSON صالحاً - سيتم تجاهله")
+    return {str(alias): str(name) for alias, name in aliases.items()}
+
+def aliases_key(aliases):
+    """بصمة قصيرة للأسماء البديلة في مفاتيح الذاكرة المؤقتة ('' بدون أسماء)"""
+    if not aliases:
+        return ''
+    encoded = json.dumps(aliases, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+def normalize_keys(values):
+    """مفتاح المقارنة لكل قيمة نصية: NFKC، حذف التطويل والتشكيل، توحيد الحروف العربية، حالة الأحرف والمسافات"""
+    text = pd.Series(values, dtype=object).map(str).str.normalize('NFKC')
+    text = text.str.replace(_ARABIC_MARKS, '', regex=True).str.translate(_ARABIC_LETTERS)
+    return text.str.casefold().str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def canonicalize(values, aliases=None):
+    """توحيد عمود فئوي - يعيد Series من نوع Categorical بنفس الفهرس
+
+    القيم التي لها نفس المفتاح تُدمج وتُعرض بأكثر صيغها تكراراً، و aliases (افتراضياً CATEGORY_ALIASES) يربط
+    صيغاً مختلفة باسم واحد (المفاتيح تُقارن بعد التوحيد). الأعمدة غير النصية تُعاد كما هي.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    keys = normalize_keys(uniques)
+    key_codes, key_uniques = pd.factorize(keys)
+
+    # الاسم المعروض لكل مفتاح: أكثر صيغه تكراراً في الصفوف (بعد تنظيف المسافات)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    order = np.lexsort((-counts, key_codes))
+    first = order[np.r_[True, key_codes[order][1:] != key_codes[order][:-1]]] if len(order) else order
+    labels = pd.Series(uniques[first], dtype=object).map(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+    aliases = CATEGORY_ALIASES if aliases is None else aliases
+    if aliases:
+        alias_labels = dict(zip(normalize_keys(list(aliases)), aliases.values()))
+        labels = pd.Series(key_uniques, dtype=object).map(alias_labels).fillna(labels)
+    # القيم الفارغة بعد التنظيف تصبح مفقودة
+    labels = labels.where(pd.Series(key_uniques, dtype=object) != '')
+
+    # عدة مفاتيح قد تُربط بنفس الاسم البديل: الفئات هي الأسماء المختلفة
+    label_codes, categories = pd.factorize(labels)
+    row_codes = np.append(label_codes[key_codes], -1)[codes]
+    categorical = pd.Categorical.from_codes(row_codes, categories=pd.Index(categories, dtype=object))
+    return pd.Series(categorical, index=series.index, name=series.name)
@@ -0,0 +1,150 @@
+"""
+وحدة قياس حجم الرسوم البيانية وفرض حد أقصى للحمولة المرسلة للمتصفح
+"""
+
+import os
+import json
+import math
+import logging
+import numpy as np
+
+logger = logging.getLogger('hr_dashboard.charts')
+
+# الحد الأقصى لحجم JSON لكل رسم بالبايت
+DEFAULT_BUDGETS = {
+    'department': 200_000,
+    'salary': 200_000,
+    'performance': 100_000,
+    'correlation': 500_000,
+    'location': 200_000,
+    'position': 200_000,
+    'correlation_heatmap': 300_000,
+}
+DEFAULT_BUDGET = 1_000_000
+
+# الخصائص التي تحمل بيانات بطول عدد النقاط في كل trace
+POINT_ATTRIBUTES = ('x', 'y', 'text', 'customdata', 'hovertext', 'ids', 'width')
+# الـ traces الصغيرة (مثل خط الاتجاه) لا يتم تقليلها
+MIN_POINTS_TO_DECIMATE = 100
+# رسوم لا يصح تقليلها: كل خلية في مصفوفة الارتباط قيمة مستقلة وليست عدداً يمكن جمعه
+NON_DECIMATED_CHARTS = ('correlation_heatmap',)
+
+def _array_length(value):
+    if value is None or isinstance(value, str):
+        return 0
+    try:
+        return int(np.prod(np.shape(value)))
+    except Exception:
+        return 0
+
+def measure_figure(fig):
+    """حجم JSON وعدد الـ traces وعدد النقاط في الرسم"""
+    points = 0
+    for trace in fig.data:
+        lengths = [_array_length(getattr(trace, attr, None)) for attr in ('x', 'y', 'values')]
+        if getattr(trace, 'z', None) is not None:
+            lengths.append(_array_length(trace.z))
+        points += max(lengths) if lengths else 0
+    return {
+        'bytes': len(fig.to_json()),
+        'traces': len(fig.data),
+        'points': points
+    }
+
+def _pool_grid(z, step):
+    """جمع خلايا الشبكة في كتل step×step - الكتلة الفارغة كلها تبقى NaN (شفافة)"""
+    rows = -(-z.shape[0] // step) * step
+    cols = -(-z.shape[1] // step) * step
+    padded = np.full((rows, cols), np.nan)
+    padded[:z.shape[0], :z.shape[1]] = z
+    blocks = padded.reshape(rows // step, step, cols // step, step)
+    empty = np.isnan(blocks).all(axis=(1, 3))
+    return np.where(empty, np.nan, np.nansum(blocks, axis=(1, 3)))
+
+def _pool_axis(values, step):
+    """مراكز الكتل لمحور الشبكة (متوسط المراكز الرقمية، أو أول تسمية في كل كتلة)"""
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.number):
+        return values[::step]
+    starts = np.arange(0, len(values), step)
+    return np.add.reduceat(values.astype(float), starts) / np.diff(np.append(starts, len(values)))
+
+def _decimate_trace(trace, step):
+    """الاحتفاظ بنقطة واحدة من كل step نقاط (أو جمع خلايا الخرائط الحرارية في كتل step×step)"""
+    if step <= 1:
+        return
+    if trace.type in ('heatmap', 'histogram2d', 'contour') and trace.z is not None:
+        z = np.asarray(trace.z, dtype=float)
+        # جمع الكثافة في كتل بدلاً من حذف صفوف وأعمدة كاملة من الشبكة
+        trace.z = _pool_grid(z, step)
+        if trace.x is not None and _array_length(trace.x) == z.shape[1]:
+            trace.x = _pool_axis(trace.x, step)
+        if trace.y is not None and _array_length(trace.y) == z.shape[0]:
+            trace.y = _pool_axis(trace.y, step)
+        return
+
+    length = max(_array_length(getattr(trace, attr, None)) for attr in ('x', 'y'))
+    if length < MIN_POINTS_TO_DECIMATE:
+        return
+    for attr in POINT_ATTRIBUTES:
+        value = getattr(trace, attr, None)
+        if value is not None and _array_length(value) == length:
+            setattr(trace, attr, np.asarray(value)[::step])
+    marker = getattr(trace, 'marker', None)
+    if marker is not None and marker.color is not None and _array_length(marker.color) == length:
+        marker.color = np.asarray(marker.color)[::step]
+
+class ChartBudget:
+    def __init__(self, budgets=None, default_budget=DEFAULT_BUDGET):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.default_budget = default_budget
+
+    @classmethod
+    def from_env(cls):
+        """قراءة حدود مخصصة من متغير البيئة HR_CHART_BUDGETS (JSON: {"correlation": 200000})"""
+        raw = os.environ.get('HR_CHART_BUDGETS')
+        try:
+            return cls(json.loads(raw) if raw else None)
+        except ValueError:
+            logger.warning("HR_CHART_BUDGETS ليس JSON صالحاً - سيتم استخدام الحدود الافتراضية")
+            return cls()
+
+    def budget_for(self, chart_name):
+        return self.budgets.get(chart_name, self.default_budget)
+
+    def enforce(self, chart_name, fig, build_time=0.0, max_rounds=4):
+        """قياس الرسم وتقليل نقاطه إذا تجاوز الحد - يعيد (الرسم، التقرير)"""
+        budget = self.budget_for(chart_name)
+        before = measure_figure(fig)
+        after = before
+
+        rounds = 0
+        while after['bytes'] > budget and rounds < max_rounds and chart_name not in NON_DECIMATED_CHARTS:
+            step = max(2, math.ceil(after['bytes'] / budget * 1.1))
+            for trace in fig.data:
+                _decimate_trace(trace, step)
+            new_measure = measure_figure(fig)
+            rounds += 1
+            if new_measure['bytes'] >= after['bytes']:
+                # لا توجد بيانات نقطية يمكن تقليلها (مثلاً رسم دائري)
+                after = new_measure
+                break
+            after = new_measure
+
+        report = {
+            'chart': chart_name,
+            'budget_bytes': budget,
+            'bytes_before': before['bytes'],
+            'bytes_after': after['bytes'],
+            'traces': after['traces'],
+            'points_before': before['points'],
+            'points_after': after['points'],
+            'downsampled': rounds > 0,
+            'over_budget': after['bytes'] > budget,
+            'build_ms': round(build_time * 1000, 1),
+            'cached': False
+        }
+        log = logger.warning if report['over_budget'] else logger.info
+        log("chart_payload %s", json.dumps(report, ensure_ascii=False))
+        return fig, report
@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 import re
 from datetime import datetime
+from modules import telemetry
+from modules.date_parser import to_datetime
 
 class AutoColumnMapper:
     def __init__(self, dataframe):
@@ -31,6 +33,10 @@ class AutoColumnMapper:
                 'patterns': ['salary', 'pay', 'wage', 'income', 'راتب', 'أجر'],
                 'keywords': ['salary', 'pay', 'راتب', 'أجر']
             },
+            'termination_date': {
+                'patterns': ['termination', 'exit.*date', 'leav.*date', 'separation', 'انتهاء', 'ترك'],
+                'keywords': ['termination', 'انتهاء']
+            },
             'hire_date': {
                 'patterns': ['hire.*date', 'start.*date', 'join.*date', 'تاريخ', 'تعيين'],
                 'keywords': ['date', 'تاريخ', 'join', 'start']
@@ -55,6 +61,34 @@ class AutoColumnMapper:
                 'patterns': ['gender', 'sex', 'جنس', 'الجنس'],
                 'keywords': ['gender', 'sex', 'جنس']
             },
+            'attendance_days': {
+                'patterns': ['attendance', 'present.*day', 'days.*present', 'worked.*day', 'حضور'],
+                'keywords': ['attendance', 'حضور']
+            },
+            'absent_days': {
+                'patterns': ['absen', 'غياب'],
+                'keywords': ['absen', 'غياب']
+            },
+            'late_days': {
+                'patterns': ['late.*day', 'lateness', 'tardi', 'تأخير', 'تأخر'],
+                'keywords': ['lateness', 'تأخير']
+            },
+            'overtime_hours': {
+                'patterns': ['overtime', 'over.*time', 'extra.*hour', 'إضافي', 'اضافي'],
+                'keywords': ['overtime', 'إضافي']
+            },
+            'trainings_completed': {
+                'patterns': ['trainings?.*(completed|count)', 'courses', 'دورات', 'تدريبات'],
+                'keywords': ['courses', 'دورات']
+            },
+            'training_hours': {
+                'patterns': ['training.*hour', 'ساعات.*تدريب'],
+                'keywords': []
+            },
+            'certifications': {
+                'patterns': ['certif', 'شهاد'],
+                'keywords': ['certif', 'شهاد']
+            },
             'email': {
                 'patterns': ['email', 'mail', 'بريد', 'إيميل'],
                 'keywords': ['email', 'mail', '@']
@@ -65,16 +99,31 @@ class AutoColumnMapper:
             }
         }
     
+    @telemetry.timed('mapping.detect')
     def auto_detect_columns(self):
         """التعرف التلقائي على أنواع الأعمدة"""
         suggestions = {}
         columns = self.df.columns.tolist()
-        
+
+        # الأعمدة المسماة مسبقاً بأسماء الحقول القياسية (مثل الملفات المدمجة) تُعين مباشرة
+        canonical_fields = set(self.column_patterns) | {'review_date'}
+        exact_matches = {}
+        for column in columns:
+            if str(column) in canonical_fields:
+                exact_matches[str(column)] = column
+
         for column in columns:
             column_lower = str(column).lower()
-            
+
+            if column in exact_matches.values():
+                continue
+
             # البحث عن تطابقات في الأنماط
             for field_type, patterns_info in self.column_patterns.items():
+                # عمود تاريخ ترك العمل يطابق أيضاً كلمة 'date' في أنماط تاريخ التعيين
+                if field_type == 'hire_date' and suggestions.get('termination_date') == column:
+                    continue
+                
                 # البحث في الأنماط
                 for pattern in patterns_info['patterns']:
                     if re.search(pattern, column_lower, re.IGNORECASE):
@@ -89,12 +138,13 @@ class AutoColumnMapper:
                             break
             
             # محاولة التعرف على التواريخ
-            if self._is_date_column(column):
+            if suggestions.get('termination_date') != column and self._is_date_column(column):
                 if 'hire_date' not in suggestions:
                     suggestions['hire_date'] = column
                 elif 'review_date' not in suggestions:
                     suggestions['review_date'] = column
         
+        suggestions.update(exact_matches)
         return suggestions
     
     def _is_date_column(self, column_name):
@@ -113,8 +163,12 @@ class AutoColumnMapper:
             if pd.api.types.is_datetime64_any_dtype(self.df[column_name]):
                 return True
             
-            # اختبار التحويل
-            test_dates = pd.to_datetime(column_sample, errors='coerce')
+            # الأعمدة الرقمية لا تُعتبر تواريخ من العينة وحدها (الرواتب تشبه أرقام Excel التسلسلية)
+            if pd.api.types.is_numeric_dtype(self.df[column_name]):
+                return False
+            
+            # اختبار التحويل (اكتشاف الصيغة دون أرقام Excel: الأرقام النصية ليست دليلاً على التاريخ)
+            test_dates = to_datetime(column_sample, excel_serials=False)
             success_rate = test_dates.notna().sum() / len(column_sample)
             
             return success_rate > 0.7  # إذا نجح في 70% من الحالات
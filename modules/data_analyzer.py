@@ -6,23 +6,66 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from modules import telemetry
+from modules.pay_equity import PayEquityAnalyzer
+from modules.attrition import AttritionAnalyzer
+from modules.attendance import AttendanceAnalyzer, ATTENDANCE_FIELDS, TRAINING_FIELDS
+from modules.grouped_totals import GroupedTotals
+from modules.numeric_parser import parse_numeric
+from modules.date_parser import parse_dates
+from modules.category_normalizer import canonicalize, load_aliases, CATEGORY_FIELDS
+
+# الحقول التي يجب أن تكون رقمية - يُسجل لها تقرير فشل التحويل
+NUMERIC_FIELDS = (
+    'salary', 'allowances', 'bonus', 'tax', 'performance_score', 'kpi', 'rating'
+) + ATTENDANCE_FIELDS + TRAINING_FIELDS
+DATE_FIELDS = ('hire_date', 'review_date', 'termination_date')
 
 class FlexibleDataAnalyzer:
-    def __init__(self, dataframe, column_mapping):
-        self.df = dataframe.copy()
+    def __init__(self, dataframe, column_mapping, category_aliases=None):
+        # نسخة سطحية: التحليل يستبدل أعمدة كاملة فقط ولا يعدل القيم داخل البيانات المشتركة
+        self.df = dataframe.copy(deep=False)
         self.mapping = column_mapping
+        # الأسماء البديلة للأقسام والمواقع... (الافتراضي من HR_CATEGORY_ALIASES)
+        self.category_aliases = load_aliases() if category_aliases is None else category_aliases
         self.reverse_mapping = {v: k for k, v in column_mapping.items() if v != "❌ لا يوجد"}
+        self._pay_equity = None
+        self._attrition = None
+        self._attendance = None
+        self._totals = None
+        # نسبة القيم التي تعذر تحويلها إلى أرقام أو تواريخ لكل عمود
+        self.parse_reports = {}
+        # أعمدة التواريخ المحولة - تُحول مرة واحدة وتُستخدم في كل التحليلات
+        self._parsed_dates = {}
     
+    @telemetry.timed('analysis')
     def analyze_all(self):
         """إجراء جميع التحليلات المتاحة"""
+        telemetry.set_rows(len(self.df))
         analysis_results = {
             'kpis': {},
             'distributions': {},
             'correlations': {},
             'insights': [],
-            'warnings': []
+            'warnings': [],
+            'pay_equity': {},
+            'attrition': {},
+            'attendance': {},
+            'numeric_parsing': {}
         }
         
+        # 0. توحيد القيم الفئوية (الأقسام والمواقع والمناصب...) على القيم الفريدة فقط كـ Categorical
+        with telemetry.stage('analysis.categories', rows=len(self.df)):
+            for field in CATEGORY_FIELDS:
+                if self.mapping.get(field) in self.df.columns:
+                    self.df[self.mapping[field]] = canonicalize(self.df[self.mapping[field]], self.category_aliases)
+        
+        # تحويل أعمدة التواريخ مرة واحدة (اكتشاف الصيغة على القيم الفريدة)
+        with telemetry.stage('analysis.dates', rows=len(self.df)):
+            for field in DATE_FIELDS:
+                if self.mapping.get(field) in self.df.columns:
+                    self._to_datetime(self.mapping[field])
+        
         # 1. تحليل KPIs
         analysis_results['kpis'] = self._calculate_kpis()
         
@@ -32,22 +75,54 @@ class FlexibleDataAnalyzer:
         # 3. اكتشاف العلاقات
         analysis_results['correlations'] = self._find_correlations()
         
-        # 4. استخلاص Insights
+        # 4. عدالة الرواتب (الفجوة المعدلة حسب الجنس)
+        analysis_results['pay_equity'] = self._analyze_pay_equity()
+        
+        # 5. دوران الموظفين والبقاء الوظيفي
+        analysis_results['attrition'] = self._analyze_attrition()
+        
+        # 6. الحضور والعمل الإضافي والتدريب
+        analysis_results['attendance'] = self._analyze_attendance()
+        
+        # 7. استخلاص Insights
         analysis_results['insights'] = self._extract_insights()
         
-        # 5. التحذيرات
+        # 8. التحذيرات
         analysis_results['warnings'] = self._check_data_quality()
+        analysis_results['numeric_parsing'] = self.parse_reports
         
         return analysis_results
     
+    def _to_numeric(self, column):
+        """تحويل عمود إلى أرقام (العملات والأرقام العربية والفواصل المحلية) مع حفظ تقرير الفشل لحقول الأرقام"""
+        numbers, report = parse_numeric(self.df[column])
+        field = self.reverse_mapping.get(column)
+        if field in NUMERIC_FIELDS and report['failed']:
+            self.parse_reports[column] = dict(report, field=field)
+        return numbers
+    
+    def _to_datetime(self, column):
+        """تحويل عمود تاريخ مرة واحدة (صيغة مكتشفة، dd/mm أو mm/dd، أرقام Excel) واستبداله في البيانات مع حفظ تقرير الفشل"""
+        if column not in self._parsed_dates:
+            dates, report = parse_dates(self.df[column])
+            if report['failed']:
+                self.parse_reports[column] = dict(report, field=self.reverse_mapping.get(column))
+            self.df[column] = dates
+            self._parsed_dates[column] = dates
+        return self._parsed_dates[column]
+    
+    @telemetry.timed('analysis.kpis')
     def _calculate_kpis(self):
         """حساب المؤشرات الرئيسية بناءً على البيانات المتاحة"""
         kpis = {}
         
+        # كل مؤشر: القيمة المنسقة للعرض (value) والقيمة الرقمية (raw) للمقارنة بين الفترات
+        
         # إجمالي الموظفين (دائماً موجود)
         total_employees = len(self.df)
         kpis['total_employees'] = {
             'value': f"{total_employees:,}",
+            'raw': total_employees,
             'label': 'إجمالي الموظفين',
             'icon': '👥'
         }
@@ -59,7 +134,7 @@ class FlexibleDataAnalyzer:
                 try:
                     # تحويل إلى عدد إذا لزم الأمر
                     if not pd.api.types.is_numeric_dtype(self.df[salary_col]):
-                        self.df[salary_col] = pd.to_numeric(self.df[salary_col], errors='coerce')
+                        self.df[salary_col] = self._to_numeric(salary_col)
                     
                     salary_data = self.df[salary_col].dropna()
                     if len(salary_data) > 0:
@@ -68,12 +143,14 @@ class FlexibleDataAnalyzer:
                         
                         kpis['avg_salary'] = {
                             'value': f"${avg_salary:,.0f}" if not np.isnan(avg_salary) else "N/A",
+                            'raw': float(avg_salary),
                             'label': 'متوسط الراتب',
                             'icon': '💰'
                         }
                         
                         kpis['median_salary'] = {
                             'value': f"${median_salary:,.0f}" if not np.isnan(median_salary) else "N/A",
+                            'raw': float(median_salary),
                             'label': 'الراتب الوسيط',
                             'icon': '📊'
                         }
@@ -88,9 +165,10 @@ class FlexibleDataAnalyzer:
         if 'department' in self.mapping:
             dept_col = self.mapping['department']
             if dept_col in self.df.columns:
-                dept_count = self.df[dept_col].nunique()
+                dept_count = len(self._grouped_totals().labels)
                 kpis['departments'] = {
                     'value': dept_count,
+                    'raw': dept_count,
                     'label': 'عدد الأقسام',
                     'icon': '🏢'
                 }
@@ -101,13 +179,14 @@ class FlexibleDataAnalyzer:
             if perf_col in self.df.columns:
                 try:
                     if not pd.api.types.is_numeric_dtype(self.df[perf_col]):
-                        self.df[perf_col] = pd.to_numeric(self.df[perf_col], errors='coerce')
+                        self.df[perf_col] = self._to_numeric(perf_col)
                     
                     perf_data = self.df[perf_col].dropna()
                     if len(perf_data) > 0:
                         avg_perf = perf_data.mean()
                         kpis['avg_performance'] = {
                             'value': f"{avg_perf:.1f}/5" if not np.isnan(avg_perf) else "N/A",
+                            'raw': float(avg_perf),
                             'label': 'متوسط الأداء',
                             'icon': '📈'
                         }
@@ -120,24 +199,44 @@ class FlexibleDataAnalyzer:
             if date_col in self.df.columns:
                 try:
                     # حساب العمر التنظيمي
-                    if not pd.api.types.is_datetime64_any_dtype(self.df[date_col]):
-                        self.df[date_col] = pd.to_datetime(self.df[date_col], errors='coerce')
-                    
                     current_date = pd.Timestamp.now()
-                    tenure_days = (current_date - self.df[date_col]).dt.days
+                    tenure_days = (current_date - self._to_datetime(date_col)).dt.days
                     avg_tenure = tenure_days.mean() / 365.25
                     
                     if not np.isnan(avg_tenure):
                         kpis['avg_tenure'] = {
                             'value': f"{avg_tenure:.1f} سنوات",
+                            'raw': float(avg_tenure),
                             'label': 'متوسط العمر التنظيمي',
                             'icon': '⏳'
                         }
                 except:
                     pass
         
+        # معدل دوران الموظفين (إذا أمكن التعرف على حالات ترك العمل)
+        attrition = self._analyze_attrition()
+        if attrition.get('available'):
+            kpis['turnover_rate'] = {
+                'value': f"{attrition['turnover_rate']:.1f}%",
+                'raw': attrition['turnover_rate'],
+                'label': 'معدل دوران الموظفين',
+                'icon': '🔄'
+            }
+        
+        # نسبة الغياب (من نفس المجاميع المدمجة لكل قسم)
+        attendance = self._analyze_attendance()
+        absence = attendance.get('absence') if attendance.get('available') else None
+        if absence and absence['overall'].get('absence_rate') is not None:
+            kpis['absence_rate'] = {
+                'value': f"{absence['overall']['absence_rate']:.1f}%",
+                'raw': absence['overall']['absence_rate'],
+                'label': 'نسبة الغياب',
+                'icon': '📅'
+            }
+        
         return kpis
     
+    @telemetry.timed('analysis.distributions')
     def _analyze_distributions(self):
         """تحليل توزيع البيانات"""
         distributions = {}
@@ -168,7 +267,7 @@ class FlexibleDataAnalyzer:
             salary_col = self.mapping['salary']
             if salary_col in self.df.columns:
                 try:
-                    salary_data = pd.to_numeric(self.df[salary_col], errors='coerce').dropna()
+                    salary_data = self._to_numeric(salary_col).dropna()
                     if len(salary_data) > 0:
                         distributions['salary'] = {
                             'min': float(salary_data.min()),
@@ -180,29 +279,44 @@ class FlexibleDataAnalyzer:
                 except:
                     pass
         
+        # متوسط الراتب لكل قسم (من نفس المجاميع المدمجة)
+        if 'department' in self.mapping and self.mapping['department'] in self.df.columns:
+            totals = self._grouped_totals()
+            if 'salary' in totals:
+                distributions['salary_by_department'] = {
+                    label: float(mean) for label, mean in zip(totals.labels, totals.mean_by_group('salary'))
+                    if np.isfinite(mean)
+                }
+        
         return distributions
     
+    @telemetry.timed('analysis.correlations')
     def _find_correlations(self):
         """اكتشاف العلاقات بين المتغيرات"""
         correlations = {}
         
         # العثور على الأعمدة الرقمية
-        numeric_cols = []
+        numeric_cols = {}
         for field_type, col_name in self.mapping.items():
             if col_name in self.df.columns:
                 try:
                     # محاولة تحويل إلى عدد
-                    numeric_series = pd.to_numeric(self.df[col_name], errors='coerce')
+                    # أعمدة التواريخ تدخل كعدد أيام ولا تُستبدل في البيانات (تبقى تواريخ لبقية التحليلات)
+                    if field_type in DATE_FIELDS:
+                        numeric_series = (self._to_datetime(col_name) - pd.Timestamp(0)).dt.days
+                    else:
+                        numeric_series = self._to_numeric(col_name)
                     if numeric_series.notna().sum() > 0:  # إذا كان هناك أرقام
-                        numeric_cols.append(col_name)
-                        self.df[col_name] = numeric_series
+                        numeric_cols[col_name] = numeric_series
+                        if field_type not in DATE_FIELDS:
+                            self.df[col_name] = numeric_series
                 except:
                     continue
         
         # حساب العلاقات إذا كان هناك أكثر من عمود رقمي
         if len(numeric_cols) >= 2:
             try:
-                corr_matrix = self.df[numeric_cols].corr()
+                corr_matrix = pd.DataFrame(numeric_cols).corr()
                 correlations['matrix'] = corr_matrix.to_dict()
                 
                 # العثور على أقوى العلاقات
@@ -223,6 +337,51 @@ class FlexibleDataAnalyzer:
         
         return correlations
     
+    @telemetry.timed('analysis.pay_equity')
+    def _analyze_pay_equity(self):
+        """انحدار الراتب على الأداء ومدة الخدمة والمنصب والموقع لكل قسم ولكل جنس"""
+        if self._pay_equity is None:
+            try:
+                self._pay_equity = PayEquityAnalyzer(self.df, self.mapping).analyze()
+            except Exception as e:
+                self._pay_equity = {'available': False, 'reason': f"خطأ في التحليل: {str(e)[:80]}"}
+        return self._pay_equity
+    
+    @telemetry.timed('analysis.attrition')
+    def _analyze_attrition(self):
+        """معدل الدوران حسب الفترة والقسم ومنحنيات البقاء ومقارنة خطر ترك العمل"""
+        if self._attrition is None:
+            try:
+                self._attrition = AttritionAnalyzer(self.df, self.mapping).analyze()
+            except Exception as e:
+                self._attrition = {'available': False, 'reason': f"خطأ في التحليل: {str(e)[:80]}"}
+        return self._attrition
+    
+    def _grouped_totals(self):
+        """مجاميع كل الحقول الرقمية المعينة لكل قسم في تمريرة groupby واحدة - تشترك فيها الرؤى وتحليل الحضور"""
+        if self._totals is None:
+            fields = ('salary', 'performance_score') + ATTENDANCE_FIELDS + TRAINING_FIELDS
+            columns = {
+                field: self.df[self.mapping[field]]
+                for field in fields if field in self.mapping and self.mapping[field] in self.df.columns
+            }
+            dept_col = self.mapping.get('department')
+            groups = self.df[dept_col] if dept_col in self.df.columns else None
+            with telemetry.stage('analysis.grouped_totals', rows=len(self.df)):
+                self._totals = GroupedTotals(len(self.df), columns, groups)
+        return self._totals
+    
+    @telemetry.timed('analysis.attendance')
+    def _analyze_attendance(self):
+        """نسب الغياب والتأخير وتركز العمل الإضافي وتغطية التدريب لكل قسم"""
+        if self._attendance is None:
+            try:
+                self._attendance = AttendanceAnalyzer(self.df, self.mapping, self._grouped_totals()).analyze()
+            except Exception as e:
+                self._attendance = {'available': False, 'reason': f"خطأ في التحليل: {str(e)[:80]}"}
+        return self._attendance
+    
+    @telemetry.timed('analysis.insights')
     def _extract_insights(self):
         """استخلاص رؤى من البيانات"""
         insights = []
@@ -234,8 +393,8 @@ class FlexibleDataAnalyzer:
             
             if dept_col in self.df.columns and salary_col in self.df.columns:
                 try:
-                    self.df[salary_col] = pd.to_numeric(self.df[salary_col], errors='coerce')
-                    dept_salary = self.df.groupby(dept_col)[salary_col].mean().sort_values()
+                    totals = self._grouped_totals()
+                    dept_salary = pd.Series(totals.mean_by_group('salary'), index=totals.labels, dtype=float).dropna()
                     
                     if len(dept_salary) > 0:
                         highest_dept = dept_salary.idxmax()
@@ -253,8 +412,8 @@ class FlexibleDataAnalyzer:
             
             if perf_col in self.df.columns and salary_col in self.df.columns:
                 try:
-                    self.df[perf_col] = pd.to_numeric(self.df[perf_col], errors='coerce')
-                    self.df[salary_col] = pd.to_numeric(self.df[salary_col], errors='coerce')
+                    self.df[perf_col] = self._to_numeric(perf_col)
+                    self.df[salary_col] = self._to_numeric(salary_col)
                     
                     # حساب الارتباط باستخدام numpy
                     valid_data = self.df[[perf_col, salary_col]].dropna()
@@ -284,8 +443,54 @@ class FlexibleDataAnalyzer:
                         insights.append(f"**{gender}**: {percentage:.1f}% من الموظفين")
                     break
         
+        # 4. الفجوة المعدلة في الرواتب حسب الجنس (بعد احتساب الأداء والخدمة والمنصب والموقع والقسم)
+        pay_equity = self._analyze_pay_equity()
+        if pay_equity.get('available') and pay_equity.get('overall'):
+            for gap in pay_equity['overall']['gaps']:
+                if gap['significant']:
+                    direction = 'أعلى' if gap['adjusted_gap'] > 0 else 'أقل'
+                    insights.append(
+                        f"⚖️ رواتب **{gap['gender']}** {direction} بـ {abs(gap['adjusted_gap']):,.0f} "
+                        f"مقارنة بـ **{pay_equity['reference_gender']}** بعد تعديل الخصائص"
+                    )
+                else:
+                    insights.append(f"⚖️ لا توجد فجوة معدلة ذات دلالة في رواتب **{gap['gender']}**")
+        
+        # 5. الأقسام ذات خطر ترك العمل المرتفع
+        attrition = self._analyze_attrition()
+        if attrition.get('available'):
+            risky = [h for h in attrition['hazards'].get('department', []) if h['significant'] and h['hazard_ratio'] > 1]
+            for hazard in sorted(risky, key=lambda h: -h['hazard_ratio'])[:3]:
+                insights.append(
+                    f"🔄 خطر ترك العمل في قسم **{hazard['group']}** أعلى بـ {hazard['hazard_ratio']:.1f} ضعف من باقي الأقسام"
+                )
+            survival = attrition.get('survival')
+            if survival and survival['overall']['median_years'] is not None:
+                insights.append(f"⏳ نصف الموظفين يتركون العمل قبل **{survival['overall']['median_years']:.1f}** سنوات")
+        
+        # 6. الغياب وتركز العمل الإضافي وتغطية التدريب
+        attendance = self._analyze_attendance()
+        if attendance.get('available'):
+            absence = attendance['absence']
+            if absence and absence['by_department'] and absence['by_department'][0][absence['metric']] is not None:
+                top = absence['by_department'][0]
+                value = top[absence['metric']]
+                value_text = f"{value:.1f}%" if absence['metric'].endswith('rate') else f"{value:.1f} يوم"
+                insights.append(f"📅 أعلى غياب/تأخير في قسم **{top['department']}** ({value_text})")
+            overtime = attendance['overtime']
+            if overtime and overtime['gini'] is not None:
+                insights.append(
+                    f"⏱️ أعلى 10% من الموظفين ينفذون **{overtime['top_10pct_share']:.0f}%** من ساعات العمل الإضافي "
+                    f"(معامل Gini {overtime['gini']:.2f})"
+                )
+            training = attendance['training']
+            if training and training['by_department'] and training['by_department'][0]['coverage_pct'] is not None:
+                lowest = training['by_department'][0]
+                insights.append(f"🎓 أقل تغطية للتدريب في قسم **{lowest['department']}** ({lowest['coverage_pct']:.0f}%)")
+        
         return insights
     
+    @telemetry.timed('analysis.data_quality')
     def _check_data_quality(self):
         """فحص جودة البيانات - إصدار مصحح"""
         warnings = []
@@ -308,7 +513,7 @@ class FlexibleDataAnalyzer:
             if salary_col in self.df.columns:
                 try:
                     # التحويل إلى عدد وفلترة القيم الناقصة
-                    salary_data = pd.to_numeric(self.df[salary_col], errors='coerce')
+                    salary_data = self._to_numeric(salary_col)
                     salary_data = salary_data.dropna()
                     
                     if len(salary_data) > 0:
@@ -338,14 +543,22 @@ class FlexibleDataAnalyzer:
             date_col = self.mapping['hire_date']
             if date_col in self.df.columns:
                 try:
-                    dates = pd.to_datetime(self.df[date_col], errors='coerce')
+                    dates = self._to_datetime(date_col)
                     future_dates = dates[dates > pd.Timestamp.now()]
                     if len(future_dates) > 0:
                         warnings.append(f"⚠️ يوجد {len(future_dates)} تاريخ تعيين في المستقبل")
                 except:
                     pass
         
-        # 5. تحذير عام إذا كان هناك تحليل غير مكتمل
+        # 5. قيم رقمية أو تواريخ تعذر تحويلها (بعد فهم العملات والأرقام العربية والفواصل المحلية وصيغ التواريخ)
+        for column, report in self.parse_reports.items():
+            examples = '، '.join(report['examples'][:3])
+            target = 'تواريخ' if report['field'] in DATE_FIELDS else 'أرقام'
+            warnings.append(
+                f"⚠️ تعذر تحويل {report['failure_rate']:.1f}% من قيم العمود {column} إلى {target} ({report['failed']} قيمة، مثل: {examples})"
+            )
+        
+        # 6. تحذير عام إذا كان هناك تحليل غير مكتمل
         if len(self.df) < 10:
             warnings.append("⚠️ عدد السجلات قليل جداً، النتائج قد لا تكون دقيقة")
         
@@ -355,6 +568,7 @@ class FlexibleDataAnalyzer:
         """الحصول على البيانات بعد التعديل"""
         return self.df
     
+    @telemetry.timed('report')
     def generate_report(self):
         """توليد تقرير نصي عن التحليل - إصدار محسن"""
         try:
@@ -422,7 +636,7 @@ class FlexibleDataAnalyzer:
             if 'salary' in self.mapping:
                 salary_col = self.mapping['salary']
                 if salary_col in self.df.columns:
-                    salary_data = pd.to_numeric(self.df[salary_col], errors='coerce').dropna()
+                    salary_data = self._to_numeric(salary_col).dropna()
                     if len(salary_data) > 0:
                         report_lines.append("💰 ملخص الرواتب:")
                         report_lines.append(f"   • أعلى راتب: ${salary_data.max():,.0f}")
@@ -431,6 +645,80 @@ class FlexibleDataAnalyzer:
                         report_lines.append(f"   • الانحراف المعياري: ${salary_data.std():,.0f}")
                         report_lines.append("")
             
+            # عدالة الرواتب
+            pay_equity = self._analyze_pay_equity()
+            if pay_equity.get('available') and pay_equity.get('overall'):
+                confidence = int(pay_equity['confidence'] * 100)
+                report_lines.append(f"⚖️ عدالة الرواتب (المرجع: {pay_equity['reference_gender']}، ثقة {confidence}%):")
+                for gap in pay_equity['overall']['gaps']:
+                    report_lines.append(
+                        f"   • الفجوة المعدلة لـ {gap['gender']}: {gap['adjusted_gap']:,.0f} "
+                        f"[{gap['ci_low']:,.0f} ، {gap['ci_high']:,.0f}]"
+                        f"{' - ذات دلالة' if gap['significant'] else ''}"
+                    )
+                flagged = [
+                    (entry['department'], gap) for entry in pay_equity['by_department']
+                    for gap in entry['gaps'] if gap['significant']
+                ]
+                for department, gap in sorted(flagged, key=lambda item: -abs(item[1]['adjusted_gap']))[:5]:
+                    report_lines.append(
+                        f"   • قسم {department}: فجوة {gap['gender']} {gap['adjusted_gap']:,.0f} "
+                        f"[{gap['ci_low']:,.0f} ، {gap['ci_high']:,.0f}]"
+                    )
+                report_lines.append("")
+            
+            # دوران الموظفين
+            attrition = self._analyze_attrition()
+            if attrition.get('available'):
+                report_lines.append("🔄 دوران الموظفين:")
+                report_lines.append(
+                    f"   • المغادرون: {attrition['leavers']:,} من {attrition['headcount']:,} ({attrition['turnover_rate']:.1f}%)"
+                )
+                for row in attrition['by_group'].get('department', [])[:5]:
+                    annual = f"، سنوي {row['annual_rate']:.1f}%" if row.get('annual_rate') is not None else ""
+                    report_lines.append(f"   • قسم {row['group']}: {row['turnover_rate']:.1f}%{annual}")
+                survival = attrition.get('survival')
+                if survival:
+                    overall = survival['overall']
+                    report_lines.append(
+                        f"   • نسبة البقاء بعد سنة: {overall['retention_1y']:.1f}% - بعد 3 سنوات: {overall['retention_3y']:.1f}%"
+                        f" - بعد 5 سنوات: {overall['retention_5y']:.1f}%"
+                    )
+                    for field, label in (('department', 'قسم'), ('location', 'موقع')):
+                        for hazard in attrition['hazards'].get(field, []):
+                            if hazard['significant']:
+                                report_lines.append(
+                                    f"   • {label} {hazard['group']}: نسبة خطر الترك {hazard['hazard_ratio']:.2f} "
+                                    f"[{hazard['ci_low']:.2f} ، {hazard['ci_high']:.2f}]"
+                                )
+                report_lines.append("")
+            
+            # الحضور والعمل الإضافي والتدريب
+            attendance = self._analyze_attendance()
+            if attendance.get('available'):
+                report_lines.append("📅 الحضور والعمل الإضافي والتدريب:")
+                absence = attendance['absence']
+                if absence:
+                    overall = absence['overall']
+                    if overall.get('absence_rate') is not None:
+                        report_lines.append(f"   • نسبة الغياب: {overall['absence_rate']:.1f}%")
+                    if overall.get('avg_absent_days') is not None:
+                        report_lines.append(f"   • متوسط أيام الغياب للموظف: {overall['avg_absent_days']:.1f}")
+                    if overall.get('late_rate') is not None:
+                        report_lines.append(f"   • نسبة التأخير: {overall['late_rate']:.1f}%")
+                overtime = attendance['overtime']
+                if overtime and overtime['gini'] is not None:
+                    report_lines.append(
+                        f"   • ساعات العمل الإضافي: {overtime['total_hours']:,.0f} - معامل Gini {overtime['gini']:.2f} - "
+                        f"حصة أعلى 10% من الموظفين {overtime['top_10pct_share']:.1f}%"
+                    )
+                    for row in overtime['by_department'][:3]:
+                        report_lines.append(f"   • قسم {row['department']}: {row['share']:.1f}% من ساعات العمل الإضافي")
+                training = attendance['training']
+                if training and training['overall']['coverage_pct'] is not None:
+                    report_lines.append(f"   • تغطية التدريب: {training['overall']['coverage_pct']:.1f}% من الموظفين")
+                report_lines.append("")
+            
             # Recommendations
             report_lines.append("✅ التوصيات:")
             report_lines.append("   1. مراجعة هيكل الرواتب لضمان العدالة")
@@ -0,0 +1,207 @@
+"""
+وحدة تصدير البيانات على دفعات (CSV / CSV مضغوط / Parquet / XLSX) مع ذاكرة مؤقتة على القرص
+"""
+
+import os
+import gzip
+import shutil
+import tempfile
+import threading
+import importlib.util
+from collections import OrderedDict
+import pandas as pd
+
+# الصيغة: (امتداد الملف، نوع MIME، المكتبة المطلوبة)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv', None),
+    'csv.gz': ('csv.gz', 'application/gzip', None),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', 'pyarrow'),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsxwriter'),
+}
+
+# أقصى عدد صفوف في ورقة Excel (بدون صف العناوين)
+XLSX_MAX_ROWS = 1_048_575
+
+def available_formats():
+    """الصيغ التي تتوفر مكتباتها في البيئة الحالية"""
+    return [
+        fmt for fmt, (_, _, module) in EXPORT_FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+class DataExporter:
+    def __init__(self, dataframe, chunk_rows=50_000):
+        self.df = dataframe
+        self.chunk_rows = chunk_rows
+
+    def iter_chunks(self):
+        for start in range(0, len(self.df), self.chunk_rows):
+            yield self.df.iloc[start:start + self.chunk_rows]
+
+    def export(self, fmt, path):
+        """كتابة البيانات إلى ملف دفعة بعد دفعة - الذاكرة المستخدمة بحجم دفعة واحدة"""
+        writers = {
+            'csv': self._write_csv,
+            'csv.gz': self._write_csv_gzip,
+            'parquet': self._write_parquet,
+            'xlsx': self._write_xlsx,
+        }
+        if fmt not in writers:
+            raise ValueError(f"صيغة تصدير غير مدعومة: {fmt}")
+        writers[fmt](path)
+        return path
+
+    def _write_csv_stream(self, stream):
+        # utf-8-sig حتى يعرض Excel النصوص العربية بشكل صحيح
+        stream.write(self.df.head(0).to_csv(index=False).encode('utf-8-sig'))
+        for chunk in self.iter_chunks():
+            stream.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+    def _write_csv(self, path):
+        with open(path, 'wb') as stream:
+            self._write_csv_stream(stream)
+
+    def _write_csv_gzip(self, path):
+        with gzip.open(path, 'wb', compresslevel=6) as stream:
+            self._write_csv_stream(stream)
+
+    def _mixed_columns(self):
+        """أعمدة object بأنواع مختلطة (مثل أرقام ونصوص بعد دمج الملفات) لا يقبلها Arrow"""
+        import pyarrow as pa
+
+        mixed = []
+        for col in self.df.columns:
+            if not pd.api.types.is_object_dtype(self.df[col]):
+                continue
+            try:
+                pa.array(self.df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                mixed.append(col)
+        return mixed
+
+    def _write_parquet(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # الأعمدة المختلطة تُكتب كنصوص (القيم المفقودة تبقى مفقودة)
+        as_text = dict.fromkeys(self._mixed_columns(), 'string')
+        # المخطط من الإطار كاملاً حتى تتطابق أنواع جميع الدفعات
+        schema = pa.Schema.from_pandas(self.df.astype(as_text), preserve_index=False)
+        with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+            for chunk in self.iter_chunks():
+                writer.write_table(pa.Table.from_pandas(chunk.astype(as_text), schema=schema, preserve_index=False))
+
+    def _write_xlsx(self, path):
+        import xlsxwriter
+
+        # constant_memory: يكتب كل صف إلى القرص فور اكتماله
+        workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd',
+            'nan_inf_to_errors': True
+        })
+        header = [str(col) for col in self.df.columns]
+        worksheet, row = None, XLSX_MAX_ROWS
+        try:
+            for chunk in self.iter_chunks():
+                for values in self._xlsx_rows(chunk):
+                    if row >= XLSX_MAX_ROWS:
+                        # البيانات أكبر من حد Excel - متابعة في ورقة جديدة
+                        worksheet = workbook.add_worksheet()
+                        worksheet.write_row(0, 0, header)
+                        row = 0
+                    row += 1
+                    worksheet.write_row(row, 0, values)
+            if worksheet is None:
+                workbook.add_worksheet().write_row(0, 0, header)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _xlsx_rows(chunk):
+        """تحويل الدفعة إلى صفوف Python مع استبدال القيم المفقودة بخلايا فارغة"""
+        columns = []
+        for col in chunk.columns:
+            series = chunk[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                if getattr(series.dt, 'tz', None) is not None:
+                    series = series.dt.tz_localize(None)
+                values = series.dt.to_pydatetime().astype(object)
+            elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.astype('float64').to_numpy().astype(object)
+            else:
+                # نسخة قابلة للكتابة: pandas 3 يعيد عرضاً للقراءة فقط لأعمدة object
+                values = series.to_numpy(dtype=object, copy=True)
+            values[series.isna().to_numpy()] = None
+            columns.append(values)
+        if not columns:
+            return iter(())
+        return zip(*columns)
+
+class ExportCache:
+    """ملفات التصدير الجاهزة على القرص حسب (بصمة البيانات، الصيغة) مع إخلاء LRU حسب الحجم"""
+
+    def __init__(self, directory=None, max_bytes=2 * 1024 ** 3):
+        self.directory = directory or tempfile.mkdtemp(prefix='hr_exports_')
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        # قفل لكل ملف حتى لا يكتب طلبان نفس التصدير في الوقت نفسه
+        self._building = {}
+
+    def _path_for(self, fingerprint, fmt):
+        return os.path.join(self.directory, f"{fingerprint}.{EXPORT_FORMATS[fmt][0]}")
+
+    def get_path(self, fingerprint, fmt, dataframe):
+        """مسار ملف التصدير - ينشأ عند أول طلب فقط"""
+        key = (fingerprint, fmt)
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        try:
+            with build_lock:
+                with self._lock:
+                    if key in self.entries:
+                        return self.entries[key][0]
+                path = self._path_for(fingerprint, fmt)
+                partial = path + '.partial'
+                try:
+                    DataExporter(dataframe).export(fmt, partial)
+                    os.replace(partial, path)
+                finally:
+                    if os.path.exists(partial):
+                        os.remove(partial)
+                self._store(key, path)
+        finally:
+            # حتى عند فشل التصدير لا يبقى قفل الملف في القاموس
+            with self._lock:
+                self._building.pop(key, None)
+        return path
+
+    def read(self, fingerprint, fmt, dataframe):
+        """محتوى ملف التصدير (bytes) لزر التحميل - الملف يُغلق فور قراءته"""
+        with open(self.get_path(fingerprint, fmt, dataframe), 'rb') as stream:
+            return stream.read()
+
+    def _store(self, key, path):
+        size = os.path.getsize(path)
+        with self._lock:
+            self.entries[key] = (path, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (old_path, old_size) = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
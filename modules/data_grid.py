@@ -0,0 +1,118 @@
+"""
+وحدة جدول البيانات المقسم لصفحات - يرسل للمتصفح الصفوف الظاهرة فقط
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+class DataGrid:
+    # عدد ترتيبات الفرز المحفوظة لكل جدول (كل ترتيب = مصفوفة بطول عدد الصفوف)
+    MAX_CACHED_ORDERS = 4
+
+    def __init__(self, dataframe, max_cached_orders=MAX_CACHED_ORDERS):
+        self.df = dataframe
+        self.max_cached_orders = max_cached_orders
+        self._sort_orders = OrderedDict()
+        self._filter_masks = OrderedDict()
+        self._view = (None, None)
+        self._lock = threading.Lock()
+
+    @property
+    def total_rows(self):
+        return len(self.df)
+
+    def _position_dtype(self):
+        # int32 يكفي حتى ملياري صف ويوفر نصف الذاكرة
+        return np.int32 if len(self.df) < np.iinfo(np.int32).max else np.int64
+
+    @staticmethod
+    def _remember(cache, key, value, limit):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+    def sort_order(self, column, ascending=True):
+        """ترتيب مواقع الصفوف حسب عمود (محفوظ - يحسب مرة واحدة لكل عمود واتجاه)"""
+        key = (column, bool(ascending))
+        with self._lock:
+            if key in self._sort_orders:
+                self._sort_orders.move_to_end(key)
+                return self._sort_orders[key]
+
+        values = self.df[column].reset_index(drop=True)
+        # أعمدة object بأنواع مختلطة (أرقام ونصوص بعد دمج الملفات) لا تقبل المقارنة: الفرز بتمثيلها النصي
+        sort_key = None
+        if pd.api.types.is_object_dtype(values) and pd.api.types.infer_dtype(values, skipna=True).startswith('mixed'):
+            sort_key = lambda s: s.astype('string')
+        order = values.sort_values(
+            ascending=ascending, na_position='last', kind='stable', key=sort_key
+        ).index.to_numpy(dtype=self._position_dtype())
+
+        with self._lock:
+            self._remember(self._sort_orders, key, order, self.max_cached_orders)
+        return order
+
+    def filter_mask(self, column, text):
+        """قناع الصفوف التي يحتوي عمودها على النص (بدون حساسية لحالة الأحرف)"""
+        key = (column, text)
+        with self._lock:
+            if key in self._filter_masks:
+                self._filter_masks.move_to_end(key)
+                return self._filter_masks[key]
+
+        # البحث في القيم المميزة فقط ثم توزيع النتيجة على الصفوف
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        matches = pd.Series(uniques).astype('string').str.contains(
+            text, case=False, regex=False, na=False
+        ).to_numpy(dtype=bool)
+        mask = np.append(matches, False)[codes]
+
+        with self._lock:
+            self._remember(self._filter_masks, key, mask, self.max_cached_orders)
+        return mask
+
+    def view_positions(self, sort_by=None, ascending=True, filter_column=None, filter_text=''):
+        """مواقع الصفوف بعد التصفية والفرز - أو None إذا كان العرض هو الجدول كما هو"""
+        filter_text = (filter_text or '').strip()
+        if filter_column is None or not filter_text:
+            filter_column, filter_text = None, ''
+        if sort_by is None and filter_column is None:
+            return None
+
+        key = (sort_by, bool(ascending), filter_column, filter_text)
+        with self._lock:
+            if self._view[0] == key:
+                return self._view[1]
+
+        if sort_by is not None:
+            positions = self.sort_order(sort_by, ascending)
+            if filter_column is not None:
+                positions = positions[self.filter_mask(filter_column, filter_text)[positions]]
+        else:
+            positions = np.flatnonzero(self.filter_mask(filter_column, filter_text)).astype(self._position_dtype())
+
+        with self._lock:
+            self._view = (key, positions)
+        return positions
+
+    def page(self, page=1, page_size=50, sort_by=None, ascending=True, filter_column=None, filter_text=''):
+        """إرجاع (صفوف الصفحة، عدد الصفوف المطابقة، عدد الصفحات)"""
+        positions = self.view_positions(sort_by, ascending, filter_column, filter_text)
+        matched = self.total_rows if positions is None else len(positions)
+        page_count = max(1, -(-matched // page_size))
+        page = min(max(1, int(page)), page_count)
+
+        start = (page - 1) * page_size
+        stop = min(start + page_size, matched)
+        if positions is None:
+            window = self.df.iloc[start:stop]
+        else:
+            window = self.df.iloc[positions[start:stop]]
+        return window, matched, page_count
@@ -0,0 +1,190 @@
+"""
+وحدة سجل البيانات المشترك بين الجلسات - نسخة واحدة لكل ملف مهما تعدد المستخدمون
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger('hr_dashboard.registry')
+
+MB = 1024 * 1024
+
+class DatasetLimitError(MemoryError):
+    """تجاوز حد الذاكرة المسموح (للجلسة أو للخادم)"""
+
+def dataframe_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class DatasetRegistry:
+    def __init__(self, max_bytes=4096 * MB, session_max_bytes=1024 * MB, session_ttl=3600):
+        self.max_bytes = max_bytes
+        self.session_max_bytes = session_max_bytes
+        # الجلسات التي لم تتفاعل خلال هذه المدة (بالثواني) تفقد حجوزاتها
+        self.session_ttl = session_ttl
+        # fingerprint -> {'df', 'bytes', 'refs': set((session_id, slot)), 'last_used'}
+        self.datasets = OrderedDict()
+        # session_id -> {'slots': {slot: fingerprint}, 'last_seen'}
+        self.sessions = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """الحدود من متغيرات البيئة HR_REGISTRY_MAX_MB و HR_REGISTRY_SESSION_MAX_MB و HR_REGISTRY_SESSION_TTL"""
+        return cls(
+            max_bytes=int(float(os.environ.get('HR_REGISTRY_MAX_MB', 4096)) * MB),
+            session_max_bytes=int(float(os.environ.get('HR_REGISTRY_SESSION_MAX_MB', 1024)) * MB),
+            session_ttl=float(os.environ.get('HR_REGISTRY_SESSION_TTL', 3600))
+        )
+
+    def register(self, session_id, slot, fingerprint, df):
+        """حجز البيانات للجلسة في خانة معينة - يعيد النسخة المشتركة إن كانت مسجلة مسبقاً"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire_sessions(now)
+            session = self.sessions.setdefault(session_id, {'slots': {}, 'last_seen': now})
+            session['last_seen'] = now
+
+            entry = self.datasets.get(fingerprint)
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                size = dataframe_bytes(df)
+                if size > self.session_max_bytes:
+                    raise DatasetLimitError(
+                        f"حجم البيانات ({size // MB} MB) يتجاوز الحد المسموح لكل جلسة ({self.session_max_bytes // MB} MB)"
+                    )
+                entry = {'df': df, 'bytes': size, 'refs': set(), 'last_used': now}
+
+            # الخانة تحمل مجموعة بيانات واحدة: تحرير السابقة قبل الحجز
+            previous = session['slots'].get(slot)
+            if previous is not None and previous != fingerprint:
+                self._release(session_id, slot, previous)
+
+            others = sum(
+                self.datasets[fp]['bytes']
+                for fp in {fp for s, fp in session['slots'].items() if s != slot}
+                if fp != fingerprint and fp in self.datasets
+            )
+            if others + entry['bytes'] > self.session_max_bytes:
+                raise DatasetLimitError(
+                    f"تجاوز حد الذاكرة للجلسة ({self.session_max_bytes // MB} MB) - أغلق الملفات الأخرى أولاً"
+                )
+
+            if fingerprint not in self.datasets:
+                self._make_room(entry['bytes'])
+                self.datasets[fingerprint] = entry
+
+            entry['refs'].add((session_id, slot))
+            entry['last_used'] = now
+            self.datasets.move_to_end(fingerprint)
+            session['slots'][slot] = fingerprint
+            return entry['df']
+
+    def get(self, fingerprint):
+        """البيانات المسجلة أو None"""
+        with self._lock:
+            entry = self.datasets.get(fingerprint)
+            if entry is None:
+                return None
+            entry['last_used'] = time.monotonic()
+            self.datasets.move_to_end(fingerprint)
+            return entry['df']
+
+    def touch(self, session_id):
+        """تسجيل نشاط الجلسة حتى لا تنتهي حجوزاتها"""
+        with self._lock:
+            now = time.monotonic()
+            if session_id in self.sessions:
+                self.sessions[session_id]['last_seen'] = now
+            self._expire_sessions(now)
+
+    def release_session(self, session_id):
+        with self._lock:
+            self._drop_session(session_id)
+
+    def _release(self, session_id, slot, fingerprint):
+        entry = self.datasets.get(fingerprint)
+        if entry is not None:
+            entry['refs'].discard((session_id, slot))
+            entry['last_used'] = time.monotonic()
+        self.sessions.get(session_id, {}).get('slots', {}).pop(slot, None)
+
+    def _drop_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        for slot, fingerprint in session['slots'].items():
+            entry = self.datasets.get(fingerprint)
+            if entry is not None:
+                entry['refs'].discard((session_id, slot))
+
+    def _expire_sessions(self, now):
+        if not self.session_ttl:
+            return
+        expired = [sid for sid, s in self.sessions.items() if now - s['last_seen'] > self.session_ttl]
+        for session_id in expired:
+            self._drop_session(session_id)
+
+    def _make_room(self, needed):
+        """إخلاء البيانات غير المحجوزة الأقدم استخداماً حتى تتسع البيانات الجديدة"""
+        total = sum(entry['bytes'] for entry in self.datasets.values())
+        for fingerprint in list(self.datasets):
+            if total + needed <= self.max_bytes:
+                return
+            entry = self.datasets[fingerprint]
+            if entry['refs']:
+                continue
+            del self.datasets[fingerprint]
+            total -= entry['bytes']
+            self.evictions += 1
+            logger.info("registry_evict %s (%d bytes)", fingerprint, entry['bytes'])
+        if total + needed > self.max_bytes:
+            raise DatasetLimitError(
+                f"ذاكرة الخادم ممتلئة ({total // MB} MB من {self.max_bytes // MB} MB) - حاول لاحقاً"
+            )
+
+    def get_stats(self):
+        """ملخص استخدام الذاكرة لعرضه في لوحة الإدارة"""
+        with self._lock:
+            now = time.monotonic()
+            datasets = [
+                {
+                    'fingerprint': fingerprint[:12],
+                    'rows': len(entry['df']),
+                    'columns': len(entry['df'].columns),
+                    'mb': round(entry['bytes'] / MB, 2),
+                    'sessions': len({sid for sid, _ in entry['refs']}),
+                    'refs': len(entry['refs']),
+                    'idle_seconds': round(now - entry['last_used'], 1)
+                }
+                for fingerprint, entry in self.datasets.items()
+            ]
+            sessions = [
+                {
+                    'session': session_id[:8],
+                    'datasets': len(set(session['slots'].values())),
+                    'mb': round(sum(
+                        self.datasets[fp]['bytes'] for fp in set(session['slots'].values()) if fp in self.datasets
+                    ) / MB, 2),
+                    'idle_seconds': round(now - session['last_seen'], 1)
+                }
+                for session_id, session in self.sessions.items()
+            ]
+            total = sum(entry['bytes'] for entry in self.datasets.values())
+            return {
+                'total_mb': round(total / MB, 2),
+                'max_mb': round(self.max_bytes / MB, 2),
+                'session_max_mb': round(self.session_max_bytes / MB, 2),
+                'datasets': datasets,
+                'sessions': sessions,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,181 @@
+"""
+وحدة تحويل التواريخ مع اكتشاف الصيغة - "15/03/2020" و "٢٠٢٠-٠٣-١٥" و "15 مارس 2020" وأرقام Excel التسلسلية
+
+التحويل يتم على القيم الفريدة فقط ثم تُعاد النتائج لكل الصفوف برموز pd.factorize (تواريخ التعيين
+تتكرر كثيراً)، والصيغ الرقمية تُفكك بتعبير نمطي واحد على مستوى العمود بدلاً من التحويل عنصراً بعنصر.
+ترتيب اليوم والشهر (dd/mm أو mm/dd) يُحدد مرة واحدة للعمود كله من القيم التي لا تحتمل إلا ترتيباً واحداً.
+"""
+
+import numpy as np
+import pandas as pd
+from modules.numeric_parser import _DIGITS
+
+# يوم/شهر/سنة أو سنة/شهر/يوم بأي فاصل من / . - مع وقت اختياري (ص/م أو AM/PM)
+_NUMERIC_DATE = (
+    r'^(?P<first>\d{1,4})\s*(?P<sep>[/.\-])\s*(?P<second>\d{1,2})\s*[/.\-]\s*(?P<third>\d{1,4})'
+    r'(?:[ T]+(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<sec>\d{2}))?(?:\.\d+)?\s*(?P<ampm>[AaPp][Mm]|ص|م)?)?$'
+)
+# أرقام Excel التسلسلية (أيام منذ 1899-12-30) في نطاق معقول لتواريخ الموظفين (1930 - 2099)
+EXCEL_ORIGIN = pd.Timestamp('1899-12-30')
+EXCEL_SERIAL_RANGE = (10959, 73050)
+# أسماء الأشهر العربية (المصرية والخليجية والشامية) تُستبدل بالإنجليزية قبل اختبار الصيغ النصية
+_ARABIC_MONTHS = {
+    'يناير': 'Jan', 'فبراير': 'Feb', 'مارس': 'Mar', 'أبريل': 'Apr', 'ابريل': 'Apr', 'إبريل': 'Apr',
+    'مايو': 'May', 'يونيو': 'Jun', 'يونيه': 'Jun', 'يوليو': 'Jul', 'يوليه': 'Jul', 'أغسطس': 'Aug',
+    'اغسطس': 'Aug', 'سبتمبر': 'Sep', 'أكتوبر': 'Oct', 'اكتوبر': 'Oct', 'نوفمبر': 'Nov', 'ديسمبر': 'Dec',
+    'كانون الثاني': 'Jan', 'شباط': 'Feb', 'آذار': 'Mar', 'نيسان': 'Apr', 'أيار': 'May', 'حزيران': 'Jun',
+    'تموز': 'Jul', 'آب': 'Aug', 'أيلول': 'Sep', 'تشرين الأول': 'Oct', 'تشرين الثاني': 'Nov', 'كانون الأول': 'Dec'
+}
+_MONTH_PATTERN = '|'.join(sorted(map(str, _ARABIC_MONTHS), key=len, reverse=True))
+# التحويل المرن يقتصر على صيغة ISO بتاريخ كامل مع وقت أو منطقة زمنية ("2024-03-15T10:00:00+03:00")
+_ISO_DATETIME = (
+    r'\d{4}-\d{2}-\d{2}(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?'
+    r'(?:\s*(?:Z|UTC|GMT|[+-]\d{2}:?\d{2}))?'
+)
+# التواريخ خارج هذا النطاق تُعد فشلاً (مثل "4,5" التي يحولها التحويل المرن إلى سنة 1754)
+YEAR_RANGE = (1900, 2100)
+_TEXT_FORMATS = (
+    '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d-%b-%y', '%b %d, %Y', '%B %d, %Y', '%b %d %Y', '%B %d %Y', '%d %b, %Y'
+)
+
+def _two_digit_year(years, digits):
+    """السنة بخانتين مثل strptime: 00-68 ← 2000s و 69-99 ← 1900s"""
+    short = digits <= 2
+    return np.where(short & (years <= 68), years + 2000, np.where(short, years + 1900, years))
+
+def _numeric_dates(text):
+    """الصيغ الرقمية (d/m/y و m/d/y و y-m-d) - يعيد (تواريخ، قناع المطابقة، الصيغة المكتشفة)"""
+    parts = text.str.extract(_NUMERIC_DATE)
+    matched = parts['first'].notna().to_numpy(dtype=bool)
+    dates = np.full(len(text), np.datetime64('NaT'), dtype='datetime64[ns]')
+    if not matched.any():
+        return dates, matched, None
+
+    parts = parts[matched]
+    number = lambda name: pd.to_numeric(parts[name], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    first, second, third = number('first'), number('second'), number('third')
+    year_first = (parts['first'].str.len() == 4).to_numpy(dtype=bool)
+
+    # ترتيب اليوم والشهر للعمود كله: القيم التي يزيد فيها أحد الجزأين عن 12 تحسم الترتيب، والتعادل لصالح dd/mm
+    day_votes = int(((first > 12) & ~year_first).sum())
+    month_votes = int(((second > 12) & ~year_first).sum())
+    day_first = day_votes >= month_votes
+
+    day = np.where(year_first, third, first if day_first else second)
+    month = np.where(year_first, second, second if day_first else first)
+    year = np.where(year_first, first, _two_digit_year(third, parts['third'].str.len().to_numpy(dtype=np.float64)))
+
+    hour = np.nan_to_num(number('hour'))
+    ampm = parts['ampm'].fillna('').str.lower().to_numpy(dtype=object)
+    pm = (ampm == 'pm') | (ampm == 'م')
+    am = (ampm == 'am') | (ampm == 'ص')
+    hour = np.where(pm & (hour < 12), hour + 12, np.where(am & (hour == 12), 0, hour))
+
+    components = pd.DataFrame({
+        'year': year, 'month': month, 'day': day, 'hour': hour,
+        'minute': np.nan_to_num(number('minute')), 'second': np.nan_to_num(number('sec'))
+    })
+    dates[matched] = pd.to_datetime(components, errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+    separator = parts['sep'].mode().iloc[0]
+    order = ('%Y', '%m', '%d') if year_first.mean() >= 0.5 else (('%d', '%m', '%Y') if day_first else ('%m', '%d', '%Y'))
+    return dates, matched, separator.join(order)
+
+def _excel_serials(numbers):
+    """أرقام Excel التسلسلية إلى تواريخ (NaT خارج النطاق المعقول)"""
+    numbers = np.asarray(numbers, dtype=np.float64)
+    in_range = (numbers >= EXCEL_SERIAL_RANGE[0]) & (numbers <= EXCEL_SERIAL_RANGE[1])
+    days = pd.to_timedelta(np.where(in_range, numbers, np.nan), unit='D')
+    return (EXCEL_ORIGIN + days).to_numpy(dtype='datetime64[ns]')
+
+def _text_dates(text, sample_size=100):
+    """الصيغ النصية بأسماء الأشهر - تُختار الصيغة الأنجح على عينة ثم تُطبق على الكل دفعة واحدة"""
+    text = text.str.replace(_MONTH_PATTERN, lambda m: _ARABIC_MONTHS[m.group(0)], regex=True)
+    sample = text.head(sample_size)
+    scores = [pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum() for fmt in _TEXT_FORMATS]
+    if max(scores) == 0:
+        return np.full(len(text), np.datetime64('NaT'), dtype='datetime64[ns]'), None
+    fmt = _TEXT_FORMATS[int(np.argmax(scores))]
+    return pd.to_datetime(text, format=fmt, errors='coerce').to_numpy(dtype='datetime64[ns]'), fmt
+
+def _parse_uniques(uniques, excel_serials=True):
+    """تحويل القيم الفريدة (نصوص) إلى تواريخ - يعيد (مصفوفة datetime64 مع NaT، قناع القيم الفارغة، الصيغة)"""
+    text = pd.Series(uniques, dtype=object).map(str).str.translate(_DIGITS).str.replace('،', ',').str.strip()
+    blank = (text == '').to_numpy(dtype=bool)
+    dates, matched, detected = _numeric_dates(text)
+
+    rest = ~matched & ~blank
+    # أرقام مجردة: yyyymmdd أو رقم Excel تسلسلي
+    if rest.any():
+        compact = rest & text.str.fullmatch(r'(?:19|20)\d{6}').to_numpy(dtype=bool)
+        if compact.any():
+            dates[compact] = pd.to_datetime(text[compact], format='%Y%m%d', errors='coerce').to_numpy(dtype='datetime64[ns]')
+            rest &= ~compact
+        serial = rest & text.str.fullmatch(r'\d{4,5}(?:\.\d+)?').to_numpy(dtype=bool)
+        if excel_serials and serial.any():
+            dates[serial] = _excel_serials(text[serial].astype(float))
+            rest &= ~serial
+            detected = detected or 'excel'
+
+    # أسماء الأشهر ثم التحويل المرن لصيغ ISO فقط (وقت أو منطقة زمنية) - التحويل المرن لأي نص برقمين
+    # يخترع تواريخ لقيم مثل "1-2" أو "8/16" أو "1,234"
+    if rest.any():
+        parsed, text_format = _text_dates(text[rest])
+        dates[rest] = parsed
+        detected = detected or text_format
+        rest &= np.isnat(dates)
+        rest &= text.str.fullmatch(_ISO_DATETIME).to_numpy(dtype=bool)
+    if rest.any():
+        # القيم بمناطق زمنية مختلفة تُوحد إلى UTC ثم تُحذف المنطقة الزمنية
+        dates[rest] = pd.to_datetime(
+            text[rest], format='ISO8601', errors='coerce', utc=True
+        ).dt.tz_convert(None).to_numpy(dtype='datetime64[ns]')
+
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    dates[(years < YEAR_RANGE[0]) | (years > YEAR_RANGE[1])] = np.datetime64('NaT')
+    return dates, blank, detected
+
+def parse_dates(values, excel_serials=True, max_examples=5):
+    """تحويل عمود إلى تواريخ مع تقرير الفشل - يعيد (Series تواريخ، تقرير)
+
+    التقرير: عدد القيم غير الفارغة، عدد القيم التي تعذر تحويلها ونسبتها، أمثلة منها، والصيغة المكتشفة.
+    الأعمدة الرقمية تُعامل كأرقام Excel تسلسلية (إذا excel_serials) وأعمدة التواريخ تُعاد كما هي.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    report = {'non_null': int(series.notna().sum()), 'failed': 0, 'failure_rate': 0.0, 'examples': [], 'format': None}
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, report
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        numbers = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        if excel_serials:
+            dates = _excel_serials(numbers)
+            report['format'] = 'excel'
+        else:
+            dates = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+        failed = np.isnat(dates) & np.isfinite(numbers)
+        report['failed'] = int(failed.sum())
+        report['examples'] = [str(value) for value in numbers[np.flatnonzero(failed)[:max_examples]]]
+    else:
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object)
+        if len(uniques):
+            parsed, blank, report['format'] = _parse_uniques(uniques, excel_serials)
+        else:
+            parsed, blank = np.empty(0, dtype='datetime64[ns]'), np.zeros(0, dtype=bool)
+        # العنصر الأخير للقيم المفقودة (الرمز -1)
+        dates = np.append(parsed, np.datetime64('NaT', 'ns'))[codes]
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        failed = np.isnat(parsed) & ~blank
+        report['non_null'] = int(counts[~blank].sum())
+        report['failed'] = int(counts[failed].sum())
+        report['examples'] = [str(value) for value in uniques[np.flatnonzero(failed)[:max_examples]]]
+
+    if report['non_null']:
+        report['failure_rate'] = float(report['failed'] / report['non_null'] * 100)
+    return pd.Series(dates, index=series.index, name=series.name), report
+
+def to_datetime(values, excel_serials=True):
+    """مثل pd.to_datetime(errors='coerce') لكن يكتشف الصيغة ويفهم الأرقام العربية وأسماء الأشهر وأرقام Excel"""
+    return parse_dates(values, excel_serials)[0]
@@ -0,0 +1,68 @@
+"""
+وحدة الذاكرة المؤقتة للرسوم البيانية - تخزين JSON الرسوم مع إخلاء LRU حسب الحجم
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+class FigureCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # جلسات Streamlit تعمل في خيوط متعددة وتشترك في نفس الذاكرة
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(fingerprint, chart_name, mapping, fields, language='ar', theme='light', options=None,
+                 category_aliases=None):
+        """مفتاح يعتمد فقط على ما يؤثر في الرسم: البيانات والحقول المستخدمة واللغة والمظهر والأسماء البديلة"""
+        from modules.category_normalizer import aliases_key
+
+        mapped = tuple((field, mapping.get(field)) for field in fields)
+        return (
+            fingerprint, chart_name, mapped, language, theme,
+            json.dumps(options, sort_keys=True, default=str), aliases_key(category_aliases)
+        )
+
+    def get(self, key):
+        """إرجاع القيمة المخزنة أو None"""
+        with self._lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self.entries
+
+    def put(self, key, value):
+        """تخزين قيمة نصية (JSON) مع إخلاء الأقدم عند تجاوز الحد"""
+        size = len(value) if value else 0
+        with self._lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+
+    def get_stats(self):
+        """إحصائيات الاستخدام لعرضها في لوحة المتابعة"""
+        with self._lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
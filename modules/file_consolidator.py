@@ -0,0 +1,88 @@
+"""
+وحدة دمج عدة ملفات (مثل ملفات الشركات التابعة) في مجموعة بيانات واحدة
+"""
+
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from modules.file_loader import SmartFileLoader, BytesUpload
+from modules.column_mapper import AutoColumnMapper
+
+SOURCE_COLUMN = 'source_file'
+
+def load_and_align(content, filename):
+    """تحميل ملف واحد ومحاذاة أعمدته مع أسماء الحقول القياسية (تعمل داخل عملية منفصلة)
+
+    الأعمدة غير الموجودة في بعض الملفات تصبح قيماً مفقودة في الإطار الموحد.
+    """
+    df = SmartFileLoader(BytesUpload(content, filename)).load_file()
+    suggestions = AutoColumnMapper(df).auto_detect_columns()
+
+    # الأعمدة المعينة بأسماء الحقول القياسية وباقي الأعمدة (مثل الملاحظات) بأسمائها الأصلية،
+    # و .array يحافظ على الأنواع الفئوية والموسعة
+    columns = {field: df[column].array for field, column in suggestions.items()}
+    mapped = set(suggestions.values())
+    for column in df.columns:
+        if column in mapped:
+            continue
+        name = column if column not in columns else f"{column}_original"
+        columns[name] = df[column].array
+
+    aligned = pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+    return aligned, suggestions
+
+class FileConsolidator:
+    def __init__(self, uploaded_files, max_workers=None):
+        self.uploaded_files = uploaded_files
+        self.max_workers = max_workers
+        self.file_mappings = {}
+        self.errors = {}
+
+    def consolidate(self):
+        """تحميل الملفات بالتوازي ثم توحيدها في إطار بيانات واحد مع عمود المصدر"""
+        names = self._unique_names([f.name for f in self.uploaded_files])
+        payloads = [(f.getvalue(), f.name) for f in self.uploaded_files]
+
+        workers = self.max_workers or min(len(payloads), os.cpu_count() or 1)
+        frames = []
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = [executor.submit(load_and_align, content, filename) for content, filename in payloads]
+            # جمع النتائج بترتيب الملفات الأصلي حتى يبقى الناتج ثابتاً
+            for name, future in zip(names, futures):
+                try:
+                    aligned, mapping = future.result()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    continue
+                self.file_mappings[name] = mapping
+                aligned[SOURCE_COLUMN] = name
+                frames.append(aligned)
+
+        if not frames:
+            raise ValueError("تعذر تحميل أي من الملفات المرفوعة")
+
+        combined = pd.concat(frames, ignore_index=True, sort=False)
+        combined[SOURCE_COLUMN] = pd.Categorical(
+            combined[SOURCE_COLUMN],
+            categories=[name for name in names if name in self.file_mappings]
+        )
+        return combined
+
+    @staticmethod
+    def _unique_names(names):
+        """تمييز الملفات التي تحمل نفس الاسم"""
+        seen = {}
+        unique = []
+        for name in names:
+            seen[name] = seen.get(name, 0) + 1
+            unique.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+        return unique
+
+    def get_consolidation_info(self):
+        """ملخص الدمج: تعيين الأعمدة لكل ملف والملفات التي فشلت"""
+        return {
+            'files': len(self.uploaded_files),
+            'loaded': len(self.file_mappings),
+            'file_mappings': self.file_mappings,
+            'errors': self.errors
+        }
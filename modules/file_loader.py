@@ -5,7 +5,38 @@
 import pandas as pd
 import numpy as np
 import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from modules import telemetry
+from modules.numeric_parser import parse_numeric
+from modules.date_parser import parse_dates
+
+EXCEL_NA_VALUES = ['', 'NA', 'N/A', 'null', 'NULL']
+
+def _read_excel_sheet(content, filename, sheet_name):
+    """قراءة ورقة واحدة من محتوى ملف Excel (تعمل داخل عملية منفصلة)"""
+    loader = SmartFileLoader(BytesUpload(content, filename))
+    df = pd.read_excel(
+        io.BytesIO(content),
+        sheet_name=sheet_name,
+        dtype=str,
+        na_values=EXCEL_NA_VALUES
+    )
+    return loader._convert_numeric_columns(df)
+
+class BytesUpload(io.BytesIO):
+    """ملف في الذاكرة بنفس واجهة ملفات Streamlit المرفوعة (name و getvalue)"""
+    
+    def __init__(self, content, name):
+        super().__init__(content)
+        self.name = name
+    
+    @classmethod
+    def from_path(cls, path):
+        """قراءة ملف من القرص وتغليفه ليُمرر إلى SmartFileLoader"""
+        with open(path, 'rb') as f:
+            return cls(f.read(), os.path.basename(path))
 
 class SmartFileLoader:
     def __init__(self, uploaded_file):
@@ -13,6 +44,7 @@ class SmartFileLoader:
         self.file_extension = None
         self.sheet_names = []
         
+    @telemetry.timed('load')
     def load_file(self):
         """تحميل الملف بتنسيقاته المختلفة"""
         
@@ -38,10 +70,12 @@ class SmartFileLoader:
         
         for encoding in encodings:
             try:
-                df = pd.read_csv(
-                    io.StringIO(content.decode(encoding)),
-                    encoding=encoding
-                )
+                with telemetry.stage('load.decode'):
+                    df = pd.read_csv(
+                        io.StringIO(content.decode(encoding)),
+                        encoding=encoding
+                    )
+                    telemetry.set_rows(len(df))
                 return df
             except UnicodeDecodeError:
                 continue
@@ -57,12 +91,14 @@ class SmartFileLoader:
         # محاولة تحميل الورقة الأولى (الأكثر شيوعاً)
         try:
             # قراءة الورقة الأولى
-            df = pd.read_excel(
-                self.uploaded_file,
-                sheet_name=0,
-                dtype=str,  # قراءة كل شيء كـ نص أولاً
-                na_values=['', 'NA', 'N/A', 'null', 'NULL']
-            )
+            with telemetry.stage('load.decode'):
+                df = pd.read_excel(
+                    self.uploaded_file,
+                    sheet_name=0,
+                    dtype=str,  # قراءة كل شيء كـ نص أولاً
+                    na_values=EXCEL_NA_VALUES
+                )
+                telemetry.set_rows(len(df))
             
             # محاولة تحويل الأعمدة الرقمية
             df = self._convert_numeric_columns(df)
@@ -72,23 +108,58 @@ class SmartFileLoader:
         except Exception as e:
             raise ValueError(f"خطأ في قراءة ملف Excel: {str(e)}")
     
+    def load_sheets(self, sheet_names=None, max_workers=None):
+        """تحميل عدة أوراق (أو جميعها) بالتوازي وإرجاع قاموس {اسم الورقة: DataFrame}"""
+        if not self.uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+            raise ValueError("تحميل الأوراق المتعددة متاح لملفات Excel فقط")
+        
+        self.file_extension = 'excel'
+        content = self.uploaded_file.getvalue()
+        self.sheet_names = pd.ExcelFile(io.BytesIO(content)).sheet_names
+        
+        selected = list(sheet_names) if sheet_names else list(self.sheet_names)
+        missing = [name for name in selected if name not in self.sheet_names]
+        if missing:
+            raise ValueError(f"أوراق غير موجودة في الملف: {', '.join(map(str, missing))}")
+        
+        if len(selected) == 1:
+            return {selected[0]: _read_excel_sheet(content, self.uploaded_file.name, selected[0])}
+        
+        workers = max_workers or min(len(selected), os.cpu_count() or 1)
+        sheets = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    name: executor.submit(_read_excel_sheet, content, self.uploaded_file.name, name)
+                    for name in selected
+                }
+                for name in selected:
+                    sheets[name] = futures[name].result()
+        except Exception as e:
+            raise ValueError(f"خطأ في قراءة ملف Excel: {str(e)}")
+        
+        return sheets
+    
+    @telemetry.timed('load.convert_types')
     def _convert_numeric_columns(self, df):
-        """محاولة تحويل الأعمدة إلى أنواع رقمية"""
+        """محاولة تحويل الأعمدة النصية إلى أرقام أو تواريخ - يُحول العمود فقط إذا نجح تحويل كل قيمه"""
+        telemetry.set_rows(len(df))
         df_converted = df.copy()
         
         for column in df.columns:
-            # محاولة التحويل إلى عدد
-            try:
-                # محاولة تحويل إلى عدد صحيح أولاً
-                df_converted[column] = pd.to_numeric(df_converted[column], errors='ignore')
-            except:
-                pass
+            if not (pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column])):
+                continue
             
-            # محاولة تحويل إلى تاريخ
-            try:
-                df_converted[column] = pd.to_datetime(df_converted[column], errors='ignore')
-            except:
-                pass
+            # محاولة التحويل إلى عدد (على القيم الفريدة)
+            numbers, report = parse_numeric(df[column], max_examples=0)
+            if report['non_null'] and not report['failed']:
+                df_converted[column] = numbers
+                continue
+            
+            # محاولة تحويل إلى تاريخ (الصيغة تُكتشف من القيم الفريدة)
+            dates, report = parse_dates(df[column], excel_serials=False, max_examples=0)
+            if report['non_null'] and not report['failed']:
+                df_converted[column] = dates
         
         return df_converted
     
@@ -0,0 +1,24 @@
+"""
+وحدة حساب بصمات البيانات - تستخدم كمفاتيح للذاكرة المؤقتة
+"""
+
+import hashlib
+import pandas as pd
+
+def content_fingerprint(*parts):
+    """بصمة لمحتوى خام (bytes) أو نصوص مثل أسماء الملفات والأوراق المختارة"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        elif not isinstance(part, (bytes, bytearray, memoryview)):
+            part = repr(part).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+def dataframe_fingerprint(df):
+    """بصمة لمحتوى DataFrame (القيم وأسماء الأعمدة وأنواعها)"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    schema = [(str(col), str(dtype)) for col, dtype in df.dtypes.items()]
+    return content_fingerprint(row_hashes.tobytes(), schema)
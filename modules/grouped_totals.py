@@ -0,0 +1,68 @@
+"""
+وحدة التجميع المدمج - مجاميع عدة أعمدة رقمية لكل مجموعة (مثل القسم) في تمريرة واحدة
+
+كل الإحصاءات (المجموع وعدد القيم المعروفة وعدد القيم الموجبة) أعمدة في إطار واحد يُجمع
+بعملية groupby واحدة، فإضافة مقياس جديد تضيف أعمدة إلى الإطار وليس تمريرة جديدة على البيانات.
+"""
+
+import numpy as np
+import pandas as pd
+from modules.numeric_parser import to_numeric
+
+class GroupedTotals:
+    # الإحصاءات المتاحة لكل عمود: المجموع وعدد القيم المعروفة وعدد القيم الموجبة
+    STATS = ('sum', 'count', 'positive')
+
+    def __init__(self, row_count, columns, groups=None):
+        """columns: {اسم: قيم رقمية بطول row_count}، groups: عمود المجموعة أو None (مجموعة واحدة)"""
+        if groups is not None:
+            codes, uniques = pd.factorize(groups)
+            self.labels = list(uniques)
+        else:
+            codes = np.zeros(row_count, dtype=np.int64)
+            self.labels = []
+        # القيم المفقودة في عمود المجموعة (الرمز -1) تُجمع في مجموعة أخيرة لا تظهر في النتائج لكل مجموعة
+        n_groups = len(self.labels) + 1
+        codes = np.where(codes < 0, n_groups - 1, codes)
+
+        self.names = list(columns)
+        # القيم بالموضع (to_numpy) وليس بالفهرس: إطار بفهرس غير RangeIndex كان يُحاذى على RangeIndex فيصبح كله NaN
+        values = pd.DataFrame(
+            {name: to_numeric(columns[name]).to_numpy(dtype=np.float64, na_value=np.nan) for name in self.names},
+            index=pd.RangeIndex(len(codes))
+        )
+        frame = pd.concat([values, values.notna(), values > 0], axis=1, ignore_index=True)
+
+        # رمز المجموعة لكل صف - لمجاميع إضافية على قيم معدلة (مثل القص عند الصفر) دون تمريرة groupby جديدة
+        self.codes = codes
+        self.rows = np.bincount(codes, minlength=n_groups)
+        grouped = frame.groupby(codes, sort=False).sum()
+        self.totals = np.zeros((n_groups, frame.shape[1]))
+        self.totals[grouped.index.to_numpy()] = grouped.to_numpy(dtype=np.float64)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def _index(self, stat, name):
+        return self.STATS.index(stat) * len(self.names) + self.names.index(name)
+
+    def by_group(self, stat, name):
+        """قيمة الإحصاء لكل مجموعة معروفة (بترتيب labels)"""
+        return self.totals[:-1, self._index(stat, name)]
+
+    def overall(self, stat, name):
+        """قيمة الإحصاء لجميع الصفوف بما فيها الصفوف بدون مجموعة"""
+        return float(self.totals[:, self._index(stat, name)].sum())
+
+    @property
+    def group_rows(self):
+        return self.rows[:-1]
+
+    @property
+    def total_rows(self):
+        return int(self.rows.sum())
+
+    def mean_by_group(self, name):
+        """متوسط العمود لكل مجموعة (NaN للمجموعات بدون قيم) - مثل groupby().mean()"""
+        count = self.by_group('count', name)
+        return np.divide(self.by_group('sum', name), count, out=np.full(len(count), np.nan), where=count > 0)
@@ -0,0 +1,111 @@
+"""
+وحدة تحويل النصوص الرقمية حسب اللغة والمنطقة - "12,500 ر.س" و "١٢٬٥٠٠" و "SAR 9.750,00"
+
+التحويل يتم على القيم الفريدة فقط (بعمليات نصية على مستوى العمود) ثم تُعاد النتائج لكل الصفوف
+برموز pd.factorize، لذلك زمن التحويل يتبع عدد القيم المختلفة وليس عدد الصفوف.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+# الأرقام العربية-الهندية والفارسية وفواصلها العربية
+_DIGITS = str.maketrans({
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    '٫': '.',   # فاصلة عشرية عربية
+    '٬': ',',   # فاصل آلاف عربي
+    '،': ',',   # فاصلة عربية
+    '−': '-',   # علامة ناقص
+})
+# رموز العملات الخليجية والعربية الشائعة (بنقاط أو بدونها) ورموز العملات العامة
+CURRENCY_PATTERN = (
+    r'(?:ر\s*\.?\s*س|ر\s*\.?\s*ق|ر\s*\.?\s*ع|د\s*\.?\s*إ|د\s*\.?\s*ك|د\s*\.?\s*ب|د\s*\.?\s*أ|ج\s*\.?\s*م'
+    r'|ريال|درهم|دينار|جنيه|دولار|يورو'
+    r'|SAR|AED|QAR|KWD|BHD|OMR|EGP|JOD|USD|EUR|GBP|SR|[$€£¥﷼])'
+)
+# الفواصل العليا تستخدم أحياناً كفاصل آلاف، و% في الدرجات
+_NOISE_PATTERN = r"['’%]"
+# المسافة (بما فيها غير القابلة للكسر) فاصل آلاف فقط بين مجموعات من 3 أرقام: "12 500" رقم و "050 123 4567" ليس رقماً
+_SPACE_THOUSANDS = r'(?<=\d)\s(?=\d{3}(?:\D|$))'
+# أرقام الهواتف والمعرفات: تبدأ بـ + أو بصفر يتبعه رقم (+966... و 0501234567 و 00123)
+_IDENTIFIER_PATTERN = r'^(?:\+|[-(]?0\d)'
+# الفواصل المتكررة يجب أن تفصل مجموعات من 3 أرقام (1.234.567) حتى لا يصبح تاريخ مثل 31.12.2018 رقماً
+_VALID_PATTERN = r'[+-]?\(?(?=[.,]?\d)(?:\d{1,3}(?:[.,]\d{3})+|\d*)(?:[.,]\d+)?\)?-?'
+
+def _normalize(uniques):
+    """تحويل القيم الفريدة (نصوص) إلى أرقام - يعيد (مصفوفة float مع NaN لما تعذر تحويله، قناع القيم الفارغة)"""
+    original = pd.Series(uniques, dtype=object).map(str).str.translate(_DIGITS)
+    text = original.str.replace(CURRENCY_PATTERN, '', regex=True, flags=re.IGNORECASE)
+    text = text.str.replace(_NOISE_PATTERN, '', regex=True)
+    text = text.str.replace(_SPACE_THOUSANDS, '', regex=True).str.strip()
+    blank = (text == '').to_numpy(dtype=bool)
+    identifier = text.str.contains(_IDENTIFIER_PATTERN).to_numpy(dtype=bool)
+    valid = text.str.fullmatch(_VALID_PATTERN).to_numpy(dtype=bool) & ~identifier
+
+    # السالب المحاسبي (1,000) والسالب في آخر القيمة 1000-
+    negative = text.str.startswith('-') | text.str.startswith('(') | text.str.endswith('-')
+    text = text.str.strip('()+-')
+
+    last_comma = text.str.rfind(',')
+    last_dot = text.str.rfind('.')
+    both = (last_comma >= 0) & (last_dot >= 0)
+    single_comma = ~both & (text.str.count(',') == 1)
+    single_dot = ~both & (text.str.count(r'\.') == 1)
+    # فاصل واحد يتبعه 3 أرقام بالضبط قد يكون فاصل آلاف أو فاصلة عشرية
+    comma_thousands = text.str.contains(r',\d{3}$')
+    dot_thousands = text.str.contains(r'\.\d{3}$')
+
+    # "12,500" فاصل آلاف دائماً؛ أما "9.750" فعشري إلا إذا دلت القيم الواضحة في العمود على أن الفاصلة العشرية ','
+    comma_votes = (valid & ((both & (last_comma > last_dot)) | (single_comma & ~comma_thousands))).sum()
+    dot_votes = (valid & ((both & (last_dot > last_comma)) | (single_dot & ~dot_thousands))).sum()
+    column_comma = comma_votes > dot_votes
+
+    decimal_comma = (both & (last_comma > last_dot)) | (single_comma & ~comma_thousands)
+    decimal_dot = (both & (last_dot > last_comma)) | (single_dot & (~dot_thousands | (not column_comma)))
+
+    cleaned = text.str.replace(r'[.,]', '', regex=True)
+    cleaned[decimal_dot] = text[decimal_dot].str.replace(',', '', regex=False)
+    cleaned[decimal_comma] = text[decimal_comma].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+
+    numbers = pd.to_numeric(cleaned.where(valid), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    numbers = np.where(negative.to_numpy(dtype=bool), -numbers, numbers)
+    # ما لم يطابق الصيغ المحلية (مثل 1.2E+05) يُحول بالطريقة القياسية
+    fallback = np.isnan(numbers) & ~valid & ~identifier
+    if fallback.any():
+        numbers[fallback] = pd.to_numeric(original[fallback].str.strip(), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return numbers, blank
+
+def parse_numeric(values, max_examples=5):
+    """تحويل عمود إلى أرقام مع تقرير الفشل - يعيد (Series أرقام، تقرير)
+
+    التقرير: عدد القيم غير الفارغة، عدد القيم التي تعذر تحويلها ونسبتها، وأمثلة منها.
+    الأعمدة الرقمية أو التواريخ تُحول مباشرة بـ pd.to_numeric دون تحليل نصي.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    report = {'non_null': 0, 'failed': 0, 'failure_rate': 0.0, 'examples': []}
+
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        numbers = pd.to_numeric(series, errors='coerce')
+        report['non_null'] = int(series.notna().sum())
+        return numbers, report
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques, dtype=object)
+    parsed, blank = _normalize(uniques) if len(uniques) else (np.empty(0), np.zeros(0, dtype=bool))
+    # العنصر الأخير للقيم المفقودة (الرمز -1)
+    numbers = np.append(parsed, np.nan)[codes]
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    failed = np.isnan(parsed) & ~blank
+    non_null = int(counts[~blank].sum())
+    report['non_null'] = non_null
+    report['failed'] = int(counts[failed].sum())
+    report['failure_rate'] = float(report['failed'] / non_null * 100) if non_null else 0.0
+    report['examples'] = [str(value) for value in uniques[np.flatnonzero(failed)[:max_examples]]]
+    return pd.Series(numbers, index=series.index, name=series.name), report
+
+def to_numeric(values):
+    """مثل pd.to_numeric(errors='coerce') لكن يفهم العملات والأرقام العربية والفواصل المحلية"""
+    return parse_numeric(values)[0]
@@ -0,0 +1,390 @@
+"""
+وحدة تحليل عدالة الرواتب - انحدار الراتب على الأداء ومدة الخدمة والمنصب والموقع
+
+النماذج تُقدّر لكل قسم ولكل جنس دفعة واحدة: مصفوفات X'X لجميع المجموعات تُبنى بعمليات
+np.bincount على رموز الفئات (دون مصفوفة one-hot كاملة) ثم تُحل معاً بتفكيك eigh مكدس.
+"""
+
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from modules.numeric_parser import to_numeric
+from modules.date_parser import to_datetime
+
+OTHER_LEVEL = 'أخرى'
+
+def t_critical(df, confidence=0.95):
+    """القيمة الحرجة لتوزيع t (تقريب Cornish-Fisher - دقيق لدرجات الحرية فوق 5 تقريباً)"""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    df = np.maximum(np.asarray(df, dtype=float), 1.0)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+    )
+
+def encode_levels(series, max_levels):
+    """ترميز عمود فئوي: المستوى 0 هو الأكثر تكراراً (المرجع) وما بعد max_levels يُجمع في 'أخرى'"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty(len(uniques), dtype=np.int64)
+    rank[order] = np.arange(len(uniques))
+    codes = rank[codes]
+    labels = ['غير محدد' if pd.isna(uniques[i]) else str(uniques[i]) for i in order[:max_levels]]
+    if len(uniques) > max_levels:
+        codes = np.minimum(codes, max_levels - 1)
+        labels = labels[:max_levels - 1] + [OTHER_LEVEL]
+    return codes, labels
+
+class DesignMatrix:
+    """وصف أعمدة نموذج الانحدار دون إنشائها: أعمدة رقمية وأعمدة فئوية (مستوى المرجع محذوف)"""
+
+    def __init__(self):
+        self.blocks = []
+        self.names = []
+
+    def add_numeric(self, name, values):
+        self.blocks.append(('numeric', name, np.asarray(values, dtype=np.float64), len(self.names)))
+        self.names.append(name)
+
+    def add_categorical(self, name, codes, labels):
+        if len(labels) < 2:
+            return
+        start = len(self.names)
+        self.blocks.append(('categorical', name, (np.asarray(codes, dtype=np.int64), len(labels)), start))
+        self.names.extend(f"{name}={label}" for label in labels[1:])
+
+    @property
+    def width(self):
+        return len(self.names)
+
+    def column_index(self, name):
+        return self.names.index(name)
+
+    def normal_equations(self, groups, n_groups, y):
+        """X'X و X'y لكل مجموعة باستخدام bincount على الكتل - التكلفة O(عدد الصفوف) لكل زوج كتل"""
+        p = self.width
+        xtx = np.zeros((n_groups, p, p))
+        xty = np.zeros((n_groups, p))
+
+        for a, block_a in enumerate(self.blocks):
+            kind_a, _, data_a, col_a = block_a
+            if kind_a == 'numeric':
+                xty[:, col_a] = np.bincount(groups, weights=data_a * y, minlength=n_groups)
+            else:
+                codes_a, k_a = data_a
+                sums = np.bincount(groups * k_a + codes_a, weights=y, minlength=n_groups * k_a)
+                xty[:, col_a:col_a + k_a - 1] = sums.reshape(n_groups, k_a)[:, 1:]
+
+            for block_b in self.blocks[a:]:
+                kind_b, _, data_b, col_b = block_b
+                if kind_a == 'numeric' and kind_b == 'numeric':
+                    block = np.bincount(groups, weights=data_a * data_b, minlength=n_groups)
+                    xtx[:, col_a, col_b] = block
+                    xtx[:, col_b, col_a] = block
+                elif kind_a == 'categorical' and kind_b == 'categorical':
+                    codes_a, k_a = data_a
+                    codes_b, k_b = data_b
+                    if block_b is block_a:
+                        # أعمدة one-hot لنفس المتغير متعامدة: القطر فقط
+                        counts = np.bincount(groups * k_a + codes_a, minlength=n_groups * k_a)
+                        idx = np.arange(col_a, col_a + k_a - 1)
+                        xtx[:, idx, idx] = counts.reshape(n_groups, k_a)[:, 1:]
+                        continue
+                    counts = np.bincount(
+                        (groups * k_a + codes_a) * k_b + codes_b, minlength=n_groups * k_a * k_b
+                    ).reshape(n_groups, k_a, k_b)[:, 1:, 1:]
+                    xtx[:, col_a:col_a + k_a - 1, col_b:col_b + k_b - 1] = counts
+                    xtx[:, col_b:col_b + k_b - 1, col_a:col_a + k_a - 1] = counts.transpose(0, 2, 1)
+                else:
+                    (numeric, col_n), (categorical, col_c) = (
+                        ((data_a, col_a), (data_b, col_b)) if kind_a == 'numeric' else ((data_b, col_b), (data_a, col_a))
+                    )
+                    codes, k = categorical
+                    sums = np.bincount(groups * k + codes, weights=numeric, minlength=n_groups * k)
+                    block = sums.reshape(n_groups, k)[:, 1:]
+                    xtx[:, col_n, col_c:col_c + k - 1] = block
+                    xtx[:, col_c:col_c + k - 1, col_n] = block
+        return xtx, xty
+
+def batched_ols(design, y, groups, n_groups, confidence=0.95):
+    """حل انحدار المربعات الصغرى لجميع المجموعات معاً
+
+    المجموعات ناقصة الرتبة (مثل منصب غير موجود في قسم) تُحل بالمعكوس الزائف؛
+    المعامل يُعد قابلاً للتقدير فقط إذا كان خارج الفضاء الصفري لمصفوفة X'X.
+    """
+    xtx, xty = design.normal_equations(groups, n_groups, y)
+    n = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    y_sum = np.bincount(groups, weights=y, minlength=n_groups)
+    yty = np.bincount(groups, weights=y * y, minlength=n_groups)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(xtx)
+    tolerance = eigenvalues.max(axis=1, keepdims=True) * design.width * 1e-10
+    nonzero = eigenvalues > np.maximum(tolerance, 1e-12)
+    inverse_values = np.where(nonzero, 1.0 / np.where(nonzero, eigenvalues, 1.0), 0.0)
+    # (X'X)^+ = V diag(1/λ) V'
+    xtx_pinv = (eigenvectors * inverse_values[:, None, :]) @ eigenvectors.transpose(0, 2, 1)
+    beta = (xtx_pinv @ xty[:, :, None])[:, :, 0]
+
+    rank = nonzero.sum(axis=1)
+    residual_df = n - rank
+    rss = np.maximum(yty - np.einsum('gi,gi->g', beta, xty), 0.0)
+    tss = yty - np.divide(y_sum ** 2, n, out=np.zeros_like(n), where=n > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma2 = np.where(residual_df > 0, rss / residual_df, np.nan)
+        r2 = np.where(tss > 0, 1 - rss / tss, np.nan)
+    se = np.sqrt(np.maximum(np.diagonal(xtx_pinv, axis1=1, axis2=2), 0.0) * sigma2[:, None])
+
+    null_weight = np.abs(eigenvectors) * (~nonzero)[:, None, :]
+    estimable = null_weight.max(axis=2) < 1e-6
+    t_value = t_critical(residual_df, confidence)
+    return {
+        'beta': beta,
+        'se': se,
+        'ci_half_width': se * t_value[:, None],
+        'estimable': estimable & (residual_df[:, None] > 0),
+        'covariance': xtx_pinv * sigma2[:, None, None],
+        'mean_x': np.divide(xtx[:, 0, :], n[:, None], out=np.zeros_like(xtx[:, 0, :]), where=n[:, None] > 0),
+        'mean_y': np.divide(y_sum, n, out=np.full_like(n, np.nan), where=n > 0),
+        'n': n,
+        'rank': rank,
+        'residual_df': residual_df,
+        'r2': r2
+    }
+
+class PayEquityAnalyzer:
+    def __init__(self, dataframe, column_mapping, max_levels=30, max_groups=500,
+                 min_group_size=20, min_per_gender=5, confidence=0.95):
+        self.df = dataframe
+        self.mapping = column_mapping
+        # عدد مستويات المنصب والموقع في النموذج (الباقي في 'أخرى') وأقصى عدد أقسام
+        self.max_levels = max_levels
+        self.max_groups = max_groups
+        self.min_group_size = min_group_size
+        self.min_per_gender = min_per_gender
+        self.confidence = confidence
+
+    def _column(self, field):
+        column = self.mapping.get(field)
+        return column if column in self.df.columns else None
+
+    def _prepare(self):
+        """الصفوف الصالحة (راتب وجنس وأداء وتاريخ تعيين معروفة) وقيمها بعد التوحيد"""
+        salary = to_numeric(self.df[self._column('salary')]).to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(salary)
+        # الجنس المفقود لا يصبح مستوى 'غير محدد' يُقارن كأنه جنس (يبقى ذلك لمتغيرات الضبط فقط)
+        gender = self.df[self._column('gender')]
+        valid &= (gender.notna() & (gender.astype('string').str.strip() != '')).to_numpy(dtype=bool, na_value=False)
+        numeric = {}
+
+        perf_col = self._column('performance_score')
+        if perf_col is not None:
+            values = to_numeric(self.df[perf_col]).to_numpy(dtype=np.float64, na_value=np.nan)
+            numeric['performance'] = values
+            valid &= np.isfinite(values)
+
+        date_col = self._column('hire_date')
+        if date_col is not None:
+            dates = self.df[date_col]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = to_datetime(dates)
+            tenure = ((pd.Timestamp.now() - dates).dt.days / 365.25).to_numpy(dtype=np.float64, na_value=np.nan)
+            numeric['tenure_years'] = tenure
+            valid &= np.isfinite(tenure)
+
+        return valid, salary, numeric
+
+    def _design(self, rows, numeric, categorical, gender=None):
+        """النموذج: ثابت + الأداء ومدة الخدمة (موحدة) + المنصب والموقع [+ الجنس] [+ القسم]"""
+        design = DesignMatrix()
+        design.add_numeric('intercept', np.ones(rows))
+        scales = {}
+        for name, values in numeric.items():
+            std = values.std()
+            if std > 0:
+                scales[name] = std
+                design.add_numeric(name, (values - values.mean()) / std)
+        for name, (codes, labels) in categorical.items():
+            design.add_categorical(name, codes, labels)
+        if gender is not None:
+            design.add_categorical('gender', *gender)
+        return design, scales
+
+    def analyze(self):
+        """تحليل عدالة الرواتب - الفجوات المعدلة مع فترات الثقة"""
+        if self._column('salary') is None or self._column('gender') is None:
+            return {'available': False, 'reason': 'يتطلب تعيين عمودي الراتب والجنس'}
+
+        valid, salary, numeric = self._prepare()
+        rows = int(valid.sum())
+        if rows < self.min_group_size:
+            return {'available': False, 'reason': 'عدد السجلات الصالحة غير كافٍ'}
+
+        y_raw = salary[valid]
+        y_mean, y_std = y_raw.mean(), y_raw.std()
+        if not y_std > 0:
+            return {'available': False, 'reason': 'الرواتب متطابقة - لا يوجد تباين'}
+        # الانحدار على راتب موحد ثم إعادة المعاملات لوحدة العملة
+        y = (y_raw - y_mean) / y_std
+        self._salary_mean = y_mean
+        numeric = {name: values[valid] for name, values in numeric.items()}
+
+        subset = self.df.loc[valid]
+        gender_codes, gender_labels = encode_levels(subset[self._column('gender')], self.max_levels)
+        if len(gender_labels) < 2:
+            return {'available': False, 'reason': 'عمود الجنس يحتوي قيمة واحدة فقط'}
+
+        categorical = {}
+        for field in ('position', 'location'):
+            column = self._column(field)
+            if column is not None:
+                categorical[field] = encode_levels(subset[column], self.max_levels)
+
+        results = {
+            'available': True,
+            'rows': rows,
+            'missing_gender': int(self.df[self._column('gender')].isna().sum()),
+            'confidence': self.confidence,
+            'reference_gender': gender_labels[0],
+            'features': list(numeric) + list(categorical),
+            'overall': None,
+            'by_department': [],
+            'by_gender': []
+        }
+
+        dept_col = self._column('department')
+        departments = encode_levels(subset[dept_col], self.max_groups) if dept_col is not None else None
+
+        results['overall'] = self._overall_gap(
+            y, y_std, rows, numeric, categorical, (gender_codes, gender_labels), departments
+        )
+        if departments is not None:
+            results['by_department'] = self._department_gaps(
+                y, y_std, rows, numeric, categorical, (gender_codes, gender_labels), departments
+            )
+        results['by_gender'] = self._gender_models(
+            y, y_std, rows, numeric, categorical, (gender_codes, gender_labels)
+        )
+        return results
+
+    def _gap_entries(self, fit, design, group, y_std, gender_labels, gender_counts):
+        gaps = []
+        for level, label in enumerate(gender_labels[1:], start=1):
+            index = design.column_index(f"gender={label}")
+            if gender_counts[level] < self.min_per_gender or gender_counts[0] < self.min_per_gender:
+                continue
+            if not fit['estimable'][group, index]:
+                continue
+            gap = fit['beta'][group, index] * y_std
+            half = fit['ci_half_width'][group, index] * y_std
+            group_mean = fit['mean_y'][group] * y_std + self._salary_mean
+            gaps.append({
+                'gender': label,
+                'adjusted_gap': float(gap),
+                'gap_pct': float(gap / group_mean * 100) if group_mean else None,
+                'ci_low': float(gap - half),
+                'ci_high': float(gap + half),
+                'se': float(fit['se'][group, index] * y_std),
+                'significant': bool(abs(gap) > half),
+                'count': int(gender_counts[level])
+            })
+        return gaps
+
+    def _coefficients(self, fit, design, group, y_std, scales):
+        """ميل الراتب لكل وحدة أداء ولكل سنة خدمة مع فترة الثقة"""
+        coefficients = {}
+        for name, scale in scales.items():
+            index = design.column_index(name)
+            if not fit['estimable'][group, index]:
+                continue
+            factor = y_std / scale
+            value = fit['beta'][group, index] * factor
+            half = fit['ci_half_width'][group, index] * factor
+            coefficients[name] = {
+                'value': float(value), 'ci_low': float(value - half), 'ci_high': float(value + half)
+            }
+        return coefficients
+
+    def _overall_gap(self, y, y_std, rows, numeric, categorical, gender, departments):
+        """نموذج واحد لكل البيانات مع أثر ثابت للقسم"""
+        model_categorical = dict(categorical)
+        if departments is not None:
+            model_categorical['department'] = departments
+        design, scales = self._design(rows, numeric, model_categorical, gender)
+        groups = np.zeros(rows, dtype=np.int64)
+        fit = batched_ols(design, y, groups, 1, self.confidence)
+        gender_counts = np.bincount(gender[0], minlength=len(gender[1]))
+        return {
+            'n': rows,
+            'r2': float(fit['r2'][0]),
+            'gaps': self._gap_entries(fit, design, 0, y_std, gender[1], gender_counts),
+            'coefficients': self._coefficients(fit, design, 0, y_std, scales)
+        }
+
+    def _department_gaps(self, y, y_std, rows, numeric, categorical, gender, departments):
+        """نموذج مستقل لكل قسم - كل الأقسام في حل واحد مكدس"""
+        dept_codes, dept_labels = departments
+        n_groups = len(dept_labels)
+        design, scales = self._design(rows, numeric, categorical, gender)
+        fit = batched_ols(design, y, dept_codes, n_groups, self.confidence)
+        gender_counts = np.bincount(
+            dept_codes * len(gender[1]) + gender[0], minlength=n_groups * len(gender[1])
+        ).reshape(n_groups, len(gender[1]))
+
+        entries = []
+        for group, label in enumerate(dept_labels):
+            if fit['n'][group] < self.min_group_size:
+                continue
+            entries.append({
+                'department': label,
+                'n': int(fit['n'][group]),
+                'r2': None if np.isnan(fit['r2'][group]) else float(fit['r2'][group]),
+                'gaps': self._gap_entries(fit, design, group, y_std, gender[1], gender_counts[group]),
+                'coefficients': self._coefficients(fit, design, group, y_std, scales)
+            })
+        entries.sort(key=lambda entry: -entry['n'])
+        return entries
+
+    def _gender_models(self, y, y_std, rows, numeric, categorical, gender):
+        """نموذج لكل جنس وتفكيك Oaxaca-Blinder للفجوة مقارنة بجنس المرجع
+
+        الفجوة الخام = الجزء المفسر (اختلاف الأداء ومدة الخدمة والمنصب والموقع)
+                     + الجزء غير المفسر (اختلاف العائد على نفس الخصائص - الفجوة المعدلة)
+        """
+        gender_codes, gender_labels = gender
+        n_groups = len(gender_labels)
+        design, scales = self._design(rows, numeric, categorical)
+        fit = batched_ols(design, y, gender_codes, n_groups, self.confidence)
+
+        entries = []
+        reference_ok = fit['n'][0] >= self.min_group_size and fit['estimable'][0].all()
+        for group, label in enumerate(gender_labels):
+            if fit['n'][group] < self.min_group_size:
+                continue
+            entry = {
+                'gender': label,
+                'n': int(fit['n'][group]),
+                'mean_salary': float(fit['mean_y'][group] * y_std + self._salary_mean),
+                'r2': None if np.isnan(fit['r2'][group]) else float(fit['r2'][group]),
+                'coefficients': self._coefficients(fit, design, group, y_std, scales)
+            }
+            if group > 0 and reference_ok and fit['estimable'][group].all():
+                mean_x = fit['mean_x'][group]
+                beta_diff = fit['beta'][group] - fit['beta'][0]
+                unexplained = float(mean_x @ beta_diff)
+                variance = float(mean_x @ (fit['covariance'][group] + fit['covariance'][0]) @ mean_x)
+                df = min(fit['residual_df'][group], fit['residual_df'][0])
+                half = float(t_critical(df, self.confidence)) * np.sqrt(max(variance, 0.0))
+                raw = float(fit['mean_y'][group] - fit['mean_y'][0])
+                entry['decomposition'] = {
+                    'raw_gap': float(raw * y_std),
+                    'explained': float((raw - unexplained) * y_std),
+                    'unexplained': float(unexplained * y_std),
+                    'ci_low': float((unexplained - half) * y_std),
+                    'ci_high': float((unexplained + half) * y_std),
+                    'significant': bool(abs(unexplained) > half)
+                }
+            entries.append(entry)
+        return entries
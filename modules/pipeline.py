@@ -0,0 +1,89 @@
+"""
+وحدة تشغيل خط المعالجة الكامل بدون واجهة - تحميل ← تعيين ← تحليل ← تقرير
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, date
+from modules.file_loader import SmartFileLoader
+from modules.column_mapper import AutoColumnMapper
+from modules.data_analyzer import FlexibleDataAnalyzer
+
+STAGES = ['load', 'mapping', 'analysis', 'charts', 'report']
+
+def make_json_safe(value):
+    """تحويل نتائج التحليل إلى قيم قابلة للحفظ كـ JSON"""
+    if isinstance(value, dict):
+        return {str(k): make_json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [make_json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+class PipelineRunner:
+    def __init__(self, column_mapping=None, include_charts=False, profiler=None, category_aliases=None):
+        # إذا لم يتم تمرير تعيين محفوظ يتم استخدام AutoColumnMapper
+        self.column_mapping = column_mapping
+        # الأسماء البديلة للفئات (None: CATEGORY_ALIASES و HR_CATEGORY_ALIASES)
+        self.category_aliases = category_aliases
+        # الرسوم ليست ضمن المخرجات الدفعية، تُنشأ فقط عند الطلب (مثلاً أثناء التحليل العميق)
+        self.include_charts = include_charts
+        self.profiler = profiler
+        self.timings = {}
+
+    def _timed(self, stage, func, *args):
+        """تنفيذ مرحلة وتسجيل زمنها بالثواني"""
+        start = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                with self.profiler.stage(stage):
+                    return func(*args)
+            return func(*args)
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    def run(self, uploaded_file):
+        """تشغيل جميع المراحل على ملف واحد وإرجاع النتائج مع الأزمنة"""
+        self.timings = {}
+
+        loader = SmartFileLoader(uploaded_file)
+        df = self._timed('load', loader.load_file)
+
+        if self.column_mapping:
+            mapping = {k: v for k, v in self.column_mapping.items() if v in df.columns}
+        else:
+            mapping = self._timed('mapping', lambda: AutoColumnMapper(df).auto_detect_columns())
+        self.timings.setdefault('mapping', 0.0)
+
+        analyzer = FlexibleDataAnalyzer(df, mapping, self.category_aliases)
+        analysis = self._timed('analysis', analyzer.analyze_all)
+
+        charts = None
+        if self.include_charts:
+            from modules.smart_visualizer import SmartVisualizer
+            charts = self._timed('charts', SmartVisualizer(
+                df, mapping, analysis, category_aliases=analyzer.category_aliases
+            ).generate_all_charts)
+
+        report = self._timed('report', analyzer.generate_report)
+
+        return {
+            'file_info': loader.get_file_info(),
+            'rows': len(df),
+            'columns': len(df.columns),
+            'column_mapping': mapping,
+            'analysis': analysis,
+            'report': report,
+            'charts': len(charts) if charts is not None else None,
+            'timings': dict(self.timings)
+        }
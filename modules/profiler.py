@@ -0,0 +1,207 @@
+"""
+وحدة التحليل العميق للأداء - عينات مكدس المعالج (لرسوم flamegraph) وتقارير حجز الذاكرة لكل مرحلة
+
+المخرجات لا تحتوي أي قيم أو أسماء أعمدة من الملف، فقط مواقع في الكود وأرقام،
+لذلك يمكن مشاركتها دون مشاركة البيانات الأصلية.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _code_location(filename):
+    """مسار مختصر للملف: نسبي لمجلد المشروع أو آخر جزأين من مسار المكتبة"""
+    if filename.startswith(PACKAGE_ROOT):
+        return os.path.relpath(filename, PACKAGE_ROOT)
+    parts = filename.replace('\\', '/').split('/')
+    return '/'.join(parts[-2:])
+
+class StackSampler:
+    """أخذ عينات دورية من مكدس خيط معين دون تعديل الكود (مثل py-spy لكن داخل العملية)"""
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        # اسم المرحلة الحالية يضاف كجذر لكل مكدس حتى تنفصل المراحل في الرسم
+        self.stage = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({_code_location(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.reverse()
+        if self.stage:
+            stack.insert(0, f"stage:{self.stage}")
+        if stack:
+            self.counts[';'.join(stack)] += 1
+            self.samples += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name='hr-stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path):
+        """صيغة collapsed stacks: 'إطار;إطار;إطار عدد' - جاهزة لـ flamegraph.pl و speedscope"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+class PipelineProfiler:
+    def __init__(self, output_dir='profiles', interval=0.005, top_n=20, trace_memory=True):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_n = top_n
+        # tracemalloc يبطئ العمليات كثيرة الكائنات بشكل ملحوظ - يمكن تعطيله لقياس المعالج فقط
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.sampler = None
+        self._snapshot = None
+
+    @classmethod
+    def enabled_from_env(cls):
+        """وضع التحليل العميق مفعل عبر HR_PROFILE=1"""
+        return os.environ.get('HR_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            output_dir=os.environ.get('HR_PROFILE_DIR', 'profiles'),
+            interval=float(os.environ.get('HR_PROFILE_INTERVAL', 0.005)),
+            trace_memory=os.environ.get('HR_PROFILE_MEMORY', '1').lower() not in ('0', 'false', 'no', 'off')
+        )
+
+    @contextmanager
+    def stage(self, name):
+        """قياس مرحلة: الزمن وعدد العينات وأكبر مواقع حجز الذاكرة"""
+        if self.sampler is not None:
+            self.sampler.stage = name
+        samples_before = self.sampler.samples if self.sampler else 0
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            # لقطة نهاية المرحلة السابقة هي بداية هذه المرحلة (اللقطة مكلفة مع البيانات الكبيرة)
+            before = self._snapshot or tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            if self.sampler is not None:
+                self.sampler.stage = None
+            record = {
+                'stage': name,
+                'wall_seconds': round(wall, 4),
+                'cpu_samples': (self.sampler.samples if self.sampler else 0) - samples_before
+            }
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                self._snapshot = tracemalloc.take_snapshot()
+                record['traced_peak_mb'] = round(peak / (1024 * 1024), 2)
+                record['top_allocations'] = self._top_allocations(before, self._snapshot)
+            self.stages.append(record)
+
+    def _top_allocations(self, before, after):
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        return [
+            {
+                'location': f"{_code_location(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                'size_diff_kb': round(stat.size_diff / 1024, 1),
+                'count_diff': stat.count_diff,
+                'size_kb': round(stat.size / 1024, 1)
+            }
+            for stat in diff[:self.top_n]
+        ]
+
+    def profile(self, uploaded_file, column_mapping=None, run_dir=None, category_aliases=None):
+        """تشغيل خط المعالجة كاملاً (تحميل ← تعيين ← تحليل ← رسوم ← تقرير) تحت المحلل - يعيد (النتيجة، مجلد المخرجات)"""
+        from modules.pipeline import PipelineRunner
+
+        self.stages = []
+        self._snapshot = None
+        self.sampler = StackSampler(interval=self.interval)
+        already_tracing = tracemalloc.is_tracing()
+        if self.trace_memory and not already_tracing:
+            tracemalloc.start()
+        self.sampler.start()
+        start = time.perf_counter()
+        try:
+            runner = PipelineRunner(
+                column_mapping, include_charts=True, profiler=self, category_aliases=category_aliases
+            )
+            result = runner.run(uploaded_file)
+        finally:
+            wall = time.perf_counter() - start
+            self.sampler.stop()
+            self._snapshot = None
+            if self.trace_memory and not already_tracing:
+                tracemalloc.stop()
+
+        if run_dir is None:
+            from modules.fingerprint import content_fingerprint
+            fingerprint = content_fingerprint(uploaded_file.getvalue())
+            run_dir = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d_%H%M%S}_{fingerprint[:10]}")
+        self.write_artifacts(run_dir, result, wall)
+        return result, run_dir
+
+    def write_artifacts(self, run_dir, result, wall):
+        os.makedirs(run_dir, exist_ok=True)
+        self.sampler.write_collapsed(os.path.join(run_dir, 'cpu.collapsed'))
+
+        with open(os.path.join(run_dir, 'allocations.txt'), 'w', encoding='utf-8') as f:
+            if not any('top_allocations' in stage for stage in self.stages):
+                f.write("تتبع الذاكرة معطل (HR_PROFILE_MEMORY=0)\n")
+            for stage in self.stages:
+                if 'top_allocations' not in stage:
+                    continue
+                f.write(f"== {stage['stage']} ({stage['wall_seconds']:.3f}s, ذروة {stage['traced_peak_mb']} MB)\n")
+                for item in stage['top_allocations']:
+                    f.write(f"{item['size_diff_kb']:>12.1f} KB {item['count_diff']:>+9d}  {item['location']}\n")
+                f.write("\n")
+
+        summary = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_seconds': round(wall, 4),
+            'sample_interval': self.interval,
+            'memory_traced': self.trace_memory,
+            'cpu_samples': self.sampler.samples,
+            # حجم البيانات وحقولها فقط - بدون قيم أو أسماء أعمدة
+            'rows': result['rows'],
+            'columns': result['columns'],
+            'mapped_fields': sorted(result['column_mapping']),
+            'timings': result['timings'],
+            'stages': self.stages,
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        }
+        with open(os.path.join(run_dir, 'profile.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return run_dir
@@ -0,0 +1,117 @@
+"""
+وحدة ربط أوراق Excel المتعددة (الموظفين، الرواتب، الحضور، التقييمات) عبر رقم الموظف
+"""
+
+import pandas as pd
+import numpy as np
+from modules.column_mapper import AutoColumnMapper
+
+class SheetJoiner:
+    def __init__(self, sheets, key_columns=None):
+        # sheets: قاموس {اسم الورقة: DataFrame} بالترتيب
+        self.sheets = sheets
+        self.key_columns = dict(key_columns or {})
+        self.join_report = {}
+
+    def detect_keys(self):
+        """اكتشاف عمود رقم الموظف في كل ورقة باستخدام AutoColumnMapper"""
+        for name, df in self.sheets.items():
+            if name in self.key_columns:
+                continue
+            key_col = AutoColumnMapper(df).auto_detect_columns().get('employee_id')
+            if key_col is not None:
+                self.key_columns[name] = key_col
+        return self.key_columns
+
+    @staticmethod
+    def _normalize_keys(series):
+        """توحيد صيغة المفاتيح بين الأوراق (مثلاً 101 و '101' و 101.0)"""
+        if pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            whole = np.isfinite(values) & (np.floor(values) == values)
+            if whole[~np.isnan(values)].all():
+                series = series.astype('Int64')
+        keys = series.astype('string').str.strip()
+        return keys.mask(keys == '')
+
+    def join(self, base_sheet=None):
+        """ربط جميع الأوراق بالورقة الأساسية عبر فهرس تجزئة على رقم الموظف"""
+        self.detect_keys()
+        keyed = [name for name in self.sheets if name in self.key_columns]
+        if not keyed:
+            raise ValueError("تعذر العثور على عمود رقم الموظف في أي ورقة")
+
+        if base_sheet is None:
+            # الورقة التي تحتوي أكبر عدد من الموظفين المميزين تكون الأساس
+            base_sheet = max(keyed, key=lambda name: self.sheets[name][self.key_columns[name]].nunique())
+        if base_sheet not in keyed:
+            raise ValueError(f"الورقة الأساسية {base_sheet} لا تحتوي على رقم الموظف")
+
+        base_df = self.sheets[base_sheet]
+        base_keys = self._normalize_keys(base_df[self.key_columns[base_sheet]])
+        base_duplicated = base_keys.duplicated() & base_keys.notna()
+
+        joined = base_df.loc[~base_duplicated.to_numpy()].reset_index(drop=True)
+        base_keys = base_keys[~base_duplicated].reset_index(drop=True)
+        base_index = pd.Index(base_keys)
+
+        self.join_report = {
+            base_sheet: {
+                'role': 'base',
+                'key_column': self.key_columns[base_sheet],
+                'rows': len(base_df),
+                'duplicate_keys': int(base_duplicated.sum()),
+                'missing_keys': int(base_keys.isna().sum())
+            }
+        }
+
+        for name in keyed:
+            if name == base_sheet:
+                continue
+            joined = self._attach_sheet(joined, base_index, name)
+
+        for name in self.sheets:
+            if name not in self.key_columns:
+                self.join_report[name] = {'role': 'skipped', 'reason': 'لا يوجد عمود رقم الموظف'}
+
+        return joined
+
+    def _attach_sheet(self, joined, base_index, name):
+        """إضافة أعمدة ورقة واحدة إلى الإطار المدمج - O(عدد صفوف الورقة + الأساس)"""
+        df = self.sheets[name]
+        key_col = self.key_columns[name]
+        keys = self._normalize_keys(df[key_col])
+
+        duplicated = keys.duplicated() & keys.notna()
+        first_rows = np.flatnonzero(~duplicated.to_numpy() & keys.notna().to_numpy())
+        sheet_index = pd.Index(keys.to_numpy()[first_rows])
+
+        # لكل موظف في الورقة الأساسية: موقع صفه في هذه الورقة (-1 إذا غير موجود)
+        positions = sheet_index.get_indexer(base_index)
+        matched = positions >= 0
+        rows = np.where(matched, first_rows[np.maximum(positions, 0)] if len(first_rows) else 0, -1)
+
+        for column in df.columns:
+            if column == key_col:
+                continue
+            target = column if column not in joined.columns else f"{name}.{column}"
+            joined[target] = pd.api.extensions.take(df[column].array, rows, allow_fill=True)
+
+        in_base = sheet_index.isin(base_index)
+        unmatched = sheet_index[~in_base]
+        self.join_report[name] = {
+            'role': 'joined',
+            'key_column': key_col,
+            'rows': len(df),
+            'matched_employees': int(matched.sum()),
+            'unmatched_keys': int(len(unmatched)),
+            'unmatched_sample': unmatched[:10].tolist(),
+            'base_employees_missing': int((~matched).sum()),
+            'duplicate_keys': int(duplicated.sum()),
+            'missing_keys': int(keys.isna().sum())
+        }
+        return joined
+
+    def get_join_report(self):
+        """تقرير الربط لكل ورقة: المطابقات والمفاتيح غير المطابقة والتكرارات"""
+        return self.join_report
@@ -2,59 +2,163 @@
 وحدة إنشاء الرسوم البيانية الذكية - تتكيف مع البيانات المتاحة
 """
 
+import json
+import time
 import plotly.graph_objects as go
 import plotly.express as px
-import pandas as pd
+import plotly.io as pio
 import numpy as np
+from modules.chart_budget import ChartBudget
+from modules import telemetry
+from modules.numeric_parser import to_numeric
+from modules.category_normalizer import canonicalize, load_aliases
 
 class SmartVisualizer:
-    def __init__(self, dataframe, column_mapping, analysis_results):
+    # فوق هذا العدد من الصفوف يتم تجميع الرسوم على الخادم بدلاً من إرسال كل نقطة
+    LARGE_DATA_THRESHOLD = 50000
+    DENSITY_BINS = 60
+    # حد أقصى لعدد الأعمدة عند استخدام قواعد تلقائية مثل 'fd' أو 'auto'
+    MAX_HISTOGRAM_BINS = 200
+    
+    # (اسم الرسم، العنوان، الحقول المطلوبة في التعيين، دالة الإنشاء) بترتيب العرض
+    CHARTS = [
+        ('department', 'توزيع الموظفين حسب القسم', ['department'], '_create_department_chart'),
+        ('salary', 'توزيع الرواتب', ['salary'], '_create_salary_chart'),
+        ('performance', 'توزيع درجات الأداء', ['performance_score'], '_create_performance_chart'),
+        ('correlation', 'العلاقة بين الراتب والأداء', ['salary', 'performance_score'], '_create_correlation_chart'),
+        ('location', 'توزيع الموظفين حسب الموقع', ['location'], '_create_location_chart'),
+        ('position', 'توزيع الموظفين حسب المسمى الوظيفي', ['position'], '_create_position_chart'),
+        ('turnover', 'معدل دوران الموظفين حسب القسم', ['status', 'department'], '_create_turnover_chart'),
+        ('turnover_trend', 'معدل دوران الموظفين حسب الفترة', ['status', 'hire_date', 'termination_date'], '_create_turnover_trend_chart'),
+        ('retention', 'منحنيات البقاء الوظيفي (Kaplan-Meier)', ['status', 'hire_date', 'termination_date'], '_create_retention_chart'),
+        ('attrition_hazard', 'مقارنة خطر ترك العمل', ['status', 'hire_date', 'termination_date'], '_create_hazard_chart'),
+    ]
+    # حقول اختيارية تغير الرسم دون أن تكون شرطاً لإتاحته (تدخل في مفتاح الذاكرة المؤقتة فقط)
+    OPTIONAL_FIELDS = {
+        'retention': ['department'],
+        'attrition_hazard': ['department', 'location', 'employment_type'],
+    }
+    
+    def __init__(self, dataframe, column_mapping, analysis_results, histogram_bins=30,
+                 figure_cache=None, fingerprint=None, language='ar', theme='light', chart_budget=None,
+                 category_aliases=None):
         self.df = dataframe
         self.mapping = column_mapping
         self.analysis = analysis_results
+        # نفس الأسماء البديلة المستخدمة في التحليل (الافتراضي من HR_CATEGORY_ALIASES)
+        self.category_aliases = load_aliases() if category_aliases is None else category_aliases
+        # عدد صحيح أو قاعدة من قواعد NumPy ('auto', 'fd', 'sturges', 'sqrt', ...)
+        self.histogram_bins = histogram_bins
+        # الذاكرة المؤقتة تستخدم فقط عند توفر بصمة للبيانات
+        self.figure_cache = figure_cache
+        self.fingerprint = fingerprint
+        self.language = language
+        self.theme = theme
+        # حدود حجم الرسوم وتقارير القياس لكل رسم (الحجم قبل/بعد وزمن الإنشاء)
+        self.chart_budget = chart_budget or ChartBudget()
+        self.chart_reports = []
+    
+    def get_chart_descriptors(self):
+        """قائمة الرسوم المتاحة دون إنشائها - كل رسم يُنشأ عند استدعاء build() فقط"""
+        descriptors = []
+        
+        for name, title, fields, builder in self.CHARTS:
+            if not all(field in self.mapping for field in fields):
+                continue
+            if self.df is not None and not all(self.mapping[field] in self.df.columns for field in fields):
+                continue
+            descriptors.append(ChartDescriptor(self, name, title, fields, builder))
+        
+        return descriptors
     
     def generate_all_charts(self):
         """توليد جميع الرسوم البيانية الممكنة"""
         charts = []
         
-        # 1. توزيع الأقسام
-        if 'department' in self.mapping:
-            dept_chart = self._create_department_chart()
-            if dept_chart:
-                charts.append(dept_chart)
-        
-        # 2. توزيع الرواتب
-        if 'salary' in self.mapping:
-            salary_chart = self._create_salary_chart()
-            if salary_chart:
-                charts.append(salary_chart)
-        
-        # 3. توزيع الأداء
-        if 'performance_score' in self.mapping:
-            performance_chart = self._create_performance_chart()
-            if performance_chart:
-                charts.append(performance_chart)
-        
-        # 4. العلاقة بين الراتب والأداء
-        if 'salary' in self.mapping and 'performance_score' in self.mapping:
-            correlation_chart = self._create_correlation_chart()
-            if correlation_chart:
-                charts.append(correlation_chart)
-        
-        # 5. توزيع المواقع
-        if 'location' in self.mapping:
-            location_chart = self._create_location_chart()
-            if location_chart:
-                charts.append(location_chart)
-        
-        # 6. توزيع الوظائف
-        if 'position' in self.mapping:
-            position_chart = self._create_position_chart()
-            if position_chart:
-                charts.append(position_chart)
+        for descriptor in self.get_chart_descriptors():
+            chart = descriptor.build()
+            if chart:
+                charts.append(chart)
         
         return charts
     
+    def _cache_key(self, name, fields):
+        return self.figure_cache.make_key(
+            self.fingerprint, name, self.mapping, list(fields) + self.OPTIONAL_FIELDS.get(name, []),
+            self.language, self.theme, {'histogram_bins': self.histogram_bins},
+            category_aliases=self.category_aliases
+        )
+    
+    def _render_chart(self, name, builder):
+        """تشغيل دالة الإنشاء وتطبيق المظهر وحد الحجم - يعيد (الرسم، تقرير القياس)"""
+        with telemetry.stage(f'chart.{name}', rows=len(self.df)):
+            start = time.perf_counter()
+            chart = getattr(self, builder)()
+            report = None
+            if chart:
+                chart['figure'].update_layout(template=self._template())
+                chart['figure'], report = self.chart_budget.enforce(
+                    name, chart['figure'], time.perf_counter() - start
+                )
+                self.chart_reports.append(report)
+        return chart, report
+    
+    @staticmethod
+    def _cache_entry(chart, report):
+        # الرسوم غير المتاحة تُخزن أيضاً حتى لا يعاد فحصها في كل تشغيل
+        entry = {'title': chart['title'], 'figure': chart['figure'].to_json(), 'report': report} if chart else None
+        return json.dumps(entry)
+    
+    def _build_chart(self, name, fields, builder):
+        """إنشاء رسم واحد أو جلبه من الذاكرة المؤقتة دون لمس البيانات"""
+        cache_key = None
+        if self.figure_cache is not None and self.fingerprint:
+            cache_key = self._cache_key(name, fields)
+            cached = self.figure_cache.get(cache_key)
+            if cached is not None:
+                entry = json.loads(cached)
+                if entry is None:
+                    return None
+                self.chart_reports.append(dict(entry['report'], cached=True, build_ms=0.0))
+                return {
+                    'title': entry['title'],
+                    'figure': pio.from_json(entry['figure'], skip_invalid=True),
+                    'available': True
+                }
+        
+        chart, report = self._render_chart(name, builder)
+        if cache_key is not None:
+            self.figure_cache.put(cache_key, self._cache_entry(chart, report))
+        
+        return chart
+    
+    def build_cache_entries(self):
+        """إنشاء كل الرسوم المتاحة كنصوص JSON جاهزة للذاكرة المؤقتة (تستخدم في العمليات المنفصلة)"""
+        return {
+            descriptor.name: self._cache_entry(*self._render_chart(descriptor.name, descriptor.builder))
+            for descriptor in self.get_chart_descriptors()
+        }
+    
+    def store_cache_entries(self, entries):
+        """تخزين رسوم أنشئت في عملية أخرى حتى تجدها get_chart_descriptors() جاهزة"""
+        if self.figure_cache is None or not self.fingerprint:
+            return
+        for name, title, fields, builder in self.CHARTS:
+            if name in entries:
+                self.figure_cache.put(self._cache_key(name, fields), entries[name])
+    
+    def has_cached_charts(self):
+        """هل كل الرسوم المتاحة موجودة في الذاكرة المؤقتة"""
+        if self.figure_cache is None or not self.fingerprint:
+            return False
+        return all(
+            self._cache_key(d.name, d.fields) in self.figure_cache
+            for d in self.get_chart_descriptors()
+        )
+    
+    def _template(self):
+        return 'plotly_dark' if self.theme == 'dark' else 'plotly_white'
+    
     def _create_department_chart(self):
         """إنشاء رسم توزيع الأقسام"""
         dept_col = self.mapping['department']
@@ -63,7 +167,7 @@ class SmartVisualizer:
             return None
         
         # حساب التوزيع
-        dept_counts = self.df[dept_col].value_counts().reset_index()
+        dept_counts = canonicalize(self.df[dept_col], self.category_aliases).value_counts().reset_index()
         dept_counts.columns = ['department', 'count']
         
         # إذا كان هناك أكثر من 15 قسم، أخذ أول 15 فقط
@@ -102,17 +206,27 @@ class SmartVisualizer:
         
         try:
             # تحويل إلى عدد
-            salary_data = pd.to_numeric(self.df[salary_col], errors='coerce').dropna()
+            salary_data = to_numeric(self.df[salary_col]).dropna()
             
             if len(salary_data) == 0:
                 return None
             
-            # إنشاء histogram
-            fig = px.histogram(
-                salary_data,
-                nbins=30,
+            # إنشاء histogram من أعمدة محسوبة على الخادم (حجم الرسم بعدد الأعمدة لا بعدد الصفوف)
+            counts, edges = self._histogram(salary_data.to_numpy(dtype=float))
+            fig = go.Figure(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                # float64 ثابت الحجم: Plotly يصغّر نوع الأعداد الصحيحة حسب أكبر قيمة فيكبر الرسم مع عدد الصفوف
+                y=counts.astype(np.float64),
+                width=np.diff(edges),
+                name='الراتب',
+                customdata=np.stack([edges[:-1], edges[1:]], axis=1),
+                hovertemplate='%{customdata[0]:,.0f} - %{customdata[1]:,.0f}<br>عدد الموظفين: %{y}<extra></extra>'
+            ))
+            fig.update_layout(
                 title='توزيع الرواتب',
-                labels={'value': 'الراتب', 'count': 'عدد الموظفين'}
+                xaxis_title='الراتب',
+                yaxis_title='عدد الموظفين',
+                bargap=0
             )
             
             # إضافة خط للمتوسط
@@ -144,17 +258,32 @@ class SmartVisualizer:
         
         try:
             # تحويل إلى عدد
-            perf_data = pd.to_numeric(self.df[perf_col], errors='coerce').dropna()
+            perf_data = to_numeric(self.df[perf_col]).dropna()
             
             if len(perf_data) == 0:
                 return None
             
-            # إنشاء box plot
-            fig = px.box(
-                perf_data,
-                title='توزيع درجات الأداء',
-                labels={'value': 'درجة الأداء'}
-            )
+            # إنشاء box plot من الملخص الخماسي المحسوب على الخادم
+            summary = self._box_summary(perf_data.to_numpy(dtype=float))
+            fig = go.Figure(go.Box(
+                x=['درجة الأداء'],
+                q1=[summary['q1']],
+                median=[summary['median']],
+                q3=[summary['q3']],
+                lowerfence=[summary['lowerfence']],
+                upperfence=[summary['upperfence']],
+                mean=[summary['mean']],
+                name='درجة الأداء',
+                boxpoints=False
+            ))
+            fig.update_layout(title='توزيع درجات الأداء')
+            if summary['outliers'] > 0:
+                fig.add_annotation(
+                    x=0.05, y=0.95,
+                    xref="paper", yref="paper",
+                    text=f"قيم شاذة: {summary['outliers']:,}",
+                    showarrow=False
+                )
             
             fig.update_layout(
                 xaxis_title='الأداء',
@@ -170,6 +299,53 @@ class SmartVisualizer:
         except:
             return None
     
+    def _histogram(self, values):
+        """حساب أعمدة التوزيع بـ NumPy حسب قاعدة التقسيم المحددة (بحد أقصى MAX_HISTOGRAM_BINS)"""
+        bins = min(self._bin_count(values), self.MAX_HISTOGRAM_BINS)
+        return np.histogram(values, bins=np.histogram_bin_edges(values, bins=bins))
+    
+    def _bin_count(self, values):
+        """عدد الأعمدة قبل حساب الحدود: القواعد التلقائية ('fd' و 'auto' ...) قد تعطي ملايين الأعمدة"""
+        if not isinstance(self.histogram_bins, str):
+            return max(int(self.histogram_bins), 1)
+        n = len(values)
+        data_range = float(values.max() - values.min()) if n else 0.0
+        if n == 0 or data_range == 0:
+            return 1
+        # عرض العمود لكل قاعدة بنفس صيغ NumPy
+        q1, q3 = np.percentile(values, [25, 75])
+        fd = 2.0 * (q3 - q1) * n ** (-1 / 3)
+        sturges = data_range / (np.log2(n) + 1.0)
+        widths = {
+            'sqrt': data_range / np.sqrt(n),
+            'sturges': sturges,
+            'rice': data_range / (2.0 * n ** (1 / 3)),
+            'scott': (24.0 * np.pi ** 0.5 / n) ** (1 / 3) * float(np.std(values)),
+            'fd': fd,
+            'auto': min(fd, sturges) if fd > 0 else sturges,
+        }
+        if self.histogram_bins not in widths:
+            # القواعد الأخرى (doane و stone) محدودة العدد أصلاً
+            return len(np.histogram_bin_edges(values, bins=self.histogram_bins)) - 1
+        width = widths[self.histogram_bins]
+        return int(np.ceil(data_range / width)) if width > 0 else 1
+    
+    @staticmethod
+    def _box_summary(values):
+        """الملخص الخماسي وحدود القيم الشاذة (1.5 × IQR) كما يحسبها Plotly"""
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        return {
+            'q1': float(q1),
+            'median': float(median),
+            'q3': float(q3),
+            'lowerfence': float(inside.min()),
+            'upperfence': float(inside.max()),
+            'mean': float(values.mean()),
+            'outliers': int(len(values) - len(inside))
+        }
+    
     def _create_correlation_chart(self):
         """إنشاء رسم العلاقة بين الراتب والأداء"""
         salary_col = self.mapping['salary']
@@ -179,27 +355,40 @@ class SmartVisualizer:
             return None
         
         try:
-            # تحويل إلى عدد
-            df_clean = self.df.copy()
-            df_clean[salary_col] = pd.to_numeric(df_clean[salary_col], errors='coerce')
-            df_clean[perf_col] = pd.to_numeric(df_clean[perf_col], errors='coerce')
-            df_clean = df_clean.dropna(subset=[salary_col, perf_col])
+            # تحويل العمودين فقط إلى أرقام بدلاً من نسخ الإطار بالكامل
+            x = to_numeric(self.df[perf_col]).to_numpy(dtype=float)
+            y = to_numeric(self.df[salary_col]).to_numpy(dtype=float)
+            valid = ~(np.isnan(x) | np.isnan(y))
+            x, y = x[valid], y[valid]
             
-            if len(df_clean) == 0:
+            if len(x) == 0:
                 return None
             
-            # إنشاء scatter plot
-            fig = px.scatter(
-                df_clean,
-                x=perf_col,
-                y=salary_col,
-                trendline="ols",
+            if len(x) > self.LARGE_DATA_THRESHOLD:
+                # بيانات كبيرة: كثافة ثنائية الأبعاد محسوبة على الخادم بحجم ثابت
+                fig = self._density_heatmap(x, y)
+            else:
+                fig = go.Figure(go.Scatter(x=x, y=y, mode='markers', name='الموظفون', opacity=0.7))
+            
+            fig.update_layout(
                 title='العلاقة بين الراتب والأداء',
-                labels={perf_col: 'درجة الأداء', salary_col: 'الراتب'}
+                xaxis_title='درجة الأداء',
+                yaxis_title='الراتب'
             )
             
-            # حساب معامل الارتباط
-            correlation = df_clean[[perf_col, salary_col]].corr().iloc[0,1]
+            # خط الاتجاه ومعامل الارتباط محسوبان بـ NumPy
+            if len(x) > 1 and np.ptp(x) > 0:
+                slope, intercept = np.polyfit(x, y, 1)
+                x_line = np.array([x.min(), x.max()])
+                fig.add_trace(go.Scatter(
+                    x=x_line,
+                    y=slope * x_line + intercept,
+                    mode='lines',
+                    name='خط الاتجاه',
+                    line=dict(color='red')
+                ))
+            
+            correlation = np.corrcoef(x, y)[0, 1] if len(x) > 1 else np.nan
             
             # إضافة نص معامل الارتباط
             if not np.isnan(correlation):
@@ -222,6 +411,24 @@ class SmartVisualizer:
         except:
             return None
     
+    def _density_heatmap(self, x, y):
+        """تجميع النقاط في شبكة ثنائية الأبعاد - حجم الرسم لا يعتمد على عدد الصفوف"""
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=self.DENSITY_BINS)
+        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+        
+        # الخلايا الفارغة تبقى شفافة
+        z = np.where(counts.T > 0, counts.T, np.nan)
+        
+        return go.Figure(go.Heatmap(
+            x=x_centers,
+            y=y_centers,
+            z=z,
+            colorscale='Blues',
+            colorbar=dict(title='عدد الموظفين'),
+            name='كثافة الموظفين'
+        ))
+    
     def _create_location_chart(self):
         """إنشاء رسم توزيع المواقع"""
         location_col = self.mapping['location']
@@ -230,7 +437,7 @@ class SmartVisualizer:
             return None
         
         # حساب التوزيع
-        location_counts = self.df[location_col].value_counts().reset_index()
+        location_counts = canonicalize(self.df[location_col], self.category_aliases).value_counts().reset_index()
         location_counts.columns = ['location', 'count']
         
         # إذا كان هناك أكثر من 10 مواقع، أخذ أول 10 فقط
@@ -262,7 +469,7 @@ class SmartVisualizer:
             return None
         
         # حساب التوزيع
-        position_counts = self.df[position_col].value_counts().reset_index()
+        position_counts = canonicalize(self.df[position_col], self.category_aliases).value_counts().reset_index()
         position_counts.columns = ['position', 'count']
         
         # إذا كان هناك أكثر من 15 وظيفة، أخذ أول 15 فقط
@@ -290,4 +497,186 @@ class SmartVisualizer:
             'title': 'توزيع الموظفين حسب المسمى الوظيفي',
             'figure': fig,
             'available': True
-        }
\ No newline at end of file
+        }
+
+    def _attrition(self):
+        """نتائج تحليل الدوران المحسوبة مسبقاً في FlexibleDataAnalyzer (الرسوم لا تعيد الحساب)"""
+        attrition = (self.analysis or {}).get('attrition') or {}
+        return attrition if attrition.get('available') else None
+    
+    def _create_turnover_chart(self):
+        """معدل الدوران لكل قسم (نسبة المغادرين والمعدل السنوي لآخر 12 شهراً إن توفر)"""
+        attrition = self._attrition()
+        if attrition is None or not attrition['by_group'].get('department'):
+            return None
+        
+        rows = attrition['by_group']['department'][:15]
+        departments = [row['group'] for row in rows]
+        fig = go.Figure(go.Bar(
+            x=departments,
+            y=[row['turnover_rate'] for row in rows],
+            name='نسبة المغادرين',
+            customdata=[[row['leavers'], row['headcount']] for row in rows],
+            hovertemplate='%{x}<br>%{y:.1f}% (%{customdata[0]} من %{customdata[1]})<extra></extra>'
+        ))
+        if any(row.get('annual_rate') is not None for row in rows):
+            fig.add_trace(go.Bar(
+                x=departments,
+                y=[row.get('annual_rate') for row in rows],
+                name='المعدل السنوي (آخر 12 شهراً)'
+            ))
+        fig.add_hline(
+            y=attrition['turnover_rate'],
+            line_dash="dash",
+            line_color="red",
+            annotation_text=f"الإجمالي: {attrition['turnover_rate']:.1f}%",
+            annotation_position="top right"
+        )
+        fig.update_layout(
+            title='معدل دوران الموظفين حسب القسم',
+            xaxis_title='القسم',
+            yaxis_title='معدل الدوران %',
+            barmode='group',
+            xaxis_tickangle=45
+        )
+        
+        return {
+            'title': 'معدل دوران الموظفين حسب القسم',
+            'figure': fig,
+            'available': True
+        }
+    
+    def _create_turnover_trend_chart(self):
+        """عدد المغادرين والمعينين ومعدل الدوران لكل فترة"""
+        attrition = self._attrition()
+        if attrition is None or not attrition['by_period']:
+            return None
+        
+        periods = attrition['by_period']
+        labels = [row['period'] for row in periods]
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=labels, y=[row['hires'] for row in periods], name='المعينون'))
+        fig.add_trace(go.Bar(x=labels, y=[row['exits'] for row in periods], name='المغادرون'))
+        fig.add_trace(go.Scatter(
+            x=labels,
+            y=[row['turnover_rate'] for row in periods],
+            name='معدل الدوران %',
+            mode='lines+markers',
+            yaxis='y2'
+        ))
+        fig.update_layout(
+            title='معدل دوران الموظفين حسب الفترة',
+            xaxis_title='الفترة',
+            yaxis_title='عدد الموظفين',
+            yaxis2=dict(title='معدل الدوران %', overlaying='y', side='right', rangemode='tozero'),
+            barmode='group'
+        )
+        
+        return {
+            'title': 'معدل دوران الموظفين حسب الفترة',
+            'figure': fig,
+            'available': True
+        }
+    
+    def _create_retention_chart(self):
+        """منحنى البقاء لجميع الموظفين (مع فترة الثقة) ولأكبر الأقسام"""
+        attrition = self._attrition()
+        if attrition is None or not attrition.get('survival'):
+            return None
+        
+        survival = attrition['survival']
+        years = survival['years']
+        overall = survival['overall']
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=years + years[::-1],
+            y=overall['ci_high'] + overall['ci_low'][::-1],
+            fill='toself',
+            fillcolor='rgba(99, 110, 250, 0.15)',
+            line=dict(width=0),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=years, y=overall['survival'], name='جميع الموظفين',
+            mode='lines', line=dict(shape='hv', width=3)
+        ))
+        for entry in survival['by_department'][:8]:
+            fig.add_trace(go.Scatter(
+                x=years, y=entry['survival'], name=f"{entry['group']} ({entry['n']})",
+                mode='lines', line=dict(shape='hv', width=1.5)
+            ))
+        fig.add_hline(y=0.5, line_dash="dot", line_color="gray")
+        fig.update_layout(
+            title='منحنيات البقاء الوظيفي (Kaplan-Meier)',
+            xaxis_title='مدة الخدمة (سنوات)',
+            yaxis_title='نسبة البقاء',
+            yaxis_tickformat='.0%',
+            yaxis_range=[0, 1.02]
+        )
+        
+        return {
+            'title': 'منحنيات البقاء الوظيفي (Kaplan-Meier)',
+            'figure': fig,
+            'available': True
+        }
+    
+    def _create_hazard_chart(self):
+        """نسبة خطر ترك العمل لكل قسم وموقع مقابل الباقين مع فترات الثقة (مقياس لوغاريتمي)"""
+        attrition = self._attrition()
+        if attrition is None or not attrition['hazards']:
+            return None
+        
+        labels = {'department': 'قسم', 'location': 'موقع', 'employment_type': 'نوع التوظيف'}
+        fig = go.Figure()
+        for field, rows in attrition['hazards'].items():
+            rows = rows[:15]
+            if not rows:
+                continue
+            fig.add_trace(go.Scatter(
+                x=[row['hazard_ratio'] for row in rows],
+                y=[f"{labels.get(field, field)}: {row['group']}" for row in rows],
+                mode='markers',
+                name=labels.get(field, field),
+                error_x=dict(
+                    type='data', symmetric=False,
+                    array=[row['ci_high'] - row['hazard_ratio'] for row in rows],
+                    arrayminus=[row['hazard_ratio'] - row['ci_low'] for row in rows]
+                ),
+                customdata=[[row['events'], row['n']] for row in rows],
+                hovertemplate='%{y}<br>نسبة الخطر: %{x:.2f}<br>المغادرون: %{customdata[0]} من %{customdata[1]}<extra></extra>'
+            ))
+        if not fig.data:
+            return None
+        fig.add_vline(x=1, line_dash="dash", line_color="gray")
+        fig.update_layout(
+            title='مقارنة خطر ترك العمل',
+            xaxis_title='نسبة الخطر مقابل الباقين',
+            xaxis_type='log',
+            yaxis_autorange='reversed'
+        )
+        
+        return {
+            'title': 'مقارنة خطر ترك العمل',
+            'figure': fig,
+            'available': True
+        }
+
+class ChartDescriptor:
+    """وصف رسم واحد يتم إنشاؤه مرة واحدة عند أول طلب"""
+    
+    def __init__(self, visualizer, name, title, fields, builder):
+        self.visualizer = visualizer
+        self.name = name
+        self.title = title
+        self.fields = fields
+        self.builder = builder
+        self._chart = None
+        self._built = False
+    
+    def build(self):
+        """إنشاء الرسم (أو جلبه من الذاكرة المؤقتة) وإرجاع نفس النتيجة في الاستدعاءات التالية"""
+        if not self._built:
+            self._chart = self.visualizer._build_chart(self.name, self.fields, self.builder)
+            self._built = True
+        return self._chart
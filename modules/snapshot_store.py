@@ -0,0 +1,237 @@
+"""
+وحدة اللقطات التاريخية - حفظ نتائج analyze_all() لكل مصدر وفترة في SQLite محلي للمقارنة بين الفترات
+
+كل لقطة تحفظ النتائج كاملة (JSON) مع جدولين مضغوطين مفهرسين: قيم المؤشرات الرقمية (kpi_values)
+والمجاميع لكل مجموعة مثل القسم (group_values). المفتاح الأساسي (المصدر، المؤشر، الفترة) يجيب عن
+المقارنة الشهرية والسنوية ومنحنيات الاتجاه بقراءة فهرس فقط، دون إعادة تحميل أي ملف خام.
+"""
+
+import os
+import re
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+import pandas as pd
+from modules.pipeline import make_json_safe
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source TEXT NOT NULL,
+    period TEXT NOT NULL,
+    fingerprint TEXT,
+    rows INTEGER,
+    created_at TEXT NOT NULL,
+    results TEXT NOT NULL,
+    PRIMARY KEY (source, period)
+);
+CREATE TABLE IF NOT EXISTS kpi_values (
+    source TEXT NOT NULL,
+    kpi TEXT NOT NULL,
+    period TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (source, kpi, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kpi_values_by_period ON kpi_values (source, period);
+CREATE TABLE IF NOT EXISTS group_values (
+    source TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    period TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (source, dimension, metric, label, period)
+) WITHOUT ROWID;
+"""
+
+# القيمة نفسها والشهر السابق ونفس الشهر من السنة السابقة - كل ربط بحث في المفتاح الأساسي
+_HISTORY_QUERY = """
+SELECT c.period, c.kpi, c.value, m.value AS previous_month, y.value AS previous_year
+FROM kpi_values c
+LEFT JOIN kpi_values m
+    ON m.source = c.source AND m.kpi = c.kpi AND m.period = strftime('%Y-%m', c.period || '-01', '-1 month')
+LEFT JOIN kpi_values y
+    ON y.source = c.source AND y.kpi = c.kpi AND y.period = strftime('%Y-%m', c.period || '-01', '-1 year')
+WHERE c.source = ?
+"""
+
+_PERIOD_IN_NAME = re.compile(r'(19\d{2}|20\d{2})[-_. ]?(0[1-9]|1[0-2])(?!\d)')
+
+def period_key(value):
+    """الفترة الشهرية بصيغة YYYY-MM من نص أو تاريخ ('2024-03' أو '2024-03-15' أو Timestamp)"""
+    return pd.Period(value, freq='M').strftime('%Y-%m')
+
+def period_from_name(name, default=None):
+    """استخراج الفترة من اسم ملف مثل hr_2024-03.xlsx أو payroll_202403.csv (أو default)"""
+    match = _PERIOD_IN_NAME.search(os.path.basename(str(name)))
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    return default
+
+def source_from_name(name):
+    """اسم المصدر من اسم الملف بعد حذف الفترة: branch_a_2024-03.xlsx ← branch_a"""
+    stem = os.path.splitext(os.path.basename(str(name)))[0]
+    return _PERIOD_IN_NAME.sub('', stem).strip(' _-.') or stem
+
+def kpi_values(analysis):
+    """القيم الرقمية للمؤشرات الرئيسية (الحقل raw) من نتائج التحليل"""
+    values = {}
+    for name, kpi in (analysis.get('kpis') or {}).items():
+        raw = kpi.get('raw') if isinstance(kpi, dict) else None
+        if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+            values[name] = float(raw)
+    return values
+
+def group_values(analysis):
+    """المجاميع المضغوطة لكل مجموعة: [(البعد، المقياس، المجموعة، القيمة)]"""
+    rows = []
+    distributions = analysis.get('distributions') or {}
+    for dimension in ('department', 'location'):
+        for label, count in (distributions.get(dimension) or {}).items():
+            rows.append((dimension, 'headcount', label, count))
+    for label, mean in (distributions.get('salary_by_department') or {}).items():
+        rows.append(('department', 'avg_salary', label, mean))
+
+    attrition = analysis.get('attrition') or {}
+    if attrition.get('available'):
+        for dimension, groups in attrition['by_group'].items():
+            for row in groups:
+                rows.append((dimension, 'turnover_rate', row['group'], row['turnover_rate']))
+
+    attendance = analysis.get('attendance') or {}
+    absence = attendance.get('absence') if attendance.get('available') else None
+    for row in (absence or {}).get('by_department', []):
+        if row.get('absence_rate') is not None:
+            rows.append(('department', 'absence_rate', row['department'], row['absence_rate']))
+
+    return [
+        (dimension, metric, str(label), float(value))
+        for dimension, metric, label, value in rows if value is not None
+    ]
+
+class SnapshotStore:
+    def __init__(self, path='snapshots/hr_snapshots.sqlite'):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            # WAL: القراءة (لوحة التحكم) لا تنتظر الكتابة (المعالجة الدفعية في عمليات أخرى)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls):
+        """مسار قاعدة البيانات من متغير البيئة HR_SNAPSHOT_DB"""
+        return cls(os.environ.get('HR_SNAPSHOT_DB', 'snapshots/hr_snapshots.sqlite'))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, analysis, source, period, fingerprint=None, rows=None):
+        """حفظ لقطة (تستبدل اللقطة السابقة لنفس المصدر والفترة) - يعيد الفترة بصيغة YYYY-MM"""
+        period = period_key(period)
+        results = json.dumps(make_json_safe(analysis), ensure_ascii=False)
+        if rows is None:
+            rows = kpi_values(analysis).get('total_employees')
+        with closing(self._connect()) as conn, conn:
+            for table in ('snapshots', 'kpi_values', 'group_values'):
+                conn.execute(f'DELETE FROM {table} WHERE source = ? AND period = ?', (source, period))
+            conn.execute(
+                'INSERT INTO snapshots (source, period, fingerprint, rows, created_at, results) VALUES (?, ?, ?, ?, ?, ?)',
+                (source, period, fingerprint, None if rows is None else int(rows),
+                 datetime.now().isoformat(timespec='seconds'), results)
+            )
+            conn.executemany(
+                'INSERT INTO kpi_values (source, kpi, period, value) VALUES (?, ?, ?, ?)',
+                [(source, kpi, period, value) for kpi, value in kpi_values(analysis).items()]
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO group_values (source, dimension, metric, label, period, value) VALUES (?, ?, ?, ?, ?, ?)',
+                [(source, dimension, metric, label, period, value) for dimension, metric, label, value in group_values(analysis)]
+            )
+        return period
+
+    def delete(self, source, period):
+        period = period_key(period)
+        with closing(self._connect()) as conn, conn:
+            for table in ('snapshots', 'kpi_values', 'group_values'):
+                conn.execute(f'DELETE FROM {table} WHERE source = ? AND period = ?', (source, period))
+
+    def sources(self):
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute('SELECT DISTINCT source FROM snapshots ORDER BY source')]
+
+    def periods(self, source):
+        """الفترات المحفوظة للمصدر مع عدد السجلات وتاريخ الحفظ (الأقدم أولاً)"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                'SELECT period, rows, fingerprint, created_at FROM snapshots WHERE source = ? ORDER BY period',
+                conn, params=(source,)
+            )
+
+    def load(self, source, period):
+        """نتائج التحليل الكاملة للقطة (أو None)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT results FROM snapshots WHERE source = ? AND period = ?', (source, period_key(period))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def kpi_history(self, source, kpis=None, start=None, end=None):
+        """قيم المؤشرات لكل فترة مع التغير عن الشهر السابق (MoM) وعن نفس الشهر من السنة السابقة (YoY)
+
+        يعيد DataFrame بالأعمدة: period, kpi, value, previous_month, mom_change, mom_pct,
+        previous_year, yoy_change, yoy_pct (النسب المئوية None عندما تكون القيمة السابقة صفراً أو غير موجودة).
+        """
+        query, params = _HISTORY_QUERY, [source]
+        if kpis:
+            query += f" AND c.kpi IN ({', '.join('?' * len(kpis))})"
+            params += list(kpis)
+        if start is not None:
+            query += ' AND c.period >= ?'
+            params.append(period_key(start))
+        if end is not None:
+            query += ' AND c.period <= ?'
+            params.append(period_key(end))
+        with closing(self._connect()) as conn:
+            history = pd.read_sql_query(query + ' ORDER BY c.kpi, c.period', conn, params=params)
+        # الأعمدة بدون أي قيمة سابقة تُقرأ كـ None
+        history[['value', 'previous_month', 'previous_year']] = history[['value', 'previous_month', 'previous_year']].astype(float)
+
+        for prefix, column in (('mom', 'previous_month'), ('yoy', 'previous_year')):
+            history[f'{prefix}_change'] = history['value'] - history[column]
+            previous = history[column].where(history[column] != 0)
+            history[f'{prefix}_pct'] = history[f'{prefix}_change'] / previous.abs() * 100
+        return history[[
+            'period', 'kpi', 'value', 'previous_month', 'mom_change', 'mom_pct',
+            'previous_year', 'yoy_change', 'yoy_pct'
+        ]]
+
+    def compare(self, source, period=None):
+        """مقارنة فترة واحدة (الافتراضي: الأحدث) بالشهر السابق ونفس الشهر من السنة السابقة - صف لكل مؤشر"""
+        if period is None:
+            with closing(self._connect()) as conn:
+                row = conn.execute('SELECT MAX(period) FROM snapshots WHERE source = ?', (source,)).fetchone()
+            if row[0] is None:
+                return self.kpi_history(source).iloc[0:0]
+            period = row[0]
+        return self.kpi_history(source, start=period, end=period).reset_index(drop=True)
+
+    def kpi_trend(self, source, kpis=None, start=None, end=None):
+        """جدول عريض: فترة لكل صف ومؤشر لكل عمود (لرسوم الاتجاه)"""
+        history = self.kpi_history(source, kpis, start, end)
+        return history.pivot(index='period', columns='kpi', values='value')
+
+    def group_trend(self, source, dimension, metric, start=None, end=None):
+        """جدول عريض لمقياس مجموعة (مثل عدد الموظفين لكل قسم): فترة لكل صف ومجموعة لكل عمود"""
+        query = 'SELECT period, label, value FROM group_values WHERE source = ? AND dimension = ? AND metric = ?'
+        params = [source, dimension, metric]
+        if start is not None:
+            query += ' AND period >= ?'
+            params.append(period_key(start))
+        if end is not None:
+            query += ' AND period <= ?'
+            params.append(period_key(end))
+        with closing(self._connect()) as conn:
+            values = pd.read_sql_query(query, conn, params=params)
+        return values.pivot(index='period', columns='label', values='value')
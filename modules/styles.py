@@ -0,0 +1,103 @@
+"""
+تنسيق صفحة لوحة التحكم (CSS) حسب اللغة
+"""
+
+import functools
+
+@functools.lru_cache(maxsize=None)
+def page_css(language='ar'):
+    """CSS الصفحة حسب اللغة (اتجاه النص والخط) - يُبنى مرة واحدة لكل لغة"""
+    text_align = 'right' if language == 'ar' else 'left'
+    font_family = "'Cairo', 'Segoe UI', Tahoma, sans-serif" if language == 'ar' else "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
+    
+    css = f"""
+    <style>
+    .main-header {{
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 30px;
+        border-radius: 15px;
+        margin-bottom: 30px;
+        text-align: center;
+        font-family: {font_family};
+    }}
+    
+    .kpi-card {{
+        background: white;
+        border-radius: 12px;
+        padding: 20px;
+        margin: 10px;
+        border: 1px solid #e2e8f0;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.08);
+        text-align: center;
+        transition: all 0.3s ease;
+        font-family: {font_family};
+        direction: {'rtl' if language == 'ar' else 'ltr'};
+    }}
+    
+    .kpi-card:hover {{
+        transform: translateY(-5px);
+        box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+    }}
+    
+    .upload-box {{
+        border: 2px dashed #4c51bf;
+        border-radius: 12px;
+        padding: 40px;
+        text-align: center;
+        background: #f7fafc;
+        margin: 20px 0;
+        font-family: {font_family};
+        direction: {'rtl' if language == 'ar' else 'ltr'};
+    }}
+    
+    .column-map-item {{
+        background: #edf2f7;
+        padding: 15px;
+        border-radius: 10px;
+        margin: 10px 0;
+        font-family: {font_family};
+        direction: {'rtl' if language == 'ar' else 'ltr'};
+    }}
+    
+    .warning-box {{
+        background: #fff3cd;
+        border: 1px solid #ffeaa7;
+        border-radius: 8px;
+        padding: 15px;
+        margin: 10px 0;
+        font-family: {font_family};
+        direction: {'rtl' if language == 'ar' else 'ltr'};
+    }}
+    
+    .report-box {{
+        background: #f8f9fa;
+        border: 2px solid #dee2e6;
+        border-radius: 10px;
+        padding: 25px;
+        margin: 20px 0;
+        font-family: 'Courier New', monospace;
+        font-size: 14px;
+        line-height: 1.6;
+        white-space: pre-wrap;
+        direction: {'rtl' if language == 'ar' else 'ltr'};
+        max-height: 600px;
+        overflow-y: auto;
+    }}
+    
+    /* تنسيق عام للصفحة */
+    .stApp {{
+        font-family: {font_family};
+        text-align: {text_align};
+    }}
+    
+    /* تخصيص markdown */
+    .stMarkdown {{
+        font-family: {font_family};
+    }}
+    </style>
+    
+    <!-- تحميل خط Cairo للعربية -->
+    <link href="https://fonts.googleapis.com/css2?family=Cairo:wght@400;600;700&display=swap" rel="stylesheet">
+    """
+    return css
@@ -0,0 +1,165 @@
+"""
+وحدة قياس أداء المراحل - زمن التنفيذ وزمن المعالج وزيادة ذروة الذاكرة وعدد الصفوف لكل مرحلة
+
+القياس يعمل فقط داخل telemetry.run(...)؛ خارجها تعيد stage() كائناً فارغاً بتكلفة شبه معدومة.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active_run = ContextVar('hr_telemetry_run', default=None)
+_log_lock = threading.Lock()
+
+# ru_maxrss بالكيلوبايت في Linux وبالبايت في macOS
+_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+def _peak_rss():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+class _NoopStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopStage()
+
+class _Stage:
+    __slots__ = ('run', 'name', 'rows', 'path', '_wall', '_cpu', '_rss')
+
+    def __init__(self, run, name, rows):
+        self.run = run
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.run._stack.append(self)
+        self.path = '/'.join(stage.name for stage in self.run._stack)
+        self._rss = _peak_rss()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        rss_delta = _peak_rss() - self._rss
+        self.run._stack.pop()
+        self.run.emit({
+            'stage': self.name,
+            'path': self.path,
+            'wall_ms': round(wall * 1000, 2),
+            'cpu_ms': round(cpu * 1000, 2),
+            'peak_rss_delta_mb': round(rss_delta / (1024 * 1024), 2),
+            'rows': self.rows,
+            'error': exc_type.__name__ if exc_type else None
+        })
+        return False
+
+class TelemetryRun:
+    """مجموعة قياسات تشغيل واحد (تشغيل صفحة أو قسم أو مهمة في عملية منفصلة)"""
+
+    def __init__(self, session_id=None, log_path=None, base_path=''):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.log_path = log_path
+        self.records = []
+        self._stack = []
+        # مسار المرحلة الأم عند تشغيل مهمة في عملية أخرى
+        self.base_path = base_path
+
+    def emit(self, record):
+        if self.base_path:
+            record['path'] = f"{self.base_path}/{record['path']}"
+        record.update(ts=round(time.time(), 3), run=self.run_id, session=self.session_id, pid=os.getpid())
+        self.records.append(record)
+        if self.log_path:
+            line = json.dumps(record, ensure_ascii=False, default=str)
+            with _log_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def extend(self, records):
+        """إضافة قياسات مهمة نُفذت في عملية أخرى (مسجلة في السجل هناك)"""
+        self.records.extend(records)
+
+    @property
+    def current_path(self):
+        path = '/'.join(stage.name for stage in self._stack)
+        return f"{self.base_path}/{path}" if self.base_path and path else (path or self.base_path)
+
+@contextmanager
+def run(session_id=None, log_path=None, on_finish=None, base_path=''):
+    """تفعيل القياس داخل كتلة with - on_finish يستقبل القياسات عند الخروج (حتى مع الاستثناءات)"""
+    telemetry_run = TelemetryRun(session_id, log_path, base_path)
+    token = _active_run.set(telemetry_run)
+    try:
+        yield telemetry_run
+    finally:
+        _active_run.reset(token)
+        if on_finish is not None:
+            on_finish(telemetry_run.records)
+
+def current():
+    """التشغيل الحالي أو None إذا كان القياس معطلاً"""
+    return _active_run.get()
+
+def stage(name, rows=None):
+    """قياس مرحلة: with telemetry.stage('analysis.kpis', rows=len(df)): ..."""
+    telemetry_run = _active_run.get()
+    if telemetry_run is None:
+        return _NOOP
+    return _Stage(telemetry_run, name, rows)
+
+def set_rows(rows):
+    """تسجيل عدد الصفوف للمرحلة الجارية (عندما لا يُعرف قبل بدايتها)"""
+    telemetry_run = _active_run.get()
+    if telemetry_run is not None and telemetry_run._stack:
+        telemetry_run._stack[-1].rows = rows
+
+def timed(name):
+    """مزخرف لقياس دالة كاملة كمرحلة"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_run.get() is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def log_path_from_env():
+    """ملف JSON-lines للقياسات من متغير البيئة HR_PERF_LOG"""
+    return os.environ.get('HR_PERF_LOG') or None
+
+def summarize(records):
+    """تجميع القياسات حسب المرحلة (عدد مرات التنفيذ والمجموع والأقصى)"""
+    summary = {}
+    for record in records:
+        item = summary.setdefault(record['path'], {
+            'path': record['path'], 'calls': 0, 'wall_ms': 0.0, 'max_wall_ms': 0.0,
+            'cpu_ms': 0.0, 'peak_rss_delta_mb': 0.0, 'rows': None
+        })
+        item['calls'] += 1
+        item['wall_ms'] = round(item['wall_ms'] + record['wall_ms'], 2)
+        item['max_wall_ms'] = max(item['max_wall_ms'], record['wall_ms'])
+        item['cpu_ms'] = round(item['cpu_ms'] + record['cpu_ms'], 2)
+        item['peak_rss_delta_mb'] = max(item['peak_rss_delta_mb'], record['peak_rss_delta_mb'])
+        if record.get('rows') is not None:
+            item['rows'] = record['rows']
+    return sorted(summary.values(), key=lambda item: item['wall_ms'], reverse=True)
@@ -0,0 +1,366 @@
+"""
+نصوص الواجهة باللغتين العربية والإنجليزية
+
+الجدول في وحدة مستقلة حتى يُبنى مرة واحدة لكل عملية بدلاً من كل تشغيل للصفحة.
+"""
+
+TRANSLATIONS = {
+    'ar': {
+        # العنوان الرئيسي
+        'main_title': '📊 لوحة تحكم الموارد البشرية الذكية',
+        'main_subtitle': 'تعمل مع <strong>أي ملف Excel</strong> - قم برفع ملفك وسنكتشف البيانات تلقائياً',
+        
+        # الشريط الجانبي
+        'sidebar_settings': '⚙️ إعدادات',
+        'sidebar_language': 'اللغة:',
+        'sidebar_theme': 'المظهر:',
+        'sidebar_load_settings': '📥 تحميل إعدادات سابقة',
+        'sidebar_save_settings': '💾 حفظ الإعدادات',
+        'sidebar_load_success': 'تم تحميل الإعدادات السابقة',
+        'sidebar_save_success': 'تم حفظ الإعدادات',
+        'sidebar_no_settings': 'لا توجد إعدادات سابقة',
+        'sidebar_debug': '🐞 لوحة تشخيص الرسوم',
+        'debug_panel_title': '🐞 تقرير حجم الرسوم البيانية',
+        'debug_stage_counts': 'عدد مرات تنفيذ كل مرحلة',
+        'registry_title': '🗄️ ذاكرة البيانات المشتركة',
+        'registry_memory': 'الذاكرة المستخدمة',
+        'registry_limits': 'حد الجلسة: {} MB - مرات المشاركة: {} - مرات الإخلاء: {}',
+        'workers_title': 'العمليات المشتركة',
+        'sidebar_perf': '⏱️ لوحة الأداء',
+        'perf_title': '⏱️ أداء المراحل',
+        'perf_empty': 'لا توجد قياسات بعد - تفاعل مع الصفحة لتسجيلها',
+        'perf_recent': 'آخر القياسات',
+        'perf_clear': 'مسح القياسات',
+        'sidebar_profile': '🔬 وضع التحليل العميق',
+        'profile_title': '🔬 التحليل العميق للأداء',
+        'profile_hint': 'يشغل خط المعالجة كاملاً على الملف الحالي مع عينات المعالج وتتبع الذاكرة (أبطأ من التشغيل العادي)',
+        'profile_run': 'تحليل هذا الملف',
+        'profile_no_file': 'ارفع ملفاً واحداً أولاً',
+        'profile_done': 'تم حفظ النتائج في: {}',
+        'profile_download': '📦 تحميل نتائج التحليل',
+        
+        # رفع الملف
+        'upload_title': '📤 الخطوة 1: رفع ملف Excel',
+        'upload_placeholder': 'اسحب وأفلت ملف Excel هنا أو انقر للاختيار',
+        'upload_help': 'يدعم الملفات: Excel (.xlsx, .xls), CSV - يمكن رفع عدة ملفات لدمجها',
+        'upload_success': '✅ تم تحميل الملف بنجاح!',
+        'upload_error': '❌ خطأ في تحميل الملف:',
+        'upload_consolidated': '✅ تم دمج {} ملفات في مجموعة بيانات واحدة',
+        'upload_skipped_files': '⚠️ تعذر تحميل الملفات التالية:',
+        'consolidation_mappings': '🔗 تعيين الأعمدة لكل ملف',
+        'sheets_select': '📑 أوراق العمل المراد تحليلها (يتم ربطها برقم الموظف)',
+        'sheets_joined': '✅ تم ربط {} أوراق عبر رقم الموظف',
+        'sheets_join_report': '🔗 تقرير ربط الأوراق',
+        'preview_data': '👀 معاينة البيانات',
+        
+        # إحصائيات
+        'stats_records': 'عدد السجل',
+        'stats_columns': 'عدد الأعمدة',
+        'stats_numeric': 'أعمدة رقمية',
+        
+        # تعيين الأعمدة
+        'mapping_title': '🎯 الخطوة 2: تعيين الأعمدة',
+        'mapping_auto': '💡 <strong>التعرف التلقائي</strong>: النظام حاول تخمين أنواع الأعمدة. يمكنك تعديلها يدوياً إذا كانت غير صحيحة.',
+        
+        # فئات الأعمدة
+        'cat_employee_info': 'معلومات الموظف',
+        'cat_financial': 'المالية',
+        'cat_performance': 'الأداء',
+        'cat_attendance': 'الحضور',
+        'cat_training': 'التدريب',
+        'cat_management': 'المتابعة',
+        
+        # أسماء الحقول
+        'field_employee_name': 'اسم الموظف',
+        'field_employee_id': 'رقم الموظف',
+        'field_department': 'القسم',
+        'field_position': 'المنصب',
+        'field_hire_date': 'تاريخ التعيين',
+        'field_salary': 'الراتب',
+        'field_allowances': 'البدلات',
+        'field_bonus': 'المكافأة',
+        'field_tax': 'الضريبة',
+        'field_performance_score': 'درجة الأداء',
+        'field_kpi': 'KPI',
+        'field_rating': 'التقييم',
+        'field_review_date': 'تاريخ المراجعة',
+        'field_attendance_days': 'أيام الحضور',
+        'field_absent_days': 'أيام الغياب',
+        'field_late_days': 'أيام التأخير',
+        'field_overtime_hours': 'ساعات إضافية',
+        'field_trainings_completed': 'التدريبات المكتملة',
+        'field_training_hours': 'ساعات التدريب',
+        'field_certifications': 'الشهادات',
+        'field_manager': 'المدير',
+        'field_location': 'الموقع',
+        'field_employment_type': 'نوع التوظيف',
+        'field_status': 'الحالة',
+        'field_gender': 'الجنس',
+        'pay_equity_title': 'عدالة الرواتب',
+        'pay_equity_hint': 'الفجوة المعدلة مقارنة بـ {} بعد احتساب الأداء ومدة الخدمة والمنصب والموقع والقسم (فترة ثقة {}%)',
+        'pay_equity_unavailable': 'تحليل عدالة الرواتب غير متاح: {}',
+        'pay_equity_gender': 'الجنس',
+        'pay_equity_count': 'عدد الموظفين',
+        'pay_equity_gap': 'الفجوة المعدلة',
+        'pay_equity_ci_low': 'الحد الأدنى',
+        'pay_equity_ci_high': 'الحد الأعلى',
+        'pay_equity_significant': 'ذات دلالة',
+        'pay_equity_by_department': 'الفجوة المعدلة حسب القسم',
+        'pay_equity_decomposition': 'تفكيك الفجوة (Oaxaca-Blinder) حسب الجنس',
+        'pay_equity_raw_gap': 'الفجوة الخام',
+        'pay_equity_explained': 'المفسرة بالخصائص',
+        'pay_equity_unexplained': 'غير المفسرة',
+        'field_termination_date': 'تاريخ ترك العمل',
+        'attrition_title': 'دوران الموظفين والبقاء الوظيفي',
+        'attrition_unavailable': 'تحليل الدوران غير متاح: {}',
+        'attrition_turnover': 'معدل الدوران',
+        'attrition_retention_1y': 'البقاء بعد سنة',
+        'attrition_median_tenure': 'وسيط مدة الخدمة حتى الترك (سنوات)',
+        'attrition_no_survival': 'لعرض منحنيات البقاء ومقارنة خطر الترك قم بتعيين تاريخ التعيين وتاريخ ترك العمل',
+        'attrition_group': 'التصنيف',
+        'attrition_value': 'المجموعة',
+        'attrition_leavers': 'المغادرون',
+        'attrition_hazard_ratio': 'نسبة الخطر',
+        'attrition_hazards': 'خطر ترك العمل مقارنة بباقي الموظفين',
+        'attendance_title': 'الحضور والعمل الإضافي والتدريب',
+        'attendance_absence_rate': 'نسبة الغياب %',
+        'attendance_avg_absent': 'متوسط أيام الغياب',
+        'attendance_overtime_gini': 'تركز العمل الإضافي (Gini)',
+        'attendance_top_share': 'حصة أعلى 10% من العمل الإضافي',
+        'attendance_overtime_share': 'حصة العمل الإضافي %',
+        'attendance_training_coverage': 'تغطية التدريب %',
+        'attendance_top_overtime': 'أعلى الموظفين في ساعات العمل الإضافي',
+        'snapshots_title': 'اللقطات التاريخية والمقارنة بين الفترات',
+        'snapshots_source': 'المصدر (الفرع أو النظام)',
+        'snapshots_period': 'الفترة (YYYY-MM)',
+        'snapshots_save': '💾 حفظ لقطة لهذه الفترة',
+        'snapshots_saved': 'تم حفظ لقطة {} للفترة {}',
+        'snapshots_invalid_period': 'صيغة الفترة غير صحيحة، استخدم YYYY-MM',
+        'snapshots_error': 'خطأ في مخزن اللقطات:',
+        'snapshots_empty': 'لا توجد لقطات محفوظة لهذا المصدر بعد',
+        'snapshots_compare': 'مقارنة الفترة {} بالشهر السابق ونفس الشهر من السنة السابقة',
+        'snapshots_kpi': 'المؤشر',
+        'snapshots_value': 'القيمة',
+        'snapshots_mom': 'التغير الشهري %',
+        'snapshots_yoy': 'التغير السنوي %',
+        'snapshots_trend': 'اتجاه المؤشر',
+        'snapshots_count': 'عدد اللقطات',
+        
+        # زر التحليل
+        'analyze_button': '🚀 انتقل إلى التحليل',
+        
+        # نتائج التحليل
+        'analysis_title': '📊 الخطوة 3: تحليل البيانات الذكي',
+        'kpis_title': '📈 النتائج الرئيسية',
+        'charts_title': '📊 الرسوم البيانية التلقائية',
+        'advanced_title': '🔍 تحليل متقدم',
+        'correlations_title': 'العلاقات بين المتغيرات',
+        'outliers_title': 'اكتشاف القيم الشاذة',
+        'outliers_found': 'تم اكتشاف {} قيمة شاذة في الرواتب',
+        'no_outliers': '✅ لم يتم اكتشاف قيم شاذة في الرواتب',
+        'zero_std': 'الانحراف المعياري للرواتب صفر، لا يمكن اكتشاف قيم شاذة',
+        
+        # التقرير
+        'report_title': '📄 التقرير النصي الكامل',
+        'generate_report': '📋 إنشاء التقرير',
+        
+        # تصدير
+        'export_data': '📥 تحميل البيانات المعدلة',
+        'export_format': 'صيغة الملف',
+        'export_error': 'تعذر تصدير البيانات:',
+        
+        # جدول البيانات
+        'browse_data': '🗂️ استعراض البيانات المعدلة كاملة',
+        'grid_sort_by': 'الفرز حسب',
+        'grid_no_sort': 'بدون فرز',
+        'grid_descending': 'تنازلي',
+        'grid_filter_column': 'تصفية العمود',
+        'grid_filter_text': 'يحتوي على',
+        'grid_page_size': 'صفوف في الصفحة',
+        'grid_page': 'الصفحة',
+        'grid_showing': 'الصفوف {}-{} من {} (الصفحة {} من {})',
+        
+        # رسائل أخرى
+        'loading': 'جاري التحميل...',
+        'not_available': 'غير متوفر',
+    },
+    'en': {
+        # Main Title
+        'main_title': '📊 Smart HR Analytics Dashboard',
+        'main_subtitle': 'Works with <strong>any Excel file</strong> - Upload your file and we will automatically detect data',
+        
+        # Sidebar
+        'sidebar_settings': '⚙️ Settings',
+        'sidebar_language': 'Language:',
+        'sidebar_theme': 'Theme:',
+        'sidebar_load_settings': '📥 Load Previous Settings',
+        'sidebar_save_settings': '💾 Save Settings',
+        'sidebar_load_success': 'Previous settings loaded',
+        'sidebar_save_success': 'Settings saved',
+        'sidebar_no_settings': 'No previous settings',
+        'sidebar_debug': '🐞 Chart debug panel',
+        'debug_panel_title': '🐞 Chart payload report',
+        'debug_stage_counts': 'Stage execution counts',
+        'registry_title': '🗄️ Shared dataset memory',
+        'registry_memory': 'Memory in use',
+        'registry_limits': 'Per-session limit: {} MB - shared hits: {} - evictions: {}',
+        'workers_title': 'Shared worker processes',
+        'sidebar_perf': '⏱️ Performance panel',
+        'perf_title': '⏱️ Stage performance',
+        'perf_empty': 'No measurements yet - interact with the page to record them',
+        'perf_recent': 'Latest measurements',
+        'perf_clear': 'Clear measurements',
+        'sidebar_profile': '🔬 Profiling mode',
+        'profile_title': '🔬 Deep profiling',
+        'profile_hint': 'Runs the whole pipeline on the current file with CPU sampling and allocation tracing (slower than a normal run)',
+        'profile_run': 'Profile this file',
+        'profile_no_file': 'Upload a single file first',
+        'profile_done': 'Results saved to: {}',
+        'profile_download': '📦 Download profile',
+        
+        # File Upload
+        'upload_title': '📤 Step 1: Upload Excel File',
+        'upload_placeholder': 'Drag and drop Excel file here or click to browse',
+        'upload_help': 'Supports: Excel (.xlsx, .xls), CSV - upload several files to consolidate them',
+        'upload_success': '✅ File uploaded successfully!',
+        'upload_error': '❌ Error loading file:',
+        'upload_consolidated': '✅ {} files consolidated into one dataset',
+        'upload_skipped_files': '⚠️ The following files could not be loaded:',
+        'consolidation_mappings': '🔗 Column mapping per file',
+        'sheets_select': '📑 Worksheets to analyze (joined by employee ID)',
+        'sheets_joined': '✅ {} sheets joined by employee ID',
+        'sheets_join_report': '🔗 Sheet join report',
+        'preview_data': '👀 Data Preview',
+        
+        # Statistics
+        'stats_records': 'Records Count',
+        'stats_columns': 'Columns Count',
+        'stats_numeric': 'Numeric Columns',
+        
+        # Column Mapping
+        'mapping_title': '🎯 Step 2: Map Columns',
+        'mapping_auto': '💡 <strong>Auto-detection</strong>: System tried to guess column types. You can adjust manually if incorrect.',
+        
+        # Column Categories
+        'cat_employee_info': 'Employee Information',
+        'cat_financial': 'Financial',
+        'cat_performance': 'Performance',
+        'cat_attendance': 'Attendance',
+        'cat_training': 'Training',
+        'cat_management': 'Management',
+        
+        # Field Names
+        'field_employee_name': 'Employee Name',
+        'field_employee_id': 'Employee ID',
+        'field_department': 'Department',
+        'field_position': 'Position',
+        'field_hire_date': 'Hire Date',
+        'field_salary': 'Salary',
+        'field_allowances': 'Allowances',
+        'field_bonus': 'Bonus',
+        'field_tax': 'Tax',
+        'field_performance_score': 'Performance Score',
+        'field_kpi': 'KPI',
+        'field_rating': 'Rating',
+        'field_review_date': 'Review Date',
+        'field_attendance_days': 'Attendance Days',
+        'field_absent_days': 'Absent Days',
+        'field_late_days': 'Late Days',
+        'field_overtime_hours': 'Overtime Hours',
+        'field_trainings_completed': 'Trainings Completed',
+        'field_training_hours': 'Training Hours',
+        'field_certifications': 'Certifications',
+        'field_manager': 'Manager',
+        'field_location': 'Location',
+        'field_employment_type': 'Employment Type',
+        'field_status': 'Status',
+        'field_gender': 'Gender',
+        'pay_equity_title': 'Pay Equity',
+        'pay_equity_hint': 'Adjusted gap versus {} after controlling for performance, tenure, position, location and department ({}% confidence interval)',
+        'pay_equity_unavailable': 'Pay equity analysis unavailable: {}',
+        'pay_equity_gender': 'Gender',
+        'pay_equity_count': 'Employees',
+        'pay_equity_gap': 'Adjusted Gap',
+        'pay_equity_ci_low': 'CI Low',
+        'pay_equity_ci_high': 'CI High',
+        'pay_equity_significant': 'Significant',
+        'pay_equity_by_department': 'Adjusted Gap by Department',
+        'pay_equity_decomposition': 'Gap Decomposition (Oaxaca-Blinder) by Gender',
+        'pay_equity_raw_gap': 'Raw Gap',
+        'pay_equity_explained': 'Explained',
+        'pay_equity_unexplained': 'Unexplained',
+        'field_termination_date': 'Termination Date',
+        'attrition_title': 'Attrition and Retention',
+        'attrition_unavailable': 'Attrition analysis unavailable: {}',
+        'attrition_turnover': 'Turnover Rate',
+        'attrition_retention_1y': '1-Year Retention',
+        'attrition_median_tenure': 'Median Tenure to Exit (years)',
+        'attrition_no_survival': 'Map hire date and termination date to see retention curves and hazard comparisons',
+        'attrition_group': 'Dimension',
+        'attrition_value': 'Group',
+        'attrition_leavers': 'Leavers',
+        'attrition_hazard_ratio': 'Hazard Ratio',
+        'attrition_hazards': 'Attrition Hazard vs. Other Employees',
+        'attendance_title': 'Attendance, Overtime and Training',
+        'attendance_absence_rate': 'Absence Rate %',
+        'attendance_avg_absent': 'Avg Absent Days',
+        'attendance_overtime_gini': 'Overtime Concentration (Gini)',
+        'attendance_top_share': 'Top 10% Share of Overtime',
+        'attendance_overtime_share': 'Overtime Share %',
+        'attendance_training_coverage': 'Training Coverage %',
+        'attendance_top_overtime': 'Top Employees by Overtime Hours',
+        'snapshots_title': 'Historical Snapshots and Period Comparison',
+        'snapshots_source': 'Source (branch or system)',
+        'snapshots_period': 'Period (YYYY-MM)',
+        'snapshots_save': '💾 Save Snapshot for This Period',
+        'snapshots_saved': 'Saved snapshot {} for period {}',
+        'snapshots_invalid_period': 'Invalid period format, use YYYY-MM',
+        'snapshots_error': 'Snapshot store error:',
+        'snapshots_empty': 'No snapshots saved for this source yet',
+        'snapshots_compare': 'Period {} vs. previous month and same month last year',
+        'snapshots_kpi': 'KPI',
+        'snapshots_value': 'Value',
+        'snapshots_mom': 'MoM Change %',
+        'snapshots_yoy': 'YoY Change %',
+        'snapshots_trend': 'KPI Trend',
+        'snapshots_count': 'Snapshots',
+        
+        # Analysis Button
+        'analyze_button': '🚀 Proceed to Analysis',
+        
+        # Analysis Results
+        'analysis_title': '📊 Step 3: Smart Data Analysis',
+        'kpis_title': '📈 Key Results',
+        'charts_title': '📊 Automatic Charts',
+        'advanced_title': '🔍 Advanced Analysis',
+        'correlations_title': 'Variable Correlations',
+        'outliers_title': 'Outlier Detection',
+        'outliers_found': 'Found {} outliers in salaries',
+        'no_outliers': '✅ No outliers detected in salaries',
+        'zero_std': 'Salary standard deviation is zero, cannot detect outliers',
+        
+        # Report
+        'report_title': '📄 Full Text Report',
+        'generate_report': '📋 Generate Report',
+        
+        # Export
+        'export_data': '📥 Download Modified Data',
+        'export_format': 'File format',
+        'export_error': 'Could not export the data:',
+        
+        # Data Grid
+        'browse_data': '🗂️ Browse Full Modified Data',
+        'grid_sort_by': 'Sort by',
+        'grid_no_sort': 'No sorting',
+        'grid_descending': 'Descending',
+        'grid_filter_column': 'Filter column',
+        'grid_filter_text': 'Contains',
+        'grid_page_size': 'Rows per page',
+        'grid_page': 'Page',
+        'grid_showing': 'Rows {}-{} of {} (page {} of {})',
+        
+        # Other Messages
+        'loading': 'Loading...',
+        'not_available': 'Not Available',
+    }
+}
@@ -0,0 +1,400 @@
+"""
+وحدة مجمع العمليات المشترك بين جلسات Streamlit - التحميل والتحليل والرسوم خارج خيط الواجهة
+البيانات تنتقل بين العمليات بصيغة Arrow IPC عبر الذاكرة المشتركة بدلاً من pickle
+"""
+
+import os
+import uuid
+import atexit
+import threading
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+from modules import telemetry
+
+logger = logging.getLogger('hr_dashboard.workers')
+
+# مكان الذاكرة المشتركة في Linux - يسمح بقراءتها عبر memory_map دون نسخ
+SHM_DIR = '/dev/shm'
+
+class PoolBusyError(RuntimeError):
+    """طابور المهام ممتلئ (للمستخدم أو للخادم)"""
+
+# ==================== نقل البيانات عبر الذاكرة المشتركة ====================
+class SharedFrame:
+    """مرجع قابل للنقل بين العمليات إلى DataFrame مكتوب بصيغة Arrow IPC في ذاكرة مشتركة"""
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+def frame_to_shared(df):
+    """كتابة DataFrame في ذاكرة مشتركة - أو إرجاعه كما هو إذا تعذر تحويله إلى Arrow"""
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # أعمدة بأنواع مختلطة لا يدعمها Arrow: النقل عبر pickle
+        return df
+
+    # قياس الحجم أولاً ثم الكتابة مباشرة في الذاكرة المشتركة دون نسخة وسيطة
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, table.schema) as writer:
+        writer.write_table(table)
+    size = mock.size()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size), name=f"hr_{uuid.uuid4().hex[:20]}")
+    try:
+        target = pa.py_buffer(shm.buf)
+        sink = pa.FixedSizeBufferWriter(target)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+        del writer, sink, target
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    handle = SharedFrame(shm.name, size)
+    shm.close()
+    return handle
+
+def frame_from_shared(handle, unlink=False):
+    """قراءة DataFrame من مرجع الذاكرة المشتركة (unlink: حذف الاسم بعد القراءة)"""
+    import pyarrow as pa
+
+    if not isinstance(handle, SharedFrame):
+        return handle
+    path = os.path.join(SHM_DIR, handle.name)
+    if os.path.exists(path):
+        # بدون نسخ: ذاكرة Arrow تبقى صالحة ما دامت أعمدة الإطار تشير إليها حتى بعد حذف الاسم
+        source = pa.memory_map(path)
+    else:
+        shm = shared_memory.SharedMemory(name=handle.name)
+        source = pa.py_buffer(bytes(shm.buf[:handle.size]))
+        shm.close()
+    df = pa.ipc.open_stream(source).read_all().to_pandas()
+    if unlink:
+        release_shared(handle)
+    return df
+
+def release_shared(handle):
+    if not isinstance(handle, SharedFrame):
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=handle.name)
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+# ==================== دوال العمليات المنفصلة ====================
+# إطارات مفكوكة داخل كل عملية حتى لا تقرأ نفس البيانات لكل مهمة
+_WORKER_FRAMES = OrderedDict()
+_WORKER_FRAMES_MAX = 2
+
+def _worker_frame(fingerprint, handle):
+    if fingerprint in _WORKER_FRAMES:
+        _WORKER_FRAMES.move_to_end(fingerprint)
+        return _WORKER_FRAMES[fingerprint]
+    df = frame_from_shared(handle)
+    _WORKER_FRAMES[fingerprint] = df
+    while len(_WORKER_FRAMES) > _WORKER_FRAMES_MAX:
+        _WORKER_FRAMES.popitem(last=False)
+    return df
+
+def load_file_task(content, filename):
+    from modules.file_loader import SmartFileLoader, BytesUpload
+
+    loader = SmartFileLoader(BytesUpload(content, filename))
+    df = loader.load_file()
+    return {'frame': frame_to_shared(df), 'sheet_names': loader.sheet_names}
+
+def analyze_task(fingerprint, handle, column_mapping, category_aliases=None):
+    from modules.data_analyzer import FlexibleDataAnalyzer
+
+    df = _worker_frame(fingerprint, handle)
+    analyzer = FlexibleDataAnalyzer(df, column_mapping, category_aliases)
+    analysis = analyzer.analyze_all()
+    # إعادة الأعمدة التي حولها التحليل فقط (مثل نص -> رقم) وليس الإطار كاملاً
+    modified = analyzer.get_modified_dataframe()
+    changed = [col for col in modified.columns if modified[col].dtype != df[col].dtype]
+    return {
+        'analysis': analysis,
+        'modified': frame_to_shared(modified[changed]) if changed else None
+    }
+
+def charts_task(fingerprint, handle, column_mapping, analysis, language, theme, histogram_bins,
+                category_aliases=None):
+    from modules.smart_visualizer import SmartVisualizer
+
+    df = _worker_frame(fingerprint, handle)
+    visualizer = SmartVisualizer(
+        df, column_mapping, analysis, histogram_bins=histogram_bins, language=language, theme=theme,
+        category_aliases=category_aliases
+    )
+    return visualizer.build_cache_entries()
+
+def _measured_task(func, session_id, log_path, base_path, args):
+    """تشغيل مهمة مع قياس مراحلها داخل العملية وإعادة القياسات مع النتيجة"""
+    with telemetry.run(session_id, log_path, base_path=base_path) as telemetry_run:
+        with telemetry.stage(f'worker.{func.__name__}'):
+            result = func(*args)
+    return {'result': result, 'telemetry': telemetry_run.records}
+
+def _release_result(result):
+    """حذف الذاكرة المشتركة في نتيجة لن تُقرأ (مهمة ملغاة)"""
+    if isinstance(result, SharedFrame):
+        release_shared(result)
+    elif isinstance(result, dict):
+        for value in result.values():
+            _release_result(value)
+
+# ==================== المجمع المشترك ====================
+class _Job:
+    def __init__(self, user_id, func, args):
+        self.user_id = user_id
+        self.func = func
+        self.args = args
+        self.future = Future()
+        self.cancelled = False
+        # الإطارات المشتركة التي تقرؤها المهمة - تبقى محجوزة حتى تنتهي
+        self.frames = _shared_handles(args)
+
+def _shared_handles(args):
+    """مراجع الإطارات المشتركة في معاملات المهمة (ومعاملات _measured_task المتداخلة)"""
+    handles = []
+    for arg in args:
+        if isinstance(arg, SharedFrame):
+            handles.append(arg)
+        elif isinstance(arg, (tuple, list)):
+            handles.extend(_shared_handles(arg))
+    return handles
+
+class WorkerPool:
+    def __init__(self, max_workers=None, max_queue=32, max_per_user=4, max_shared_frames=4):
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.max_shared_frames = max_shared_frames
+        if self.max_workers > 0:
+            # متتبع موارد واحد تشترك فيه العمليات حتى تُحسب الذاكرة المشتركة التي تنشئها العمليات وتحذفها هذه العملية
+            resource_tracker.ensure_running()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers) if self.max_workers > 0 else None
+        # طابور لكل مستخدم - التوزيع بالتناوب حتى لا يحجز مستخدم واحد كل العمليات
+        self._queues = OrderedDict()
+        self._running = {}
+        self._frames = OrderedDict()
+        # عدد المهام (والمراجع المعادة من share_frame) لكل إطار مشترك، والإطارات المستبعدة التي تنتظر انتهاءها
+        self._frame_refs = {}
+        self._retired = {}
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._lock = threading.Condition()
+        self._closed = False
+        if self._executor is not None:
+            threading.Thread(target=self._dispatch_loop, name='hr-worker-dispatch', daemon=True).start()
+            # حذف الذاكرة المشتركة المتبقية عند إيقاف الخادم
+            atexit.register(self.shutdown)
+
+    @classmethod
+    def from_env(cls):
+        """الإعدادات من HR_WORKER_PROCESSES (0 = التنفيذ داخل العملية) و HR_WORKER_QUEUE و HR_WORKER_PER_USER"""
+        processes = os.environ.get('HR_WORKER_PROCESSES')
+        return cls(
+            max_workers=int(processes) if processes else None,
+            max_queue=int(os.environ.get('HR_WORKER_QUEUE', 32)),
+            max_per_user=int(os.environ.get('HR_WORKER_PER_USER', 4))
+        )
+
+    def submit(self, user_id, func, *args):
+        """إضافة مهمة لطابور المستخدم - يعيد Future بالنتيجة
+
+        المهمة تأخذ حجز الإطارات المشتركة في معاملاتها (من share_frame) وتفكه عند انتهائها أو رفضها أو إلغائها.
+        """
+        job = _Job(user_id, func, args)
+        if self._executor is None:
+            try:
+                job.future.set_result(func(*args))
+            except Exception as e:
+                job.future.set_exception(e)
+            return job.future
+
+        with self._lock:
+            queued = sum(len(queue) for queue in self._queues.values())
+            user_queue = self._queues.get(user_id, ())
+            user_running = sum(1 for running in self._running.values() if running.user_id == user_id)
+            if queued >= self.max_queue:
+                self.rejected += 1
+                self._release_job_frames(job)
+                raise PoolBusyError("الخادم مشغول بمهام كثيرة - حاول مرة أخرى بعد قليل")
+            if len(user_queue) + user_running >= self.max_per_user:
+                self.rejected += 1
+                self._release_job_frames(job)
+                raise PoolBusyError("لديك مهام كثيرة قيد التنفيذ - انتظر اكتمالها")
+            self._queues.setdefault(user_id, deque()).append(job)
+            self._lock.notify()
+        return job.future
+
+    def run(self, user_id, func, *args):
+        """تنفيذ مهمة وانتظار نتيجتها (خيط الجلسة ينتظر دون حجز GIL)"""
+        telemetry_run = telemetry.current()
+        if telemetry_run is None or self._executor is None:
+            return self.submit(user_id, func, *args).result()
+        # القياس مفعل: تشغيل المهمة مع قياس مراحلها في العملية المنفصلة
+        output = self.submit(
+            user_id, _measured_task, func, telemetry_run.session_id,
+            telemetry_run.log_path, telemetry_run.current_path, args
+        ).result()
+        telemetry_run.extend(output['telemetry'])
+        return output['result']
+
+    def cancel_user(self, user_id):
+        """إلغاء مهام المستخدم (مثلاً عند رفع ملف جديد) - المهام الجارية تُهمل نتيجتها"""
+        with self._lock:
+            queue = self._queues.pop(user_id, deque())
+            for job in queue:
+                job.cancelled = True
+                job.future.cancel()
+                self._release_job_frames(job)
+                self.cancelled += 1
+            for exec_future, job in list(self._running.items()):
+                if job.user_id == user_id and not job.cancelled:
+                    job.cancelled = True
+                    exec_future.cancel()
+                    # Future قيد التشغيل لا يقبل cancel(): إنهاء الانتظار بخطأ الإلغاء
+                    job.future.set_exception(CancelledError())
+                    self.cancelled += 1
+        return len(queue)
+
+    def _next_job(self):
+        # التناوب: أول مستخدم في الترتيب يأخذ مهمة ثم ينتقل لآخر الطابور
+        while self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            self._queues.pop(user_id)
+            if queue:
+                self._queues[user_id] = queue
+            if job.future.set_running_or_notify_cancel():
+                return job
+            self._release_job_frames(job)
+        return None
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed and (len(self._running) >= self.max_workers or not self._queues):
+                    self._lock.wait()
+                if self._closed:
+                    return
+                job = self._next_job()
+                if job is None:
+                    continue
+                exec_future = self._executor.submit(job.func, *job.args)
+                self._running[exec_future] = job
+            exec_future.add_done_callback(self._finish)
+
+    def _finish(self, exec_future):
+        with self._lock:
+            job = self._running.pop(exec_future, None)
+            if job is not None:
+                # العملية انتهت من قراءة الإطار: يمكن حذفه إن كان مستبعداً
+                self._release_job_frames(job)
+            self._lock.notify()
+        if job is None:
+            return
+        if exec_future.cancelled():
+            return
+        error = exec_future.exception()
+        if job.cancelled:
+            if error is None:
+                _release_result(exec_future.result())
+            return
+        self.completed += 1
+        if error is not None:
+            logger.warning("worker_task_failed %s: %s", job.func.__name__, error)
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(exec_future.result())
+
+    def share_frame(self, fingerprint, df):
+        """مرجع مشترك للإطار تقرأه العمليات - يُكتب مرة واحدة لكل بصمة
+
+        المرجع المعاد محجوز لمهمة واحدة: يُمرر إلى run() أو submit() التي تفك الحجز عند انتهاء المهمة.
+        """
+        if self._executor is None:
+            return df
+        with self._lock:
+            if fingerprint in self._frames:
+                self._frames.move_to_end(fingerprint)
+                return self._acquire_frame(self._frames[fingerprint])
+        handle = frame_to_shared(df)
+        with self._lock:
+            if fingerprint in self._frames:
+                release_shared(handle)
+                return self._acquire_frame(self._frames[fingerprint])
+            self._frames[fingerprint] = handle
+            self._acquire_frame(handle)
+            while len(self._frames) > self.max_shared_frames:
+                _, old = self._frames.popitem(last=False)
+                if self._frame_refs.get(old.name):
+                    # مهام في الطابور أو قيد التشغيل ما زالت تقرؤه: الحذف عند انتهاء آخرها
+                    self._retired[old.name] = old
+                else:
+                    release_shared(old)
+        return handle
+
+    def _acquire_frame(self, handle):
+        self._frame_refs[handle.name] = self._frame_refs.get(handle.name, 0) + 1
+        return handle
+
+    def _release_job_frames(self, job):
+        """فك حجز إطارات المهمة (مرة واحدة) وحذف المستبعد منها الذي لم تعد تقرؤه أي مهمة"""
+        frames, job.frames = job.frames, []
+        with self._lock:
+            for handle in frames:
+                count = self._frame_refs.get(handle.name, 0) - 1
+                if count > 0:
+                    self._frame_refs[handle.name] = count
+                    continue
+                self._frame_refs.pop(handle.name, None)
+                retired = self._retired.pop(handle.name, None)
+                if retired is not None:
+                    release_shared(retired)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'running': len(self._running),
+                'queued': {str(user)[:8]: len(queue) for user, queue in self._queues.items()},
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'rejected': self.rejected,
+                'shared_frames': len(self._frames),
+                'retired_frames': len(self._retired)
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+            frames = list(self._frames.values()) + list(self._retired.values())
+            self._frames.clear()
+            self._retired.clear()
+            self._frame_refs.clear()
+        for handle in frames:
+            release_shared(handle)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+def apply_modified_columns(df, modified):
+    """إطار سطحي فيه الأعمدة التي حولها التحليل في العملية المنفصلة"""
+    result = df.copy(deep=False)
+    if modified is not None:
+        for col in modified.columns:
+            result[col] = modified[col].set_axis(df.index)
+    return result
@@ -0,0 +1,111 @@
+"""
+التفاعل داخل قسم من الصفحة يعيد تشغيل ذلك القسم فقط دون مراحل الأقسام الأخرى
+"""
+
+import contextlib
+import dataclasses
+import functools
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+# واجهات داخلية في Streamlit (تم التحقق منها مع 1.66) - الاختبارات تُتخطى إذا تغيرت
+try:
+    from streamlit.runtime.scriptrunner import RerunData
+    from streamlit.testing.v1 import local_script_runner
+except ImportError:
+    RerunData = local_script_runner = None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+def _dataset(rows=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Employee ID': np.arange(rows),
+        'Department': rng.choice(['Sales', 'HR', 'IT'], rows),
+        'Salary': rng.normal(10000, 2000, rows),
+        'Performance Score': rng.uniform(1, 5, rows),
+        'Location': rng.choice(['Riyadh', 'Jeddah'], rows),
+        'Hire Date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3000, rows), unit='D'),
+        'Status': rng.choice(['Active', 'Terminated'], rows),
+    })
+
+@contextlib.contextmanager
+def fragment_rerun(at, function_name, monkeypatch):
+    """التفاعلات داخل هذا السياق تعيد تشغيل القسم function_name فقط كما يفعل المتصفح
+
+    AppTest يعيد تشغيل الصفحة كاملة عند التفاعل، فنرسل معرف القسم في RerunData. يعتمد ذلك على
+    واجهات داخلية في Streamlit، لذلك يُتخطى الاختبار إذا لم تعد موجودة.
+    """
+    fragments = getattr(getattr(at, '_fragment_storage', None), '_fragments', None)
+    if (not isinstance(fragments, dict) or not hasattr(local_script_runner, 'RerunData')
+            or not dataclasses.is_dataclass(RerunData)
+            or 'fragment_id_queue' not in {field.name for field in dataclasses.fields(RerunData)}):
+        pytest.skip('واجهات Streamlit الداخلية لإعادة تشغيل الأقسام غير متاحة في هذا الإصدار')
+
+    # معرف القسم كما يرسله المتصفح عند التفاعل مع عنصر داخله
+    fragment_id = next((
+        fragment_id for fragment_id, fragment in fragments.items()
+        if any(getattr(cell.cell_contents, '__name__', None) == function_name
+               for cell in getattr(fragment, '__closure__', None) or ())
+    ), None)
+    if fragment_id is None:
+        pytest.skip(f'تعذر العثور على معرف القسم {function_name} في هذا الإصدار من Streamlit')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(local_script_runner, 'RerunData', functools.partial(RerunData, fragment_id_queue=[fragment_id]))
+        yield
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('HR_SNAPSHOT_DB', str(tmp_path / 'snapshots.sqlite'))
+    monkeypatch.setenv('HR_WORKER_PROCESSES', '0')
+    st.cache_resource.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.session_state.df = _dataset()
+    at.session_state.df_fingerprint = 'fragments-test'
+    at.session_state.file_uploaded = True
+    at.session_state.analysis_ready = True
+    at.run()
+    assert not at.exception
+    yield at
+    st.cache_resource.clear()
+
+def test_fragment_interaction_does_not_rerun_other_stages(app, monkeypatch):
+    before = dict(app.session_state['stage_counts'])
+    assert before.get('chart_worker') == 1
+
+    # بدون الذاكرة المؤقتة للرسوم: أي إعادة تشغيل لقسم الرسوم ستعيد إنشاءها في العملية المنفصلة
+    st.cache_resource.clear()
+    with fragment_rerun(app, 'render_advanced_section', monkeypatch):
+        app.selectbox(key='modified_grid_page_size').select_index(1).run()
+    assert not app.exception
+
+    after = dict(app.session_state['stage_counts'])
+    # قسم التحليل المتقدم ينشئ خريطة الارتباط فقط (chart_build) ولا تتغير باقي المراحل
+    for stage, count in before.items():
+        if stage != 'chart_build':
+            assert after[stage] == count, stage
+
+    # إعادة تشغيل الصفحة كاملة تعيد إنشاء الرسوم فعلاً
+    app.run()
+    assert app.session_state['stage_counts']['chart_worker'] == before['chart_worker'] + 1
+
+def test_mapping_change_does_not_rerun_analysis_or_charts(app, monkeypatch):
+    before = dict(app.session_state['stage_counts'])
+    assert before.get('analysis') == 1
+
+    # بدون الذاكرة المؤقتة للرسوم، وبتعيين جديد كان التحليل سيُعاد لو أعيد تشغيل الصفحة كاملة
+    st.cache_resource.clear()
+
+    with fragment_rerun(app, 'render_mapping_section', monkeypatch):
+        app.selectbox(key='map_location_ar').select_index(0).run()
+    assert not app.exception
+    assert 'location' not in app.session_state['column_mapping']
+
+    after = dict(app.session_state['stage_counts'])
+    for stage in ('analysis', 'chart_worker', 'chart_build'):
+        assert after.get(stage) == before.get(stage), stage
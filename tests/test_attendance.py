@@ -0,0 +1,68 @@
+"""
+مؤشرات الحضور والعمل الإضافي والتدريب والمجاميع المشتركة لكل قسم
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.attendance import AttendanceAnalyzer, gini
+from modules.grouped_totals import GroupedTotals
+
+MAPPING = {
+    'department': 'Dept', 'attendance_days': 'Present', 'absent_days': 'Absent', 'late_days': 'Late',
+    'overtime_hours': 'Overtime', 'trainings_completed': 'Trainings'
+}
+
+@pytest.fixture
+def employees():
+    # فهرس غير متسلسل كما بعد التصفية أو الدمج
+    return pd.DataFrame({
+        'Dept': ['A'] * 5 + ['B'] * 5,
+        'Present': [20] * 10,
+        'Absent': [0, 0, 2, 2, 1, 5, 5, 5, 5, 5],
+        'Late': [1, 0, 0, 1, 0, 4, 4, 4, 4, 4],
+        'Overtime': [10, -5, 3, 4, 5, 1, 2, 3, 4, -20],
+        'Trainings': [1, 0, 2, 0, 1, 0, 0, 0, 0, 3],
+    }, index=np.arange(100, 110)[::-1])
+
+def test_gini():
+    assert gini(np.array([5.0, 5.0, 5.0, 5.0])) == pytest.approx(0.0)
+    assert gini(np.array([0.0, 0.0, 0.0, 10.0])) == pytest.approx(0.75)
+    assert gini(np.array([0.0, 0.0])) is None
+
+def test_grouped_totals_align_by_position(employees):
+    totals = GroupedTotals(len(employees), {'absent': employees['Absent']}, employees['Dept'])
+
+    assert totals.labels == ['A', 'B']
+    assert totals.by_group('sum', 'absent').tolist() == [5.0, 25.0]
+    assert totals.by_group('positive', 'absent').tolist() == [3.0, 5.0]
+
+def test_absence_and_late_rates(employees):
+    absence = AttendanceAnalyzer(employees, MAPPING, min_group_size=1).analyze()['absence']
+    departments = {row['department']: row for row in absence['by_department']}
+
+    # الغياب ÷ (الحضور + الغياب) والتأخير ÷ الحضور
+    assert absence['overall']['absence_rate'] == pytest.approx(30 / 230 * 100)
+    assert absence['overall']['late_rate'] == pytest.approx(22 / 200 * 100)
+    assert departments['B']['absence_rate'] == pytest.approx(25 / 125 * 100)
+    assert departments['A']['late_rate'] == pytest.approx(2 / 100 * 100)
+    assert [row['department'] for row in absence['by_department']] == ['B', 'A']
+
+def test_overtime_shares_use_clipped_hours(employees):
+    overtime = AttendanceAnalyzer(employees, MAPPING, min_group_size=1).analyze()['overtime']
+    departments = {row['department']: row for row in overtime['by_department']}
+
+    assert overtime['total_hours'] == 32.0
+    assert departments['A']['total_hours'] == 22.0 and departments['B']['total_hours'] == 10.0
+    assert sum(row['share'] for row in overtime['by_department']) == pytest.approx(100.0)
+    assert overtime['top_employees'][0]['hours'] == 10.0
+
+def test_training_coverage(employees):
+    training = AttendanceAnalyzer(employees, MAPPING, min_group_size=1).analyze()['training']
+    departments = {row['department']: row for row in training['by_department']}
+
+    assert training['coverage_field'] == 'trainings_completed'
+    assert training['overall']['coverage_pct'] == pytest.approx(40.0)
+    assert departments['A']['coverage_pct'] == pytest.approx(60.0)
+    assert departments['B']['coverage_pct'] == pytest.approx(20.0)
+    assert training['overall']['avg_trainings_completed'] == pytest.approx(0.7)
@@ -0,0 +1,54 @@
+"""
+الأسماء البديلة للفئات: من الإعدادات المحفوظة والمتغير HR_CATEGORY_ALIASES إلى التحليل والرسوم ومفاتيح الذاكرة المؤقتة
+"""
+
+import pandas as pd
+import pytest
+from modules.category_normalizer import canonicalize, load_aliases, aliases_key
+from modules.data_analyzer import FlexibleDataAnalyzer
+from modules.figure_cache import FigureCache
+from modules.smart_visualizer import SmartVisualizer
+
+MAPPING = {'department': 'Department', 'salary': 'Salary'}
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Department': ['Sales', ' sales ', 'المبيعــات', 'HR', 'الموارد البشرية'],
+        'Salary': [100.0, 200.0, 300.0, 400.0, 500.0]
+    })
+
+def test_canonicalize_with_aliases():
+    values = canonicalize(['Sales', 'SALES', 'المبيعات', 'HR'], {'المبيعات': 'Sales'})
+
+    assert list(values) == ['Sales', 'Sales', 'Sales', 'HR']
+
+def test_load_aliases_from_settings_and_env(monkeypatch):
+    monkeypatch.setenv('HR_CATEGORY_ALIASES', '{"الموارد البشرية": "HR"}')
+    aliases = load_aliases({'category_aliases': {'المبيعات': 'Sales'}})
+
+    assert aliases == {'المبيعات': 'Sales', 'الموارد البشرية': 'HR'}
+
+def test_invalid_env_aliases_are_ignored(monkeypatch):
+    monkeypatch.setenv('HR_CATEGORY_ALIASES', '["not", "a", "mapping"]')
+
+    assert load_aliases() == {}
+    assert aliases_key({}) == ''
+
+def test_analyzer_uses_env_aliases(frame, monkeypatch):
+    monkeypatch.setenv('HR_CATEGORY_ALIASES', '{"المبيعات": "Sales", "الموارد البشرية": "HR"}')
+    analyzer = FlexibleDataAnalyzer(frame, MAPPING)
+    analyzer.analyze_all()
+
+    assert sorted(analyzer.df['Department'].astype(str).unique()) == ['HR', 'Sales']
+
+def test_aliases_change_the_chart_cache_key(frame):
+    analysis = FlexibleDataAnalyzer(frame, MAPPING, {}).analyze_all()
+    cache = FigureCache()
+    plain = SmartVisualizer(frame, MAPPING, analysis, figure_cache=cache, fingerprint='f', category_aliases={})
+    aliased = SmartVisualizer(
+        frame, MAPPING, analysis, figure_cache=cache, fingerprint='f', category_aliases={'المبيعات': 'Sales'}
+    )
+
+    assert plain._cache_key('department', ['department']) != aliased._cache_key('department', ['department'])
+    assert aliases_key({'a': 'b', 'c': 'd'}) == aliases_key({'c': 'd', 'a': 'b'})
@@ -0,0 +1,40 @@
+"""
+تصدير الأعمدة المختلطة الأنواع (أرقام ونصوص في نفس العمود بعد دمج الملفات)
+"""
+
+import pandas as pd
+import pytest
+from modules.data_exporter import DataExporter, ExportCache, available_formats
+
+@pytest.fixture
+def mixed_frame():
+    return pd.DataFrame({
+        'Name': ['a', 'b', 'c', 'd'],
+        'Badge': pd.Series([1, 2, 'X9', None], dtype=object),
+        'Salary': [100.0, None, 300.0, 400.0]
+    })
+
+@pytest.mark.parametrize('fmt', available_formats())
+def test_mixed_object_columns_export(fmt, mixed_frame, tmp_path):
+    path = DataExporter(mixed_frame, chunk_rows=2).export(fmt, str(tmp_path / f'export.{fmt}'))
+
+    if fmt == 'parquet':
+        badges = pd.read_parquet(path)['Badge'].tolist()
+        assert badges[:3] == ['1', '2', 'X9'] and pd.isna(badges[3])
+    elif fmt == 'xlsx':
+        assert pd.read_excel(path)['Badge'].tolist()[:3] == [1, 2, 'X9']
+    else:
+        assert pd.read_csv(path)['Badge'].tolist()[:3] == ['1', '2', 'X9']
+
+def test_failed_export_releases_build_lock(tmp_path, monkeypatch):
+    cache = ExportCache(str(tmp_path))
+
+    def fail(self, fmt, path):
+        raise ValueError('export failed')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(DataExporter, 'export', fail)
+        with pytest.raises(ValueError):
+            cache.read('fingerprint', 'csv', pd.DataFrame({'a': [1]}))
+    assert cache._building == {}
+    assert cache.read('fingerprint', 'csv', pd.DataFrame({'a': [1]})).startswith(b'\xef\xbb\xbfa')
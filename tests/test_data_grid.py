@@ -0,0 +1,31 @@
+"""
+فرز وتصفية جدول البيانات المقسم لصفحات
+"""
+
+import pandas as pd
+from modules.data_grid import DataGrid
+
+def test_sort_numbers_with_missing_values_last():
+    grid = DataGrid(pd.DataFrame({'salary': [300.0, None, 100.0, 200.0]}))
+
+    assert grid.sort_order('salary').tolist() == [2, 3, 0, 1]
+    assert grid.sort_order('salary', ascending=False).tolist() == [0, 3, 2, 1]
+
+def test_sort_mixed_type_object_column():
+    # عمود Badge بعد دمج ملف فيه أرقام وملف فيه نصوص
+    df = pd.DataFrame({'Badge': pd.Series([12, 'X9', 3, None, 'A1'], dtype=object)})
+    window, matched, _ = DataGrid(df).page(sort_by='Badge')
+
+    assert matched == 5
+    assert window['Badge'].tolist()[:4] == [12, 3, 'A1', 'X9']
+    assert pd.isna(window['Badge'].iloc[-1])
+
+def test_filter_and_sort_together():
+    df = pd.DataFrame({
+        'name': ['Sara', 'Omar', 'sami', 'Ali'],
+        'salary': [400, 100, 300, 200]
+    })
+    window, matched, _ = DataGrid(df).page(sort_by='salary', filter_column='name', filter_text='SA')
+
+    assert matched == 2
+    assert window['name'].tolist() == ['sami', 'Sara']
@@ -0,0 +1,71 @@
+"""
+اكتشاف صيغة التواريخ: ترتيب اليوم والشهر، أرقام Excel التسلسلية، ورفض النصوص التي ليست تواريخ
+"""
+
+import io
+import pandas as pd
+import pytest
+from modules.column_mapper import AutoColumnMapper
+from modules.date_parser import parse_dates, to_datetime
+from modules.file_loader import SmartFileLoader, BytesUpload
+
+@pytest.mark.parametrize('value', ['4,5', '1,234', '8/16', '1-2', '2-3', '15/03/1850'])
+def test_non_dates_are_failures(value):
+    dates, report = parse_dates([value])
+
+    assert dates.isna().all()
+    assert report['failed'] == 1
+    assert report['failure_rate'] == 100.0
+
+def test_day_first_is_resolved_for_the_whole_column():
+    dates, report = parse_dates(['03/04/2020', '25/12/2020'])
+
+    assert report['format'] == '%d/%m/%Y'
+    assert list(dates) == [pd.Timestamp('2020-04-03'), pd.Timestamp('2020-12-25')]
+
+def test_month_first_is_resolved_for_the_whole_column():
+    dates, report = parse_dates(['03/04/2020', '12/25/2020'])
+
+    assert report['format'] == '%m/%d/%Y'
+    assert list(dates) == [pd.Timestamp('2020-03-04'), pd.Timestamp('2020-12-25')]
+
+def test_arabic_digits_and_month_names():
+    dates = to_datetime(['٢٠٢٠-٠٣-١٥', '15 مارس 2020'])
+
+    assert list(dates) == [pd.Timestamp('2020-03-15')] * 2
+
+def test_iso_datetimes_with_time_zones():
+    dates, report = parse_dates(['2024-03-15T10:00:00+03:00', '2024-03-15T10:00:00Z'])
+
+    assert report['failed'] == 0
+    assert list(dates) == [pd.Timestamp('2024-03-15 07:00'), pd.Timestamp('2024-03-15 10:00')]
+
+def test_excel_serials():
+    numeric, report = parse_dates(pd.Series([43831, 44000.5, 5]))
+    text = to_datetime(['43831'])
+
+    assert report['format'] == 'excel'
+    assert list(numeric[:2]) == [pd.Timestamp('2020-01-01'), pd.Timestamp('2020-06-18 12:00')]
+    # خارج النطاق المعقول لتواريخ الموظفين
+    assert pd.isna(numeric[2]) and report['failed'] == 1
+    assert text[0] == pd.Timestamp('2020-01-01')
+    assert to_datetime(['43831'], excel_serials=False).isna().all()
+
+def test_loader_keeps_ranges_and_shifts_as_text():
+    df = pd.DataFrame({
+        'Grade': ['1-2', '2-3', '1-2'],
+        'Shift': ['8/16', '8/16', '16/24'],
+        'Hire Date': ['15/03/2020', '01/02/2021', '2019-05-06']
+    })
+    content = io.BytesIO()
+    df.to_excel(content, index=False)
+    loaded = SmartFileLoader(BytesUpload(content.getvalue(), 'employees.xlsx')).load_file()
+
+    assert not pd.api.types.is_datetime64_any_dtype(loaded['Grade'])
+    assert not pd.api.types.is_datetime64_any_dtype(loaded['Shift'])
+    assert pd.api.types.is_datetime64_any_dtype(loaded['Hire Date'])
+
+def test_amount_text_is_not_mapped_to_a_date():
+    df = pd.DataFrame({'Name': ['a', 'b'], 'Amount': ['1,500', '2,250']})
+
+    assert 'hire_date' not in AutoColumnMapper(df).auto_detect_columns()
@@ -0,0 +1,43 @@
+"""
+تحويل النصوص الرقمية المحلية: العملات والأرقام العربية والفواصل، ورفض الهواتف والتواريخ
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.numeric_parser import parse_numeric, to_numeric
+
+@pytest.mark.parametrize('value, expected', [
+    ('12,500 ر.س', 12500.0),
+    ('١٢٬٥٠٠', 12500.0),
+    ('SAR 9.750,00', 9750.0),
+    ('(1,000)', -1000.0),
+    ('1000-', -1000.0),
+    ('12 500', 12500.0),
+    ('1.2E+05', 120000.0),
+])
+def test_locale_numbers(value, expected):
+    assert to_numeric([value])[0] == expected
+
+@pytest.mark.parametrize('value', ['0501234567', '+966501234567', '31.12.2018'])
+def test_phones_and_dates_are_failures(value):
+    numbers, report = parse_numeric([value])
+
+    assert np.isnan(numbers[0])
+    assert report['failed'] == 1 and report['examples'] == [value]
+
+def test_column_vote_decides_ambiguous_thousands():
+    # "9.750" وحدها عشرية، لكن مع قيم تستخدم ',' كفاصلة عشرية تصبح النقطة فاصل آلاف
+    assert to_numeric(['9.750'])[0] == 9.75
+    assert list(to_numeric(['9.750', '12.5'])) == [9.75, 12.5]
+    assert list(to_numeric(['9.750', '1.234,50'])) == [9750.0, 1234.5]
+
+def test_report_counts_rows_and_keeps_index():
+    values = pd.Series(['1,000', 'abc', None, '', 'abc', '1,000'], index=[10, 11, 12, 13, 14, 15], name='Salary')
+    numbers, report = parse_numeric(values)
+
+    assert list(numbers.index) == [10, 11, 12, 13, 14, 15] and numbers.name == 'Salary'
+    assert numbers[10] == numbers[15] == 1000.0
+    # القيم الفارغة لا تُحسب فشلاً والمكررة تُحسب لكل صف
+    assert report['non_null'] == 4 and report['failed'] == 2
+    assert report['failure_rate'] == 50.0 and report['examples'] == ['abc']
@@ -0,0 +1,48 @@
+"""
+الفجوة المعدلة في الرواتب حسب الجنس
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from modules.pay_equity import PayEquityAnalyzer, encode_levels
+
+MAPPING = {'salary': 'Salary', 'gender': 'Gender', 'position': 'Position', 'department': 'Department'}
+
+def _employees(rows=2000, gap=500.0, missing_gender=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(['M', 'F'], rows).astype(object)
+    position = rng.choice(['Engineer', 'Manager'], rows)
+    salary = 10000 + np.where(position == 'Manager', 4000, 0) + np.where(gender == 'F', -gap, 0) + rng.normal(0, 300, rows)
+    gender[rng.random(rows) < missing_gender] = None
+    return pd.DataFrame({
+        'Salary': salary, 'Gender': gender, 'Position': position,
+        'Department': rng.choice(['Sales', 'IT', 'HR'], rows)
+    })
+
+def test_encode_levels_orders_by_frequency_and_groups_rare_levels():
+    codes, labels = encode_levels(pd.Series(['b', 'a', 'a', 'c', None, 'a', 'b']), max_levels=3)
+
+    assert labels[:2] == ['a', 'b']
+    assert labels[2] != 'c' and len(labels) == 3
+    assert codes.tolist()[:3] == [1, 0, 0]
+
+def test_adjusted_gap_recovers_known_difference():
+    results = PayEquityAnalyzer(_employees(), MAPPING).analyze()
+    gaps = {entry['gender']: entry for entry in results['overall']['gaps']}
+
+    assert results['available']
+    other = 'M' if results['reference_gender'] == 'F' else 'F'
+    expected = 500.0 if other == 'M' else -500.0
+    assert gaps[other]['ci_low'] < expected < gaps[other]['ci_high']
+    assert gaps[other]['significant']
+
+@pytest.mark.parametrize('missing_gender', [0.2, 0.6])
+def test_missing_gender_is_not_a_gender(missing_gender):
+    df = _employees(missing_gender=missing_gender)
+    results = PayEquityAnalyzer(df, MAPPING).analyze()
+
+    assert results['reference_gender'] in ('M', 'F')
+    assert {entry['gender'] for entry in results['overall']['gaps']} <= {'M', 'F'}
+    assert results['rows'] == int(df['Gender'].notna().sum())
+    assert results['missing_gender'] == int(df['Gender'].isna().sum())
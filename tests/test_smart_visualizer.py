@@ -0,0 +1,58 @@
+"""
+حجم الرسوم المجمعة على الخادم لا يعتمد على عدد الصفوف
+"""
+
+import base64
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from modules.smart_visualizer import SmartVisualizer
+
+MAPPING = {'salary': 'Salary', 'performance_score': 'Score'}
+
+def _visualizer(rows, histogram_bins=30):
+    # نفس العينة مكررة: التوزيع والمتوسط والربيعيات ثابتة ويتغير عدد الصفوف فقط
+    rng = np.random.default_rng(7)
+    base = pd.DataFrame({
+        'Salary': rng.uniform(3000, 30000, 1000).round(),
+        'Score': rng.uniform(1, 5, 1000).round(1)
+    })
+    df = pd.concat([base] * (rows // len(base)), ignore_index=True)
+    return SmartVisualizer(df, MAPPING, {}, histogram_bins=histogram_bins)
+
+def _trace_arrays(fig):
+    """أطوال وأنواع مصفوفات كل trace كما تُرسل للمتصفح (بعد فك ترميز base64 في JSON)"""
+    arrays = []
+    for trace in json.loads(fig.to_json())['data']:
+        shapes = {}
+        for name, value in trace.items():
+            if isinstance(value, dict) and 'bdata' in value:
+                data = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+                shapes[name] = (data.dtype.kind, len(data))
+            elif isinstance(value, list):
+                shapes[name] = ('list', len(value))
+        arrays.append((trace['type'], shapes))
+    return arrays
+
+@pytest.mark.parametrize('method', ['_create_salary_chart', '_create_performance_chart'])
+def test_figure_size_does_not_grow_with_rows(method):
+    small = getattr(_visualizer(10_000), method)()
+    large = getattr(_visualizer(10_000_000), method)()
+
+    assert small['available'] and large['available']
+    small_arrays, large_arrays = _trace_arrays(small['figure']), _trace_arrays(large['figure'])
+    assert small_arrays == large_arrays
+    # أعمدة المدرج = عدد الفئات وليس عدد الصفوف، والصندوق = إحصاءات مجمعة لكل فئة
+    assert all(length <= SmartVisualizer.MAX_HISTOGRAM_BINS
+               for _, shapes in large_arrays for _, length in shapes.values())
+
+def test_histogram_bins_are_clamped():
+    visualizer = _visualizer(1_000, histogram_bins='fd')
+    # عمود شبه ثابت مع قيمة شاذة بعيدة: قاعدة fd تعطي ملايين الأعمدة
+    values = np.r_[np.random.default_rng(1).normal(5000, 1, 10_000), 1e9]
+    counts, edges = visualizer._histogram(values)
+
+    assert len(counts) == SmartVisualizer.MAX_HISTOGRAM_BINS
+    assert len(edges) == SmartVisualizer.MAX_HISTOGRAM_BINS + 1
+    assert counts.sum() == len(values)
@@ -0,0 +1,335 @@
+"""
+اختبار حمل لواجهة Streamlit - جلسات متزامنة تحاكي مستخدمي الموارد البشرية داخل عملية واحدة
+
+كل جلسة: فتح الصفحة ← رفع ملف اصطناعي ← تعديل تعيين الأعمدة ← التحليل ← إنشاء التقرير.
+الجلسات تعمل عبر AppTest في خيوط متوازية وتتشارك ذاكرة الخادم المؤقتة وعمليات المعالجة
+كما في الخادم الحقيقي. يُطبع لكل مستوى تزامن: p50/p95/p99 لكل تفاعل والإنتاجية وذاكرة الخادم.
+
+المحاكاة تعمل في نفس عملية الخادم، فالأزمنة تشمل تنافس الجلسات على المعالج (مثل الخادم الحقيقي)
+لكن دون تكلفة الشبكة وإرسال الرسائل إلى المتصفح.
+
+مثال:
+    python tools/app_load_test.py --sessions 1,2,4,8 --rows 20000
+    python tools/app_load_test.py --sessions 4 --iterations 3 --datasets 1 --json
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from modules.translations import TRANSLATIONS
+
+INTERACTIONS = ('first_paint', 'upload', 'mapping', 'analysis', 'report')
+
+_session = threading.local()
+# إصدارات Streamlit التي تم التحقق من واجهاتها الداخلية المستخدمة في _prepare_concurrent_apptest
+SUPPORTED_STREAMLIT = '1.66'
+
+def _check_streamlit_internals():
+    """التحقق من وجود الواجهات الداخلية التي يعدلها _prepare_concurrent_apptest - يعيد قائمة الناقص منها"""
+    missing = []
+    try:
+        from streamlit import config
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: F401
+        from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+    except ImportError as e:
+        return [str(e)]
+
+    # السمات التي يعينها ScriptRunner.__init__ ونستبدلها بعد إنشاء كل جلسة
+    assigned = set()
+    for cls in LocalScriptRunner.__mro__:
+        code = getattr(cls.__dict__.get('__init__'), '__code__', None)
+        if code is not None:
+            assigned.update(code.co_names)
+    missing += [f"LocalScriptRunner.{name}" for name in ('_script_cache', '_session_id') if name not in assigned]
+    missing += [
+        f"Runtime.{name}" for name in ('instance', 'exists')
+        if not isinstance(Runtime.__dict__.get(name), classmethod)
+    ]
+    if not hasattr(Runtime, '_instance'):
+        missing.append('Runtime._instance')
+    try:
+        config.get_option('global.appTest')
+    except RuntimeError:
+        missing.append('global.appTest')
+    return missing
+
+def _prepare_concurrent_apptest():
+    """تهيئة AppTest ليتصرف كخادم واحد بعدة جلسات متزامنة
+
+    AppTest مصمم لتشغيل جلسة واحدة في كل مرة، لذلك:
+    - لكل جلسة معرف مختلف (AppTest يستخدم معرفاً ثابتاً) حتى لا تلغي الجلسات مهام بعضها
+      في العمليات المشتركة ولا تتشارك خانات سجل البيانات.
+    - ذاكرة ترجمة واحدة للصفحة كما في الخادم (ترجمة ast المتزامنة من عدة خيوط غير آمنة).
+    - وضع الاختبار ونسخة Runtime يبقيان مفعلين طوال الاختبار بدلاً من تفعيلهما وإلغائهما
+      حول كل تشغيل، فلا ينهي انتهاء تشغيل جلسة ما تشغيلاً جارياً في جلسة أخرى.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    if getattr(LocalScriptRunner, '_hr_concurrent_sessions', False):
+        return
+    original_init = LocalScriptRunner.__init__
+    script_cache = ScriptCache()
+
+    def __init__(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        self._script_cache = script_cache
+        session_id = getattr(_session, 'id', None)
+        if session_id:
+            self._session_id = session_id
+
+    LocalScriptRunner.__init__ = __init__
+    LocalScriptRunner._hr_concurrent_sessions = True
+
+    config.set_option('global.appTest', True)
+    original_instance = Runtime.instance.__func__
+    last_runtime = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime[:] = [cls._instance]
+            return cls._instance
+        return last_runtime[0] if last_runtime else original_instance(cls)
+
+    def exists(cls):
+        return cls._instance is not None or bool(last_runtime)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+
+def make_synthetic_csv(rows, seed=0):
+    """ملف موظفين اصطناعي بالحقول التي يتعرف عليها التعيين التلقائي"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Employee ID': np.arange(rows),
+        'Employee Name': [f"Employee {i}" for i in range(rows)],
+        'Department': rng.choice(['Sales', 'HR', 'IT', 'Finance', 'Operations'], rows),
+        'Position': rng.choice(['Engineer', 'Manager', 'Analyst', 'Clerk'], rows),
+        'Salary': rng.normal(12000, 3000, rows).round(),
+        'Hire Date': (pd.Timestamp('2012-01-01') + pd.to_timedelta(rng.integers(0, 4000, rows), unit='D')).strftime('%Y-%m-%d'),
+        'Performance Score': rng.uniform(1, 5, rows).round(1),
+        'Gender': rng.choice(['Male', 'Female'], rows),
+        'Location': rng.choice(['Riyadh', 'Jeddah', 'Dammam'], rows),
+        'Status': rng.choice(['Active', 'Terminated'], rows, p=[0.85, 0.15])
+    })
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode('utf-8')
+
+def process_rss_mb():
+    """الذاكرة المقيمة للعملية الحالية وعمليات المعالجة التابعة لها (Linux) بالميجابايت"""
+    pids = [os.getpid()]
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == os.getpid():
+                pids.append(int(entry))
+        page = os.sysconf('SC_PAGE_SIZE')
+        total = 0
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/statm') as f:
+                    total += int(f.read().split()[1]) * page
+            except OSError:
+                continue
+        return total / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _button(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"الزر غير موجود: {label}")
+
+def _check(at, interaction):
+    if at.exception:
+        raise RuntimeError(f"{interaction}: {at.exception[0].message}")
+    if at.error:
+        raise RuntimeError(f"{interaction}: {at.error[0].value}")
+
+def run_session(app_path, filename, content, language, timeout, rng):
+    """جلسة مستخدم كاملة - يعيد قائمة (التفاعل، الزمن بالثواني)"""
+    from streamlit.testing.v1 import AppTest
+
+    _session.id = f"load-{uuid.uuid4().hex[:12]}"
+    text = TRANSLATIONS[language]
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    at.session_state.language = language
+    timings = []
+
+    def timed(interaction, action):
+        start = time.perf_counter()
+        action()
+        timings.append((interaction, time.perf_counter() - start))
+        _check(at, interaction)
+
+    timed('first_paint', at.run)
+    timed('upload', lambda: at.file_uploader[0].set_value((filename, content, 'text/csv')).run())
+
+    # المستخدم يلغي تعيين أحد الحقول المكتشفة تلقائياً
+    not_available = f"❌ {text['not_available']}"
+    mapped = [box for box in at.selectbox if str(box.key or '').startswith('map_') and box.value != not_available]
+    if mapped:
+        box = rng.choice(mapped)
+        timed('mapping', lambda: box.set_value(not_available).run())
+
+    timed('analysis', lambda: _button(at, text['analyze_button']).click().run())
+    timed('report', lambda: _button(at, text['generate_report']).click().run())
+    return timings
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+def run_level(app_path, files, sessions, iterations, language, timeout, seed):
+    """تشغيل عدد من الجلسات المتزامنة - كل جلسة تكرر السيناريو iterations مرة"""
+    latencies = {interaction: [] for interaction in INTERACTIONS}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        for iteration in range(iterations):
+            filename, content = files[(index + iteration) % len(files)]
+            try:
+                timings = run_session(app_path, filename, content, language, timeout, rng)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                for interaction, seconds in timings:
+                    latencies[interaction].append(seconds)
+
+    memory_before = process_rss_mb()
+    memory_peak = [memory_before]
+    done = threading.Event()
+
+    def sample_memory():
+        while not done.wait(0.25):
+            memory_peak[0] = max(memory_peak[0], process_rss_mb())
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(worker, range(sessions)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+
+    completed = sessions * iterations - len(errors)
+    return {
+        'sessions': sessions,
+        'elapsed_seconds': round(elapsed, 2),
+        'completed_sessions': completed,
+        'sessions_per_minute': round(completed / elapsed * 60, 2) if elapsed else 0.0,
+        'interactions_per_second': round(sum(len(v) for v in latencies.values()) / elapsed, 2) if elapsed else 0.0,
+        'memory_before_mb': round(memory_before, 1),
+        'memory_peak_mb': round(memory_peak[0], 1),
+        'memory_after_mb': round(process_rss_mb(), 1),
+        'latency_ms': {
+            interaction: {
+                'count': len(values),
+                'p50': round(percentile([v * 1000 for v in values], 50), 1),
+                'p95': round(percentile([v * 1000 for v in values], 95), 1),
+                'p99': round(percentile([v * 1000 for v in values], 99), 1)
+            }
+            for interaction, values in latencies.items()
+        },
+        'errors': errors
+    }
+
+def print_level(result):
+    print(f"\n== {result['sessions']} جلسة متزامنة: {result['completed_sessions']} جلسة مكتملة خلال "
+          f"{result['elapsed_seconds']}s ({result['sessions_per_minute']} جلسة/دقيقة، "
+          f"{result['interactions_per_second']} تفاعل/ثانية)")
+    print(f"   الذاكرة: {result['memory_before_mb']} ← {result['memory_after_mb']} MB (الذروة {result['memory_peak_mb']} MB)")
+    print(f"   {'interaction':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for interaction, stats in result['latency_ms'].items():
+        print(f"   {interaction:<12} {stats['count']:>6} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+    if result['errors']:
+        print(f"   أخطاء: {len(result['errors'])} (أولها: {result['errors'][0]})", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='اختبار حمل واجهة Streamlit بجلسات متزامنة')
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--sessions', default='1,2,4', help='مستويات التزامن مفصولة بفاصلة (مثل 1,2,4,8)')
+    parser.add_argument('--iterations', type=int, default=2, help='عدد مرات تكرار السيناريو في كل جلسة')
+    parser.add_argument('--datasets', type=int, default=2, help='عدد الملفات الاصطناعية المختلفة')
+    parser.add_argument('--rows', type=int, default=10000, help='عدد السجلات في كل ملف')
+    parser.add_argument('--language', default='en', choices=sorted(TRANSLATIONS))
+    parser.add_argument('--timeout', type=float, default=300, help='المهلة القصوى لكل تفاعل بالثواني')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-p95', type=float, default=None,
+                        help='حد p95 بالمللي ثانية لأي تفاعل - يعيد 1 عند تجاوزه (لاكتشاف تراجع الأداء)')
+    parser.add_argument('--json', action='store_true', help='طباعة النتائج بصيغة JSON')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    # سجلات حجم الرسوم لكل جلسة تغمر المخرجات - التحذيرات فقط
+    hr_logger = logging.getLogger('hr_dashboard')
+    hr_logger.addHandler(logging.StreamHandler())
+    hr_logger.setLevel(logging.WARNING)
+    missing = _check_streamlit_internals()
+    if missing:
+        import streamlit
+        print(f"إصدار Streamlit {streamlit.__version__} غير مدعوم في اختبار الحمل (تم التحقق من {SUPPORTED_STREAMLIT})، "
+              f"الواجهات الداخلية غير الموجودة: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    _prepare_concurrent_apptest()
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+    levels = [int(level) for level in args.sessions.split(',') if level.strip()]
+    files = [(f"synthetic_{i}.csv", make_synthetic_csv(args.rows, seed=i)) for i in range(max(1, args.datasets))]
+
+    if not args.json:
+        print(f"الملفات: {len(files)} × {args.rows} سجل  التكرار: {args.iterations}  اللغة: {args.language}")
+    results = []
+    for level in levels:
+        result = run_level(args.app, files, level, args.iterations, args.language, args.timeout, args.seed)
+        results.append(result)
+        if not args.json:
+            print_level(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    failed = any(result['errors'] for result in results)
+    if args.max_p95 is not None:
+        for result in results:
+            for interaction, stats in result['latency_ms'].items():
+                if stats['count'] and stats['p95'] > args.max_p95:
+                    failed = True
+                    print(f"✗ {result['sessions']} جلسة - {interaction}: p95 = {stats['p95']}ms "
+                          f"(الحد {args.max_p95}ms)", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+اختبار حمل لخدمة التحليل المحلية - يقيس زمن الاستجابة p50/p99 والإنتاجية
+
+مثال (يشغل الخدمة تلقائياً على localhost):
+    python tools/service_load_test.py --clients 16 --requests 400 --rows 20000
+أو على خدمة تعمل مسبقاً:
+    python tools/service_load_test.py --url http://127.0.0.1:8765
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ENDPOINTS = ('mapping', 'analysis', 'charts')
+
+def make_synthetic_csv(rows, seed=0):
+    """توليد ملف موظفين اصطناعي بصيغة CSV"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Employee ID': np.arange(rows),
+        'Department': rng.choice(['Sales', 'HR', 'IT', 'Finance', 'Operations'], rows),
+        'Salary': rng.normal(12000, 3000, rows).round(),
+        'Performance Score': rng.uniform(1, 5, rows).round(1),
+        'Location': rng.choice(['Riyadh', 'Jeddah', 'Dammam'], rows),
+        'Position': rng.choice(['Engineer', 'Manager', 'Analyst', 'Clerk'], rows)
+    })
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode('utf-8')
+
+def request(url, data=None, method='GET'):
+    req = urllib.request.Request(url, data=data, method=method)
+    with urllib.request.urlopen(req, timeout=300) as response:
+        return json.loads(response.read())
+
+def wait_until_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            return request(f"{url}/health")
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'الخدمة لم تستجب على {url}')
+
+def start_local_service(port, workers):
+    env = dict(os.environ, HR_SERVICE_WORKERS=str(workers))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'modules.analysis_service:app',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=root, env=env
+    )
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+def run_load(url, dataset_ids, endpoints, clients, total_requests, seed=0):
+    """إرسال الطلبات من عدة عملاء متزامنين وجمع الأزمنة لكل نقطة نهاية"""
+    rnd = random.Random(seed)
+    plan = [(rnd.choice(dataset_ids), rnd.choice(endpoints)) for _ in range(total_requests)]
+    latencies = {endpoint: [] for endpoint in endpoints}
+    errors = []
+
+    def one(item):
+        dataset_id, endpoint = item
+        start = time.perf_counter()
+        try:
+            if endpoint == 'mapping':
+                request(f"{url}/datasets/{dataset_id}/mapping")
+            else:
+                request(f"{url}/datasets/{dataset_id}/{endpoint}", data=b'{}', method='POST')
+        except Exception as e:
+            errors.append(f"{endpoint}: {e}")
+            return
+        latencies[endpoint].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, plan))
+    elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='اختبار حمل خدمة التحليل')
+    parser.add_argument('--url', default=None, help='عنوان خدمة تعمل مسبقاً (وإلا يتم تشغيل خدمة محلية)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='عدد عمليات الخدمة المحلية')
+    parser.add_argument('--clients', type=int, default=8, help='عدد العملاء المتزامنين')
+    parser.add_argument('--requests', type=int, default=200, help='إجمالي عدد الطلبات')
+    parser.add_argument('--datasets', type=int, default=3, help='عدد الملفات الاصطناعية المختلفة')
+    parser.add_argument('--rows', type=int, default=10000, help='عدد السجلات في كل ملف')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='نقاط النهاية المستهدفة مفصولة بفاصلة')
+    args = parser.parse_args(argv)
+
+    endpoints = [e for e in args.endpoints.split(',') if e in ENDPOINTS]
+    process = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        process = start_local_service(args.port, args.workers)
+
+    try:
+        wait_until_ready(url)
+        dataset_ids = []
+        for i in range(args.datasets):
+            content = make_synthetic_csv(args.rows, seed=i)
+            response = request(f"{url}/datasets?filename=synthetic_{i}.csv", data=content, method='POST')
+            dataset_ids.append(response['dataset_id'])
+
+        latencies, errors, elapsed = run_load(url, dataset_ids, endpoints, args.clients, args.requests)
+        health = request(f"{url}/health")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    completed = sum(len(v) for v in latencies.values())
+    print(f"العملاء: {args.clients}  الطلبات: {args.requests}  الملفات: {args.datasets} × {args.rows} سجل")
+    print(f"{'endpoint':<10} {'count':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, values in latencies.items():
+        ms = [v * 1000 for v in values]
+        print(f"{endpoint:<10} {len(ms):>6} {percentile(ms, 50):>9.1f} {percentile(ms, 99):>9.1f} "
+              f"{(max(ms) if ms else float('nan')):>9.1f}")
+    all_ms = [v * 1000 for values in latencies.values() for v in values]
+    print(f"{'all':<10} {completed:>6} {percentile(all_ms, 50):>9.1f} {percentile(all_ms, 99):>9.1f}")
+    print(f"الإنتاجية: {completed / elapsed:.1f} طلب/ثانية خلال {elapsed:.2f}s")
+    print(f"الذاكرة المؤقتة: {health['cache_hits']} إصابة / {health['cache_misses']} إخفاق")
+    if errors:
+        print(f"أخطاء: {len(errors)} (أولها: {errors[0]})", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+قياس زمن بدء تشغيل لوحة التحكم - زمن أول عرض للصفحة وزمن إعادة التشغيل وزمن استيراد كل وحدة
+
+كل قياس في عملية جديدة حتى لا تؤثر الوحدات المستوردة مسبقاً على النتيجة.
+الأزمنة تقارن بميزانية (tools/startup_budget.json) ويعيد البرنامج 1 عند تجاوزها.
+
+مثال:
+    python tools/startup_benchmark.py --runs 5
+    python tools/startup_benchmark.py --update-budget   # حفظ القياسات الحالية كميزانية (+ هامش)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(ROOT, 'tools', 'startup_budget.json')
+# هامش أدنى بالمللي ثانية حتى لا تفشل القياسات الصغيرة بسبب التذبذب
+MIN_SLACK_MS = 25
+
+# الوحدات التي تقاس بعد استيراد streamlit (المحمل دائماً في الخادم قبل تشغيل الصفحة)
+IMPORT_TARGETS = (
+    'pandas',
+    'numpy',
+    'plotly.express',
+    'modules.translations',
+    'modules.file_loader',
+    'modules.column_mapper',
+    'modules.data_analyzer',
+    'modules.smart_visualizer',
+    'modules.worker_pool',
+    'modules.profiler',
+)
+
+# أول تشغيل للصفحة (بدون ملف مرفوع) ثم إعادة تشغيلها في نفس العملية
+FIRST_PAINT_SCRIPT = """
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({'first_paint_ms': first * 1000, 'rerun_ms': rerun * 1000, 'errors': len(at.exception)}))
+"""
+
+def _run_python(args, env=None):
+    return subprocess.run(
+        [sys.executable] + args, cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=ROOT, **(env or {}))
+    )
+
+def measure_import(module):
+    """زمن استيراد الوحدة بالمللي ثانية (تراكمي حسب -X importtime) بعد تحميل streamlit"""
+    proc = _run_python(['-X', 'importtime', '-c', f"import streamlit; import {module}"])
+    if proc.returncode != 0:
+        raise RuntimeError(f"تعذر استيراد {module}: {proc.stderr.strip().splitlines()[-1]}")
+    total_us, after_streamlit = 0, False
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        if name.startswith(' '):
+            continue
+        # الوحدات أعلى المستوى (بدون مسافة بادئة) بعد streamlit تحمل الزمن التراكمي للاستيراد المقاس
+        if after_streamlit:
+            total_us += int(parts[1])
+        elif name == 'streamlit':
+            after_streamlit = True
+    return total_us / 1000
+
+def measure_first_paint(app_path):
+    proc = _run_python(['-c', FIRST_PAINT_SCRIPT, app_path])
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def run_benchmark(app_path, runs, modules):
+    paints = [measure_first_paint(app_path) for _ in range(runs)]
+    if any(paint['errors'] for paint in paints):
+        raise RuntimeError("الصفحة أعادت استثناءً أثناء القياس")
+    return {
+        'first_paint_ms': round(statistics.median(p['first_paint_ms'] for p in paints), 1),
+        'rerun_ms': round(statistics.median(p['rerun_ms'] for p in paints), 1),
+        'imports_ms': {
+            module: round(statistics.median(measure_import(module) for _ in range(runs)), 1)
+            for module in modules
+        }
+    }
+
+def check_budget(results, budget):
+    """قائمة التجاوزات: (المقياس، القيمة، الميزانية)"""
+    violations = []
+    for key in ('first_paint_ms', 'rerun_ms'):
+        if key in budget and results[key] > budget[key]:
+            violations.append((key, results[key], budget[key]))
+    for module, limit in budget.get('imports_ms', {}).items():
+        value = results['imports_ms'].get(module)
+        if value is not None and value > limit:
+            violations.append((f"import {module}", value, limit))
+    return violations
+
+def make_budget(results, headroom):
+    def limit(value):
+        return round(max(value * (1 + headroom), value + MIN_SLACK_MS))
+    return {
+        'first_paint_ms': limit(results['first_paint_ms']),
+        'rerun_ms': limit(results['rerun_ms']),
+        'imports_ms': {module: limit(value) for module, value in results['imports_ms'].items()}
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="قياس زمن بدء تشغيل لوحة التحكم مقارنة بالميزانية")
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--runs', type=int, default=3, help="عدد مرات القياس (يؤخذ الوسيط)")
+    parser.add_argument('--budget', default=DEFAULT_BUDGET, help="ملف الميزانية JSON")
+    parser.add_argument('--update-budget', action='store_true', help="كتابة القياسات الحالية كميزانية جديدة")
+    parser.add_argument('--headroom', type=float, default=0.5, help="الهامش فوق القياس عند تحديث الميزانية")
+    parser.add_argument('--json', action='store_true', help="طباعة النتائج بصيغة JSON فقط")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.app, max(1, args.runs), IMPORT_TARGETS)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'المقياس':<28}{'الزمن':>12}")
+        print(f"{'first paint':<28}{results['first_paint_ms']:>10.1f}ms")
+        print(f"{'rerun':<28}{results['rerun_ms']:>10.1f}ms")
+        for module, value in results['imports_ms'].items():
+            print(f"{'import ' + module:<28}{value:>10.1f}ms")
+
+    if args.update_budget:
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump(make_budget(results, args.headroom), f, indent=2)
+            f.write('\n')
+        print(f"\nتم حفظ الميزانية في {args.budget}")
+        return 0
+
+    if not os.path.exists(args.budget):
+        return 0
+    with open(args.budget, encoding='utf-8') as f:
+        budget = json.load(f)
+    violations = check_budget(results, budget)
+    for name, value, limit in violations:
+        print(f"✗ تجاوز الميزانية: {name} = {value:.1f}ms (الحد {limit}ms)", file=sys.stderr)
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())